@@ -0,0 +1,81 @@
+"""This script measures how long a player takes to start many concurrent battles,
+without a server.
+
+Battle frames go through the same path as a live connection: a ReplayTransport feeds
+them to the player's PSClient, whose dispatcher routes them to ordered per-room
+queues. Every battle is started at once: each room's init frame, start frame and end
+frame are fed round-robin across all rooms.
+
+usage:
+python diagnostic_tools/battle-ramp-up-benchmark.py [n_battles] [n_runs]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+from tabulate import tabulate
+
+from poke_env import AccountConfiguration
+from poke_env.concurrency import POKE_LOOP
+from poke_env.player import RandomPlayer
+from poke_env.ps_client import ReplayTransport
+
+BATTLE_FORMAT = "gen9randombattle"
+ROOM = f">battle-{BATTLE_FORMAT}-1"
+RECORDING = [
+    "|updateuser| username|1|1|{}",
+    f"{ROOM}\n|init|battle\n|title|username vs. opponent",
+    f"{ROOM}\n|player|p1|username|1|\n|player|p2|opponent|2|\n|teamsize|p1|6\n"
+    "|teamsize|p2|6\n|gen|9\n|start\n|turn|1",
+    f"{ROOM}\n|win|opponent",
+]
+
+
+async def ramp_up(n_battles):
+    transport = ReplayTransport(RECORDING, n_copies=n_battles, interleave=n_battles)
+    player = RandomPlayer(
+        account_configuration=AccountConfiguration(transport.username, None),
+        battle_format=BATTLE_FORMAT,
+        max_concurrent_battles=0,
+        log_level=40,
+        start_listening=False,
+        transport=transport,
+    )
+
+    start = time.perf_counter()
+    await player.ps_client.listen()
+    await player.ps_client.dispatcher.join()
+    elapsed = time.perf_counter() - start
+    max_depth = player.ps_client.dispatcher.stats().max_depth
+    await player.ps_client.dispatcher.close()
+
+    assert player.n_finished_battles == n_battles
+    return elapsed, max_depth
+
+
+def main():
+    n_battles = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    rows = []
+    for n in sorted({10, 100, n_battles}):
+        runs = [
+            asyncio.run_coroutine_threadsafe(ramp_up(n), POKE_LOOP).result()
+            for _ in range(n_runs)
+        ]
+        elapsed = statistics.median(e for e, _ in runs)
+        rows.append(
+            {
+                "battles": n,
+                "ramp-up (ms)": 1000 * elapsed,
+                "per battle (us)": 1e6 * elapsed / n,
+                "max queue depth": max(d for _, d in runs),
+            }
+        )
+    print(tabulate(rows, headers="keys", floatfmt=".2f"))
+
+
+if __name__ == "__main__":
+    main()
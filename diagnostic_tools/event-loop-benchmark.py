@@ -0,0 +1,182 @@
+"""This script compares poke-env's event loop implementations.
+
+For each implementation, a fresh process measures:
+- the frame throughput of a player replaying frames recorded with
+  store-game-messages.py, if a recording is given,
+- the latency of the thread handoff PokeEnv.step goes through,
+- with --server, the latency of PokeEnv.step against a local showdown server.
+
+usage:
+python diagnostic_tools/event-loop-benchmark.py [recording] [--server]
+
+Sample results on a single core, with Python 3.11 and uvloop 0.23, replaying a doubles
+battle (median of two runs):
+
+implementation      replay frames/s    handoff p50 (us)    handoff p99 (us)
+----------------  -----------------  ------------------  ------------------
+asyncio                      3568.2                31.4                55.4
+uvloop                       5720.7                20.9                34.6
+"""
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import orjson
+from gymnasium.spaces import Box
+from tabulate import tabulate
+
+IMPLEMENTATIONS = ["asyncio", "uvloop"]
+N_HANDOFFS = 20_000
+N_STEPS = 2_000
+
+
+def percentiles(durations):
+    durations = sorted(durations)
+    return {
+        "p50": durations[len(durations) // 2] * 1e6,
+        "p99": durations[int(len(durations) * 0.99)] * 1e6,
+    }
+
+
+def replay_throughput(path):
+    from poke_env import AccountConfiguration
+    from poke_env.concurrency import POKE_LOOP
+    from poke_env.player import RandomPlayer
+    from poke_env.ps_client import ReplayTransport
+
+    with open(path, "rb") as f:
+        frames = orjson.loads(f.read())
+
+    async def replay():
+        transport = ReplayTransport(frames, n_copies=20, interleave=64)
+        player = RandomPlayer(
+            account_configuration=AccountConfiguration(transport.username, None),
+            battle_format=transport.rooms[0].split("-")[1],
+            max_concurrent_battles=0,
+            log_level=40,
+            start_listening=False,
+            transport=transport,
+        )
+        start = time.perf_counter()
+        await player.ps_client.listen()
+        await player.ps_client.dispatcher.join()
+        elapsed = time.perf_counter() - start
+        await player.ps_client.dispatcher.close()
+        return transport.n_frames / elapsed
+
+    return statistics.median(
+        asyncio.run_coroutine_threadsafe(replay(), POKE_LOOP).result() for _ in range(5)
+    )
+
+
+def handoff_latency():
+    from poke_env.concurrency import POKE_LOOP
+    from poke_env.environment.env import _HandoffQueue
+
+    orders = _HandoffQueue(POKE_LOOP)
+    battles = _HandoffQueue(POKE_LOOP)
+    never_set = asyncio.run_coroutine_threadsafe(_create_event(), POKE_LOOP).result()
+
+    async def echo():
+        while True:
+            await battles.async_put(await orders.async_get())
+
+    asyncio.run_coroutine_threadsafe(echo(), POKE_LOOP)
+
+    durations = []
+    for i in range(N_HANDOFFS):
+        start = time.perf_counter()
+        orders.put(i)
+        battles.race_get(never_set)
+        durations.append(time.perf_counter() - start)
+    return percentiles(durations)
+
+
+async def _create_event():
+    return asyncio.Event()
+
+
+def step_latency():
+    from poke_env.environment import SingleAgentWrapper, SinglesEnv
+    from poke_env.player import RandomPlayer
+
+    class BenchmarkEnv(SinglesEnv):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.observation_spaces = {
+                agent: Box(0, 1, shape=(1,), dtype=np.float32)
+                for agent in self.possible_agents
+            }
+
+        def calc_reward(self, battle):
+            return 0.0
+
+        def embed_battle(self, battle):
+            return np.zeros(1, dtype=np.float32)
+
+    env = BenchmarkEnv(log_level=40, strict=False)
+    wrapper = SingleAgentWrapper(env, RandomPlayer(start_listening=False))
+    wrapper.reset()
+    durations = []
+    for _ in range(N_STEPS):
+        mask = env.get_action_mask(env.battle1)
+        action = random.choice([i for i, legal in enumerate(mask) if legal])
+        start = time.perf_counter()
+        _, _, terminated, truncated, _ = wrapper.step(np.int64(action))
+        durations.append(time.perf_counter() - start)
+        if terminated or truncated:
+            wrapper.reset()
+    env.close()
+    return percentiles(durations)
+
+
+def worker(path, server):
+    from poke_env.concurrency import EVENT_LOOP_IMPLEMENTATION
+
+    results = {"implementation": EVENT_LOOP_IMPLEMENTATION}
+    if path:
+        results["replay frames/s"] = replay_throughput(path)
+    handoff = handoff_latency()
+    results["handoff p50 (us)"] = handoff["p50"]
+    results["handoff p99 (us)"] = handoff["p99"]
+    if server:
+        step = step_latency()
+        results["step p50 (us)"] = step["p50"]
+        results["step p99 (us)"] = step["p99"]
+    print(json.dumps(results))
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    path = args[0] if args else ""
+    server = "--server" in sys.argv
+
+    rows = []
+    for implementation in IMPLEMENTATIONS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", path, str(int(server))],
+            env={**os.environ, "POKE_ENV_EVENT_LOOP": implementation},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        if results["implementation"] != implementation:
+            print(f"{implementation} is not installed, skipping it")
+            continue
+        rows.append(results)
+    print(tabulate(rows, headers="keys", floatfmt=".1f"))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3] == "1")
+    else:
+        main()
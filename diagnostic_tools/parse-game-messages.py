@@ -1,28 +1,81 @@
+"""This script replays frames recorded with store-game-messages.py through a player,
+without a server, and reports the client-side throughput. Battles are interleaved
+and can be replayed several times to simulate load.
+
+usage:
+python diagnostic_tools/parse-game-messages.py [input] [n_copies] [interleave]\
+    [n_runs] [--profile]
+"""
+
 import asyncio
-import json
+import cProfile
+import pstats
+import statistics
+import sys
+import time
+
+import orjson
 
 from poke_env import AccountConfiguration
 from poke_env.player import RandomPlayer
-
-with open("msgs.json", "r") as f:
-    msgs = json.load(f)
+from poke_env.ps_client import ReplayTransport
 
 
-class FakePlayer(RandomPlayer):
-    async def send_message(self, *args, **kwargs):
-        pass
+async def replay(frames, n_copies, interleave):
+    transport = ReplayTransport(frames, n_copies=n_copies, interleave=interleave)
+    battle_format = transport.rooms[0].split("-")[1]
+    player = RandomPlayer(
+        account_configuration=AccountConfiguration(transport.username, None),
+        battle_format=battle_format,
+        max_concurrent_battles=0,
+        log_level=40,
+        start_listening=False,
+        transport=transport,
+    )
 
+    start = time.perf_counter()
+    await player.ps_client.listen()
+    await player.ps_client.dispatcher.join()
+    elapsed = time.perf_counter() - start
+    await player.ps_client.dispatcher.close()
 
-p = FakePlayer(
-    start_listening=False,
-    account_configuration=AccountConfiguration("StoragePlayer 1", None),
-)
-p._logged_in.set()
+    return elapsed, transport
 
 
 async def main():
-    for msg in msgs:
-        await p._handle_message(msg)
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    path = args[0] if args else "msgs.json"
+    n_copies = int(args[1]) if len(args) > 1 else 1
+    interleave = int(args[2]) if len(args) > 2 else 16
+    n_runs = int(args[3]) if len(args) > 3 else 5
+
+    with open(path, "rb") as f:
+        frames = orjson.loads(f.read())
+
+    profiler = cProfile.Profile() if "--profile" in sys.argv else None
+    timings = []
+    for _ in range(n_runs):
+        if profiler is not None:
+            profiler.enable()
+        elapsed, transport = await replay(frames, n_copies, interleave)
+        if profiler is not None:
+            profiler.disable()
+        timings.append(elapsed)
+
+    median = statistics.median(timings)
+    print(
+        f"{transport.n_rooms} battles, {transport.n_frames} frames, "
+        f"{transport.n_sent_messages} messages sent per run"
+    )
+    print(
+        f"median {median:.3f}s over {n_runs} runs "
+        f"(min {min(timings):.3f}s, max {max(timings):.3f}s), "
+        f"{transport.n_frames / median:.0f} frames/s, "
+        f"{transport.n_rooms / median:.1f} battles/s"
+    )
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
 
 
-asyncio.get_event_loop().run_until_complete(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,22 +1,36 @@
+"""This script records the frames received by a player during random battles, to be
+replayed with parse-game-messages.py.
+
+usage:
+python diagnostic_tools/store-game-messages.py [n_battles] [output]
+"""
+
 import asyncio
+import sys
 
 import orjson
 
 from poke_env.player import RandomPlayer, cross_evaluate
-
-msgs = []
+from poke_env.ps_client import (
+    LocalhostServerConfiguration,
+    RecordingTransport,
+    WebsocketTransport,
+)
 
 
-class StoragePlayer(RandomPlayer):
-    async def _handle_message(self, message):
-        rtn = await RandomPlayer._handle_message(self, message)
-        msgs.append(message)
-        return rtn
+async def main():
+    n_battles = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    output = sys.argv[2] if len(sys.argv) > 2 else "msgs.json"
 
+    transport = RecordingTransport(
+        WebsocketTransport(LocalhostServerConfiguration.websocket_url)
+    )
+    players = [RandomPlayer(), RandomPlayer(transport=transport)]
+    await cross_evaluate(players, n_challenges=n_battles)
 
-players = [RandomPlayer(), StoragePlayer()]
+    with open(output, "wb+") as f:
+        f.write(orjson.dumps(transport.recorded_frames))
 
-asyncio.get_event_loop().run_until_complete(cross_evaluate(players, n_challenges=100))
 
-with open("msgs.json", "wb+") as f:
-    f.write(orjson.dumps(msgs))
+if __name__ == "__main__":
+    asyncio.run(main())
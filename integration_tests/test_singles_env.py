@@ -1,4 +1,5 @@
 import random
+from functools import partial
 
 import numpy as np
 import pytest
@@ -6,7 +7,13 @@ from gymnasium.spaces import Box
 from gymnasium.utils.env_checker import check_env
 from pettingzoo.test.parallel_test import parallel_api_test
 
-from poke_env.environment import SingleAgentWrapper, SinglesEnv
+from poke_env.environment import (
+    PokeVectorEnv,
+    SingleAgentVectorWrapper,
+    SingleAgentWrapper,
+    SinglesEnv,
+    SubprocPokeVectorEnv,
+)
 from poke_env.player import RandomPlayer
 
 
@@ -83,6 +90,83 @@ def sample_action(action_mask):
     return np.int64(action)
 
 
+def sample_actions(action_masks):
+    # Actions of slots where the agent is not expected to move are ignored
+    return np.array(
+        [sample_action(mask) if mask.any() else np.int64(0) for mask in action_masks]
+    )
+
+
+@pytest.mark.timeout(120)
+def test_vector_env_run():
+    env = SinglesTestEnv(
+        battle_format="gen9randombattle", log_level=25, start_listening=False
+    )
+    vec_env = PokeVectorEnv(env, num_envs=4)
+    obs, _ = vec_env.reset()
+    n_finished = 0
+    while n_finished < 10:
+        actions = {
+            name: sample_actions(obs[name]["action_mask"]) for name in vec_env.agents
+        }
+        obs, _, terminated, truncated, _ = vec_env.step(actions)
+        agent = vec_env.agents[0]
+        n_finished += int((terminated[agent] | truncated[agent]).sum())
+    vec_env.close()
+
+
+def make_vector_env(num_envs, reuse_observation_buffers):
+    env = SinglesTestEnv(
+        battle_format="gen9randombattle",
+        log_level=25,
+        start_listening=False,
+        reuse_observation_buffers=reuse_observation_buffers,
+    )
+    return PokeVectorEnv(env, num_envs=num_envs)
+
+
+@pytest.mark.timeout(120)
+@pytest.mark.parametrize("reuse_observation_buffers", [False, True])
+def test_subproc_vector_env_run(reuse_observation_buffers):
+    vec_env = SubprocPokeVectorEnv(
+        [partial(make_vector_env, 2, reuse_observation_buffers)] * 2
+    )
+    try:
+        obs, infos = vec_env.reset()
+        tags = infos["agent1"]["battle_tag"]
+        assert len(tags) == 4 and len(set(tags)) == 4
+        assert all(tag.startswith("battle-gen9randombattle-") for tag in tags)
+        n_finished = 0
+        while n_finished < 10:
+            actions = {
+                name: sample_actions(obs[name]["action_mask"])
+                for name in vec_env.agents
+            }
+            obs, _, terminated, truncated, infos = vec_env.step(actions)
+            done = terminated["agent1"] | truncated["agent1"]
+            n_finished += int(done.sum())
+            # Finished slots start a new battle on the next step
+            assert all(tag is not None for tag in infos["agent1"]["battle_tag"])
+    finally:
+        vec_env.close()
+
+
+@pytest.mark.timeout(120)
+def test_single_agent_vector_env_run():
+    env = SinglesTestEnv(
+        battle_format="gen9randombattle", log_level=25, start_listening=False
+    )
+    vec_env = SingleAgentVectorWrapper(PokeVectorEnv(env, num_envs=4), RandomPlayer())
+    obs, _ = vec_env.reset()
+    n_finished = 0
+    while n_finished < 10:
+        obs, _, terminated, truncated, _ = vec_env.step(
+            sample_actions(obs["action_mask"])
+        )
+        n_finished += int((terminated | truncated).sum())
+    vec_env.close()
+
+
 @pytest.mark.timeout(60)
 def test_repeated_runs():
     env = SinglesTestEnv(battle_format="gen8randombattle", log_level=25, strict=False)
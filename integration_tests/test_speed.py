@@ -1,11 +1,15 @@
+import asyncio
 import random
+import statistics
 import time
 
 import numpy as np
 import pytest
 from gymnasium.spaces import Box
 
+from poke_env.concurrency import POKE_LOOP, create_in_poke_loop
 from poke_env.environment import SinglesEnv
+from poke_env.environment.env import _HandoffQueue
 from poke_env.player import RandomPlayer
 
 
@@ -44,6 +48,69 @@ def run_battles(env, n_battles):
     return steps
 
 
+async def _queue_race_get(queue, *events):
+    # The handoff PokeEnv.step used to go through: a coroutine racing tasks
+    get_task = asyncio.create_task(queue.get())
+    wait_tasks = [asyncio.create_task(e.wait()) for e in events]
+    done, pending = await asyncio.wait(
+        {get_task, *wait_tasks}, return_when=asyncio.FIRST_COMPLETED
+    )
+    for p in pending:
+        p.cancel()
+    return get_task.result() if get_task in done else None
+
+
+def measure_handoffs(put, race_get, n_handoffs):
+    durations = []
+    for i in range(n_handoffs):
+        start = time.perf_counter()
+        put(i)
+        assert race_get() == i
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+@pytest.mark.timeout(120)
+def test_handoff_latency():
+    n_handoffs = 5_000
+    events = [create_in_poke_loop(asyncio.Event, POKE_LOOP) for _ in range(2)]
+
+    orders, battles = _HandoffQueue(POKE_LOOP), _HandoffQueue(POKE_LOOP)
+
+    async def echo():
+        while True:
+            await battles.async_put(await orders.async_get())
+
+    echo_task = asyncio.run_coroutine_threadsafe(echo(), POKE_LOOP)
+    latency = measure_handoffs(
+        orders.put, lambda: battles.race_get(*events), n_handoffs
+    )
+    echo_task.cancel()
+
+    queue_orders = create_in_poke_loop(asyncio.Queue, POKE_LOOP)
+    queue_battles = create_in_poke_loop(asyncio.Queue, POKE_LOOP)
+
+    async def queue_echo():
+        while True:
+            await queue_battles.put(await queue_orders.get())
+
+    echo_task = asyncio.run_coroutine_threadsafe(queue_echo(), POKE_LOOP)
+    baseline = measure_handoffs(
+        lambda i: POKE_LOOP.call_soon_threadsafe(queue_orders.put_nowait, i),
+        lambda: asyncio.run_coroutine_threadsafe(
+            _queue_race_get(queue_battles, *events), POKE_LOOP
+        ).result(),
+        n_handoffs,
+    )
+    echo_task.cancel()
+
+    print(
+        f"\nPer-step handoff latency: {latency * 1e6:.1f}us "
+        f"(asyncio queues: {baseline * 1e6:.1f}us)"
+    )
+    assert latency < baseline
+
+
 @pytest.mark.timeout(120)
 def test_env_benchmark():
     min_rate = 150
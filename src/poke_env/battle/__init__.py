@@ -1,5 +1,6 @@
 from poke_env.battle.abstract_battle import AbstractBattle
 from poke_env.battle.battle import Battle
+from poke_env.battle.battle_summary import BattleSummary
 from poke_env.battle.double_battle import DoubleBattle
 from poke_env.battle.effect import Effect
 from poke_env.battle.field import Field
@@ -17,6 +18,7 @@ from poke_env.battle.z_crystal import Z_CRYSTAL
 __all__ = [
     "AbstractBattle",
     "Battle",
+    "BattleSummary",
     "DoubleBattle",
     "Effect",
     "Field",
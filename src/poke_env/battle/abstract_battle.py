@@ -69,6 +69,7 @@ class AbstractBattle(ABC):
     }
 
     __slots__ = (
+        "_action_mask",
         "_anybody_inactive",
         "_available_moves",
         "_available_switches",
@@ -154,6 +155,8 @@ class AbstractBattle(ABC):
         # Turn choice attributes
         self.in_team_preview: bool = False
         self._wait: bool = False
+        # Legal actions of the current request as a bitmask, cached by environments
+        self._action_mask: Optional[int] = None
 
         # Battle state attributes
         self._dynamax_turn: Optional[int] = None
@@ -520,6 +523,19 @@ class AbstractBattle(ABC):
         replay_path.write_text(self._build_replay_html(), encoding="utf-8")
         return replay_path
 
+    def _copy_state_from(self, other: "AbstractBattle"):
+        """Replaces this battle's state with another battle's, keeping its identity.
+
+        :param other: The battle to copy state from.
+        :type other: AbstractBattle
+        """
+        for slot in AbstractBattle.__slots__:
+            if hasattr(other, slot):
+                setattr(self, slot, getattr(other, slot))
+        if hasattr(self, "__dict__"):
+            self.__dict__.clear()
+            self.__dict__.update(other.__dict__)
+
     def _clear_commander_from_partner(self, pokemon_identifier: str):
         pass
 
@@ -69,6 +69,7 @@ class Battle(AbstractBattle):
         :param request: Parsed JSON request object.
         :type request: dict
         """
+        self._action_mask = None
         if "wait" in request and request["wait"]:
             self._wait = True
         else:
@@ -265,6 +266,7 @@ class Battle(AbstractBattle):
     @trapped.setter
     def trapped(self, value: bool):
         self._trapped = value
+        self._action_mask = None
 
     @property
     def valid_orders(self) -> List[SingleBattleOrder]:
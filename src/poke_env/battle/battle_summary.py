@@ -0,0 +1,65 @@
+"""This module defines the compact record kept for finished battles."""
+
+from typing import NamedTuple, Optional, Tuple
+
+from poke_env.battle.abstract_battle import AbstractBattle
+
+
+class BattleSummary(NamedTuple):
+    """Outcome of a finished battle, without its state or message log."""
+
+    battle_tag: str
+    """The battle identifier."""
+    format: Optional[str]
+    """The battle's format."""
+    won: Optional[bool]
+    """Whether the player won. None if the battle ended in a tie."""
+    lost: Optional[bool]
+    """Whether the player lost. None if the battle ended in a tie."""
+    turns: int
+    """Number of turns played."""
+    player_username: Optional[str]
+    """The player's username."""
+    opponent_username: Optional[str]
+    """The opponent's username."""
+    rating: Optional[int]
+    """The player's rating after the battle, if it was received."""
+    opponent_rating: Optional[int]
+    """The opponent's rating after the battle, if it was received."""
+    team: Tuple[str, ...]
+    """Species of the player's pokemons."""
+    opponent_team: Tuple[str, ...]
+    """Species of the opponent's pokemons that were revealed."""
+
+    @classmethod
+    def from_battle(cls, battle: AbstractBattle) -> "BattleSummary":
+        """Summarizes a battle.
+
+        :param battle: The battle.
+        :type battle: AbstractBattle
+        :return: The battle's summary.
+        :rtype: BattleSummary
+        """
+        opponent_username = battle.opponent_username
+        if opponent_username is None:
+            opponent_username = next(
+                (
+                    player["username"]
+                    for player in battle._players
+                    if player["username"] != battle.player_username
+                ),
+                None,
+            )
+        return cls(
+            battle_tag=battle.battle_tag,
+            format=battle.format,
+            won=battle.won,
+            lost=battle.lost,
+            turns=battle.turn,
+            player_username=battle.player_username,
+            opponent_username=opponent_username,
+            rating=battle.rating,
+            opponent_rating=battle.opponent_rating,
+            team=tuple(mon.species for mon in battle.team.values()),
+            opponent_team=tuple(mon.species for mon in battle.opponent_team.values()),
+        )
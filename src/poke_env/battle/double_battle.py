@@ -142,6 +142,7 @@ class DoubleBattle(AbstractBattle):
         :param request: Parsed JSON request object.
         :type request: dict
         """
+        self._action_mask = None
         if self.logger is not None:
             self.logger.debug(
                 "Parsing the following request update in battle %s:\n%s",
@@ -535,6 +536,7 @@ class DoubleBattle(AbstractBattle):
     @trapped.setter
     def trapped(self, value: List[bool]):
         self._trapped = value
+        self._action_mask = None
 
     @property
     def valid_orders(self) -> List[List[SingleBattleOrder]]:
@@ -1,40 +1,385 @@
 import asyncio
 import atexit
+import logging
+import os
 import sys
+import threading
+import warnings
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import as_completed
+from itertools import count
 from logging import CRITICAL, disable
-from threading import Thread
-from typing import Any, List
+from threading import Event, Lock, Thread, get_ident
+from time import perf_counter
+from types import FrameType
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from weakref import WeakKeyDictionary, WeakSet
 
+EVENT_LOOP_ENV_VAR = "POKE_ENV_EVENT_LOOP"
+"""Environment variable selecting the event loop implementation used by poke-env.
 
-def __run_loop(loop: asyncio.AbstractEventLoop):
+Set it to ``uvloop`` to use uvloop, to ``auto`` to use uvloop if it is installed, or to
+``asyncio`` - the default - to use asyncio's loop. It is read when poke-env is
+imported."""
+
+
+def _event_loop_factory() -> Tuple[Callable[[], asyncio.AbstractEventLoop], str]:
+    requested = os.environ.get(EVENT_LOOP_ENV_VAR, "asyncio").strip().lower()
+    if requested in ("uvloop", "auto"):
+        try:
+            import uvloop
+
+            return uvloop.new_event_loop, "uvloop"
+        except ImportError:
+            if requested == "uvloop":
+                warnings.warn(
+                    "uvloop was requested but is not installed, falling back to "
+                    "asyncio's event loop. Install it with `pip install "
+                    "poke_env[uvloop]`."
+                )
+    elif requested != "asyncio":
+        warnings.warn(
+            f"Unknown {EVENT_LOOP_ENV_VAR} value '{requested}', expected 'asyncio', "
+            "'uvloop' or 'auto'. Falling back to asyncio's event loop."
+        )
+    return asyncio.new_event_loop, "asyncio"
+
+
+_new_event_loop, EVENT_LOOP_IMPLEMENTATION = _event_loop_factory()
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Creates an event loop with the implementation selected by
+    :data:`EVENT_LOOP_ENV_VAR`, which :data:`EVENT_LOOP_IMPLEMENTATION` names.
+
+    Every loop poke-env creates comes from this function.
+
+    :return: A new event loop.
+    :rtype: asyncio.AbstractEventLoop
+    """
+    return _new_event_loop()
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop):
     asyncio.set_event_loop(loop)
     loop.run_forever()
+    loop.close()
 
 
-def __stop_loop(loop: asyncio.AbstractEventLoop, thread: Thread):
+def __clear_loop():
     disable(CRITICAL)
-    tasks: List[asyncio.Task[Any]] = []
-    for task in asyncio.all_tasks(loop):
-        task.cancel()
-        tasks.append(task)
+    LIFECYCLE.shutdown(timeout=SHUTDOWN_TIMEOUT)
 
-    cancelled = False
-    shutdown = asyncio.run_coroutine_threadsafe(loop.shutdown_asyncgens(), loop)
-    shutdown.result()
 
-    while not cancelled:
-        cancelled = True
-        for task in tasks:
-            if not task.done():
-                cancelled = False
+SHUTDOWN_TIMEOUT = 5.0
+"""Default time poke-env's loops have to shut down, in seconds."""
 
-    loop.call_soon_threadsafe(loop.stop)
-    thread.join()
-    loop.call_soon_threadsafe(loop.close)
 
+class ShutdownReport(NamedTuple):
+    """Outcome of a shutdown."""
 
-def __clear_loop():
-    __stop_loop(POKE_LOOP, _t)
+    n_loops: int
+    """Number of loops stopped."""
+    n_clients: int
+    """Number of clients told to stop listening."""
+    n_cancelled: int
+    """Number of tasks cancelled that finished before the deadline."""
+    leaked_tasks: Tuple[str, ...]
+    """Tasks still running at the deadline."""
+    leaked_threads: Tuple[str, ...]
+    """Names of the loop threads and executors still running at the deadline."""
+    duration: float
+    """How long the shutdown took, in seconds."""
+    n_executors: int = 0
+    """Number of executors shut down."""
+
+
+class LifecycleManager:
+    """
+    Tracks the event loops poke-env runs in daemon threads, the clients using them and
+    the executors running work for them, and shuts them down within a deadline.
+
+    Stopping a loop first tells its clients to stop listening, then cancels its
+    remaining tasks and waits for them, then stops the loop, joins its thread and
+    closes it. Every step shares the deadline: tasks ignoring cancellation and loops
+    blocked by a callback are left behind and reported as leaked, instead of hanging
+    the caller. Executors are shut down once every loop stopped, as loop tasks may be
+    waiting on them.
+
+    poke-env uses the :data:`LIFECYCLE` instance, which stops every loop it tracks
+    when the interpreter exits.
+    """
+
+    def __init__(self):
+        self._threads: Dict[asyncio.AbstractEventLoop, Thread] = {}
+        self._clients: "WeakSet[Any]" = WeakSet()
+        self._executors: "WeakKeyDictionary[Executor, str]" = WeakKeyDictionary()
+        self._lock = Lock()
+        self._logger = logging.getLogger(f"{__name__}.{type(self).__name__}")
+
+    def start_loop(self, name: str = "poke-env-loop") -> asyncio.AbstractEventLoop:
+        """Creates a loop running forever in a daemon thread, and tracks it.
+
+        :param name: Name of the loop's thread. Defaults to "poke-env-loop".
+        :type name: str
+        :return: The loop.
+        :rtype: asyncio.AbstractEventLoop
+        """
+        loop = new_event_loop()
+        thread = Thread(target=_run_loop, args=(loop,), name=name, daemon=True)
+        thread.start()
+        with self._lock:
+            self._threads[loop] = thread
+        return loop
+
+    def track_client(self, client: Any):
+        """Tracks a client, which is told to stop listening before its loop stops.
+
+        Clients are tracked weakly.
+
+        :param client: The client. It must have a ``loop`` attribute.
+        :type client: PSClient
+        """
+        with self._lock:
+            self._clients.add(client)
+
+    def track_executor(self, executor: Executor, name: str):
+        """Tracks an executor, which is shut down by :meth:`shutdown`.
+
+        Executors are tracked weakly.
+
+        :param executor: The executor.
+        :type executor: Executor
+        :param name: Name reported if the executor does not shut down in time.
+        :type name: str
+        """
+        with self._lock:
+            self._executors[executor] = name
+
+    def untrack_executor(self, executor: Executor):
+        """Stops tracking an executor, eg. after it was shut down by its owner.
+
+        :param executor: The executor.
+        :type executor: Executor
+        """
+        with self._lock:
+            self._executors.pop(executor, None)
+
+    @property
+    def executors(self) -> List[Executor]:
+        """The tracked executors that were not shut down yet.
+
+        :return: The executors.
+        :rtype: List[Executor]
+        """
+        with self._lock:
+            return list(self._executors)
+
+    def thread(self, loop: asyncio.AbstractEventLoop) -> Optional[Thread]:
+        """Returns the thread running a tracked loop.
+
+        :param loop: The loop.
+        :type loop: asyncio.AbstractEventLoop
+        :return: The loop's thread, or None if the loop is not tracked.
+        :rtype: Thread, optional
+        """
+        return self._threads.get(loop)
+
+    @property
+    def loops(self) -> List[asyncio.AbstractEventLoop]:
+        """The tracked loops that were not stopped yet.
+
+        :return: The loops.
+        :rtype: List[asyncio.AbstractEventLoop]
+        """
+        with self._lock:
+            return list(self._threads)
+
+    def stop_loop(
+        self, loop: asyncio.AbstractEventLoop, timeout: float = SHUTDOWN_TIMEOUT
+    ) -> ShutdownReport:
+        """Stops a tracked loop. Loops that are not tracked are ignored.
+
+        :param loop: The loop.
+        :type loop: asyncio.AbstractEventLoop
+        :param timeout: How long the loop has to shut down, in seconds. Defaults to
+            SHUTDOWN_TIMEOUT.
+        :type timeout: float
+        :return: What was stopped, and what was left behind.
+        :rtype: ShutdownReport
+        """
+        return self.stop_loops([loop], timeout)
+
+    def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT) -> ShutdownReport:
+        """Stops every tracked loop, then shuts every tracked executor down.
+
+        :param timeout: How long loops and executors have to shut down, in seconds.
+            Defaults to SHUTDOWN_TIMEOUT.
+        :type timeout: float
+        :return: What was stopped, and what was left behind.
+        :rtype: ShutdownReport
+        """
+        start = perf_counter()
+        report = self.stop_loops(self.loops, timeout)
+
+        with self._lock:
+            executors = list(self._executors.items())
+            self._executors.clear()
+        shutdowns: List[Thread] = []
+        for executor, name in executors:
+            # Executors can only be waited on without a deadline: each one is shut
+            # down in its own thread, which is left behind if it takes too long
+            shutdown = Thread(
+                target=executor.shutdown,
+                kwargs={"wait": True, "cancel_futures": True},
+                name=name,
+                daemon=True,
+            )
+            shutdown.start()
+            shutdowns.append(shutdown)
+        leaked_executors: List[str] = []
+        for shutdown in shutdowns:
+            shutdown.join(max(start + timeout - perf_counter(), 0))
+            if shutdown.is_alive():
+                leaked_executors.append(shutdown.name)
+        if leaked_executors:
+            self._logger.warning(
+                "Shutdown left %d executors behind: %s",
+                len(leaked_executors),
+                ", ".join(leaked_executors),
+            )
+
+        return report._replace(
+            leaked_threads=report.leaked_threads + tuple(leaked_executors),
+            duration=perf_counter() - start,
+            n_executors=len(executors),
+        )
+
+    def stop_loops(
+        self, loops: Iterable[asyncio.AbstractEventLoop], timeout: float
+    ) -> ShutdownReport:
+        """Stops tracked loops concurrently, within a shared deadline. Loops that are
+        not tracked are ignored.
+
+        :param loops: The loops.
+        :type loops: Iterable[asyncio.AbstractEventLoop]
+        :param timeout: How long loops have to shut down, in seconds.
+        :type timeout: float
+        :return: What was stopped, and what was left behind.
+        :rtype: ShutdownReport
+        """
+        start = perf_counter()
+        deadline = start + timeout
+        with self._lock:
+            threads = {
+                loop: self._threads[loop] for loop in loops if loop in self._threads
+            }
+            # Checked before untracking anything, so that the loops stay stoppable
+            if any(thread.ident == get_ident() for thread in threads.values()):
+                raise RuntimeError("A loop can not be stopped from its own thread")
+            for loop in threads:
+                del self._threads[loop]
+            clients = [c for c in self._clients if c.loop in threads]
+
+        closings: Dict[asyncio.AbstractEventLoop, "Future[Tuple[int, List[str]]]"] = {}
+        for loop, thread in threads.items():
+            if thread.is_alive():
+                loop_clients = [c for c in clients if c.loop is loop]
+                # Leave loops time to report back before the deadline
+                closings[loop] = asyncio.run_coroutine_threadsafe(
+                    _close_loop_tasks(loop_clients, 0.9 * timeout), loop
+                )
+
+        n_cancelled = 0
+        leaked_tasks: List[str] = []
+        loops_by_closing = {closing: loop for loop, closing in closings.items()}
+        try:
+            for closing in as_completed(
+                loops_by_closing, timeout=max(deadline - perf_counter(), 0)
+            ):
+                loops_by_closing.pop(closing)
+                cancelled, pending = closing.result()
+                n_cancelled += cancelled
+                leaked_tasks.extend(pending)
+        except FutureTimeoutError:
+            # Blocked loops finish shutting down once they are unblocked
+            for loop in loops_by_closing.values():
+                leaked_tasks.append(f"{threads[loop].name} did not respond")
+
+        leaked_threads: List[str] = []
+        for loop, thread in threads.items():
+            thread.join(max(deadline - perf_counter(), 0))
+            if thread.is_alive():
+                leaked_threads.append(thread.name)
+            elif not loop.is_closed():
+                loop.close()
+
+        report = ShutdownReport(
+            n_loops=len(threads),
+            n_clients=len(clients),
+            n_cancelled=n_cancelled,
+            leaked_tasks=tuple(leaked_tasks),
+            leaked_threads=tuple(leaked_threads),
+            duration=perf_counter() - start,
+        )
+        if leaked_tasks or leaked_threads:
+            self._logger.warning(
+                "Shutdown left %d tasks and %d threads behind: %s",
+                len(leaked_tasks),
+                len(leaked_threads),
+                ", ".join(leaked_tasks + leaked_threads),
+            )
+        return report
+
+
+async def _close_loop_tasks(
+    clients: List[Any], timeout: float
+) -> Tuple[int, List[str]]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    if clients:
+        await asyncio.wait(
+            [asyncio.ensure_future(c._stop_listening()) for c in clients],
+            timeout=timeout,
+        )
+
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    pending: Set[asyncio.Task[Any]] = set()
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=max(deadline - loop.time(), 0))
+    try:
+        await asyncio.wait_for(
+            loop.shutdown_asyncgens(), timeout=max(deadline - loop.time(), 0)
+        )
+    except asyncio.TimeoutError:
+        pass
+    # The loop stops once this coroutine's result is handed to the caller, and its
+    # thread then closes it
+    loop.call_soon(loop.stop)
+    return len(tasks) - len(pending), [repr(task) for task in pending]
+
+
+LIFECYCLE = LifecycleManager()
+"""The manager tracking the loops poke-env creates."""
 
 
 async def _create_in_poke_loop_async(cls_: Any, *args: Any, **kwargs: Any) -> Any:
@@ -57,13 +402,368 @@ def create_in_poke_loop(
 
 
 async def handle_threaded_coroutines(coro: Any, loop: asyncio.AbstractEventLoop):
+    try:
+        current_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        current_loop = None
+    if current_loop is loop:
+        # Already running in the target loop: no need to hop threads
+        return await coro
     task = asyncio.run_coroutine_threadsafe(coro, loop)
     await asyncio.wrap_future(task)
     return task.result()
 
 
-POKE_LOOP = asyncio.new_event_loop()
+class LoopPool:
+    """
+    Pool of event loops, each running forever in its own daemon thread.
+
+    Players and clients default to the single ``POKE_LOOP``, which serializes the
+    client-side work of every battle in the process. A pool shards them across
+    several loops instead: each player is created with one of the pool's loops, and
+    its messages, battle updates and decisions are handled in that loop's thread.
+    Players sharded on different loops can still battle each other.
+
+    Threads share the interpreter lock, so shards mostly isolate players from each
+    other's latency; they only run Python code in parallel on free-threaded builds.
+    Spreading players over several processes is the way to use more cores otherwise.
+
+    ::
+
+        pool = LoopPool(4)
+        players = [RandomPlayer(loop=pool.next_loop()) for _ in range(100)]
+    """
+
+    def __init__(self, n_loops: int, name: str = "poke-env-loop"):
+        """
+        :param n_loops: Number of loops.
+        :type n_loops: int
+        :param name: Prefix of the loop threads' names. Defaults to "poke-env-loop".
+        :type name: str
+        """
+        if n_loops <= 0:
+            raise ValueError(f"n_loops must be positive, got {n_loops}")
+        self._loops: List[asyncio.AbstractEventLoop] = [
+            LIFECYCLE.start_loop(f"{name}-{i}") for i in range(n_loops)
+        ]
+        self._threads: List[Thread] = []
+        for loop in self._loops:
+            thread = LIFECYCLE.thread(loop)
+            assert thread is not None
+            self._threads.append(thread)
+        self._counter = count()
+
+    def __iter__(self) -> Iterator[asyncio.AbstractEventLoop]:
+        return iter(self._loops)
+
+    def __len__(self) -> int:
+        return len(self._loops)
+
+    def close(self, timeout: float = SHUTDOWN_TIMEOUT) -> ShutdownReport:
+        """Cancels every task and stops every loop of the pool.
+
+        :param timeout: How long the loops have to shut down, in seconds. Defaults to
+            SHUTDOWN_TIMEOUT.
+        :type timeout: float
+        :return: What was stopped, and what was left behind.
+        :rtype: ShutdownReport
+        """
+        return LIFECYCLE.stop_loops(self._loops, timeout)
+
+    def current_shard(self) -> int:
+        """Returns the index of the loop running the calling thread.
+
+        :return: The shard's index, or -1 if the caller does not run in the pool.
+        :rtype: int
+        """
+        ident = get_ident()
+        for i, thread in enumerate(self._threads):
+            if thread.ident == ident:
+                return i
+        return -1
+
+    def loop_for(self, key: Hashable) -> asyncio.AbstractEventLoop:
+        """Returns the loop a key is sharded on.
+
+        Keys are sharded on a stable hash of their string representation, so that a
+        given username always lands on the same loop.
+
+        :param key: The key, eg. a username.
+        :type key: Hashable
+        :return: The key's loop.
+        :rtype: asyncio.AbstractEventLoop
+        """
+        return self._loops[zlib.crc32(str(key).encode()) % len(self._loops)]
+
+    def next_loop(self) -> asyncio.AbstractEventLoop:
+        """Returns the pool's loops in turn.
+
+        :return: The next loop.
+        :rtype: asyncio.AbstractEventLoop
+        """
+        return self._loops[next(self._counter) % len(self._loops)]
+
+    @property
+    def loops(self) -> List[asyncio.AbstractEventLoop]:
+        """The pool's loops.
+
+        :return: The loops.
+        :rtype: List[asyncio.AbstractEventLoop]
+        """
+        return list(self._loops)
+
+
+POKE_LOOP = LIFECYCLE.start_loop()
 py_ver = sys.version_info
-_t = Thread(target=__run_loop, args=(POKE_LOOP,), daemon=True)
-_t.start()
+_t = LIFECYCLE.thread(POKE_LOOP)
 atexit.register(__clear_loop)
+
+
+class LoopStall(NamedTuple):
+    """A period during which a loop could not run its callbacks."""
+
+    duration: float
+    """How late the monitor's heartbeat ran, in seconds."""
+    battle_tag: Optional[str]
+    """Tag of the battle being handled when the stall was sampled, if any."""
+    task: Optional[str]
+    """Name of the task that was running when the stall was sampled, if any."""
+    stack: Tuple[str, ...]
+    """Frames that were running when the stall was sampled, as ``file:line in
+    function`` strings, innermost last. Empty if the stall ended before it was
+    sampled."""
+
+
+class LoopLagStats(NamedTuple):
+    """Snapshot of a loop's scheduling lag."""
+
+    n_samples: int
+    """Number of heartbeats measured."""
+    mean_lag: float
+    """Mean delay between a heartbeat's due time and its run, in seconds."""
+    max_lag: float
+    """Highest delay between a heartbeat's due time and its run, in seconds."""
+    n_stalls: int
+    """Number of heartbeats delayed by more than the monitor's threshold."""
+    stall_time: float
+    """Total delay of those heartbeats, in seconds."""
+
+
+class LoopLagMonitor:
+    """
+    Measures how late an event loop runs its callbacks, and attributes stalls.
+
+    A heartbeat callback is scheduled on the loop every ``interval`` seconds; the delay
+    between its due time and its run is the time other callbacks kept the loop busy,
+    eg. parsing messages, running a synchronous ``choose_move``, or blocking file I/O.
+
+    A watchdog thread checks the heartbeat. When it is more than ``threshold`` seconds
+    late, the watchdog samples the loop thread's stack, and looks for the battle being
+    handled in the frames' ``battle`` and ``self`` locals. Once the loop catches up,
+    the stall is logged and kept in :attr:`stalls`. Stalls lasting less than about
+    ``1.25 * threshold`` can end before they are sampled, and are recorded without
+    attribution.
+
+    Each loop needs its own monitor::
+
+        monitors = [LoopLagMonitor(POKE_LOOP)] + [LoopLagMonitor(l) for l in pool]
+        for monitor in monitors:
+            monitor.start()
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop = POKE_LOOP,
+        *,
+        interval: float = 0.05,
+        threshold: float = 0.1,
+        max_stalls: int = 100,
+    ):
+        """
+        :param loop: The monitored loop. Defaults to POKE_LOOP.
+        :type loop: asyncio.AbstractEventLoop
+        :param interval: Delay between heartbeats, in seconds. Defaults to 0.05.
+        :type interval: float
+        :param threshold: Lag above which a heartbeat is reported as a stall, in
+            seconds. Defaults to 0.1.
+        :type threshold: float
+        :param max_stalls: Number of recent stalls kept. Defaults to 100.
+        :type max_stalls: int
+        """
+        if interval <= 0 or threshold <= 0:
+            raise ValueError("interval and threshold must be positive")
+        self.loop = loop
+        self._interval = interval
+        self._threshold = threshold
+        self._stalls: Deque[LoopStall] = deque(maxlen=max_stalls)
+        self._logger = logging.getLogger(f"{__name__}.{type(self).__name__}")
+
+        self._thread_id: Optional[int] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._watchdog: Optional[Thread] = None
+        self._stopped = Event()
+        self._beat_id = 0
+        self._due = 0.0
+        self._sample: Optional[Tuple[int, LoopStall]] = None
+
+        self._n_samples = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._n_stalls = 0
+        self._stall_time = 0.0
+
+    def start(self):
+        """Starts monitoring. Can be called from any thread."""
+        if self._watchdog is not None:
+            return
+        self._stopped.clear()
+        self._due = perf_counter()
+        self.loop.call_soon_threadsafe(self._start_beating)
+        self._watchdog = Thread(
+            target=self._watch, name=f"{type(self).__name__}-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    def stop(self):
+        """Stops monitoring. Can be called from any thread."""
+        if self._watchdog is None:
+            return
+        self._stopped.set()
+        self._watchdog.join()
+        self._watchdog = None
+        if self.loop.is_closed():
+            return
+        if get_ident() == self._thread_id:
+            self._cancel_beat()
+        else:
+            self.loop.call_soon_threadsafe(self._cancel_beat)
+
+    def reset(self):
+        """Forgets the measured lag and recorded stalls."""
+        self._stalls.clear()
+        self._n_samples = 0
+        self._total_lag = 0.0
+        self._max_lag = 0.0
+        self._n_stalls = 0
+        self._stall_time = 0.0
+
+    def _start_beating(self):
+        self._thread_id = get_ident()
+        self._schedule_beat(perf_counter())
+
+    def _cancel_beat(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule_beat(self, now: float):
+        self._beat_id += 1
+        self._due = now + self._interval
+        self._handle = self.loop.call_later(self._interval, self._beat)
+
+    def _beat(self):
+        now = perf_counter()
+        lag = max(now - self._due, 0.0)
+        self._n_samples += 1
+        self._total_lag += lag
+        if lag > self._max_lag:
+            self._max_lag = lag
+
+        if lag > self._threshold:
+            sample = self._sample
+            if sample is not None and sample[0] == self._beat_id:
+                stall = sample[1]._replace(duration=lag)
+            else:
+                stall = LoopStall(lag, None, None, ())
+            self._n_stalls += 1
+            self._stall_time += lag
+            self._stalls.append(stall)
+            self._logger.warning(
+                "Event loop stalled for %.3fs in %s (battle: %s, task: %s)",
+                lag,
+                stall.stack[-1] if stall.stack else "an unsampled callback",
+                stall.battle_tag,
+                stall.task,
+            )
+        self._sample = None
+        if not self._stopped.is_set():
+            self._schedule_beat(now)
+
+    def _watch(self):
+        while not self._stopped.wait(self._threshold / 4):
+            beat_id = self._beat_id
+            if self._thread_id is None or perf_counter() - self._due < self._threshold:
+                continue
+            if self._sample is not None and self._sample[0] == beat_id:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self._sample = (beat_id, _attribute_stall(frame, self.loop))
+
+    @property
+    def stalls(self) -> List[LoopStall]:
+        """Recent stalls, oldest first.
+
+        :return: The stalls.
+        :rtype: List[LoopStall]
+        """
+        return list(self._stalls)
+
+    def stats(self) -> LoopLagStats:
+        """Returns a snapshot of the measured lag.
+
+        :return: The loop's lag statistics.
+        :rtype: LoopLagStats
+        """
+        return LoopLagStats(
+            n_samples=self._n_samples,
+            mean_lag=self._total_lag / self._n_samples if self._n_samples else 0.0,
+            max_lag=self._max_lag,
+            n_stalls=self._n_stalls,
+            stall_time=self._stall_time,
+        )
+
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+def _attribute_stall(
+    frame: FrameType, loop: Optional[asyncio.AbstractEventLoop] = None
+) -> LoopStall:
+    frames: List[FrameType] = []
+    current: Optional[FrameType] = frame
+    while current is not None:
+        frames.append(current)
+        current = current.f_back
+
+    battle_tag: Optional[str] = None
+    task: Optional[str] = None
+    stack: List[str] = []
+    dispatched = False
+    # Walk from the loop's callback dispatch down to the innermost running frame
+    for f in reversed(frames):
+        code = f.f_code
+        if code.co_filename.startswith(_ASYNCIO_DIR):
+            if code.co_name == "_run" and "self" in f.f_locals:
+                # A callback starts running: frames above it run the loop itself
+                dispatched = True
+                stack.clear()
+                callback = getattr(f.f_locals["self"], "_callback", None)
+                owner = getattr(callback, "__self__", None)
+                if isinstance(owner, asyncio.Task):
+                    task = owner.get_name()
+            continue
+        if code.co_filename == threading.__file__ or code is _run_loop.__code__:
+            continue
+        stack.append(f"{code.co_filename}:{f.f_lineno} in {code.co_name}")
+        for name in ("battle", "self"):
+            tag = getattr(f.f_locals.get(name), "battle_tag", None)
+            if isinstance(tag, str):
+                battle_tag = tag
+    if not dispatched and loop is not None:
+        # Loops implemented in C, such as uvloop, dispatch callbacks without a Python
+        # frame: fall back to the task the loop reports as running
+        current = asyncio.current_task(loop)
+        if current is not None:
+            task = current.get_name()
+    return LoopStall(0.0, battle_tag, task, tuple(stack))
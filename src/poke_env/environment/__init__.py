@@ -2,7 +2,21 @@ from pettingzoo.utils.env import ActionType  # type: ignore[import-untyped]
 
 from poke_env.environment.doubles_env import DoublesEnv
 from poke_env.environment.env import PokeEnv
-from poke_env.environment.single_agent_wrapper import SingleAgentWrapper
+from poke_env.environment.single_agent_wrapper import (
+    SingleAgentVectorWrapper,
+    SingleAgentWrapper,
+)
 from poke_env.environment.singles_env import SinglesEnv
+from poke_env.environment.subproc_vector_env import SubprocPokeVectorEnv
+from poke_env.environment.vector_env import PokeVectorEnv
 
-__all__ = ["ActionType", "PokeEnv", "SingleAgentWrapper", "SinglesEnv", "DoublesEnv"]
+__all__ = [
+    "ActionType",
+    "PokeEnv",
+    "PokeVectorEnv",
+    "SubprocPokeVectorEnv",
+    "SingleAgentWrapper",
+    "SingleAgentVectorWrapper",
+    "SinglesEnv",
+    "DoublesEnv",
+]
@@ -8,7 +8,7 @@ from poke_env.battle.double_battle import DoubleBattle
 from poke_env.battle.move import SPECIAL_MOVES
 from poke_env.battle.pokemon import Pokemon
 from poke_env.data import GenData
-from poke_env.environment.env import PokeEnv
+from poke_env.environment.env import PokeEnv, _unpack_bitmask
 from poke_env.player.battle_order import (
     BattleOrder,
     DefaultBattleOrder,
@@ -49,6 +49,7 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
         choose_on_teampreview: bool = True,
         fake: bool = False,
         strict: bool = True,
+        reuse_observation_buffers: bool = False,
     ):
         super().__init__(
             account_configuration1=account_configuration1,
@@ -69,6 +70,7 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
             choose_on_teampreview=choose_on_teampreview,
             fake=fake,
             strict=strict,
+            reuse_observation_buffers=reuse_observation_buffers,
         )
         gen = GenData.from_format(battle_format).gen
         action_space_size = DoublesEnv.get_action_space_size(gen)
@@ -219,7 +221,16 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
                 dynamax=(action - 7) // 20 == 3,
                 terastallize=(action - 7) // 20 == 4,
             )
-        if not fake and str(order) not in [str(o) for o in battle.valid_orders[pos]]:
+        size = DoublesEnv.get_action_space_size(battle.gen)
+        if (
+            not fake
+            and not (
+                0 <= action < size
+                and DoublesEnv.get_action_bitmask(battle) >> (pos * size + int(action))
+                & 1
+            )
+            and str(order) not in [str(o) for o in battle.valid_orders[pos]]
+        ):
             raise ValueError(
                 f"Invalid action {action} from player {battle.player_username} "
                 f"in battle {battle.battle_tag} at position {pos} - order {order} "
@@ -363,18 +374,51 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
 
     @staticmethod
     def get_action_mask(battle: DoubleBattle) -> list[int]:
-        action_mask1 = DoublesEnv.get_action_mask_individual(battle, 0)
-        action_mask2 = DoublesEnv.get_action_mask_individual(battle, 1)
-        return action_mask1 + action_mask2
+        size = DoublesEnv.get_action_space_size(battle.gen)
+        return _unpack_bitmask(DoublesEnv.get_action_bitmask(battle), 2 * size).tolist()
+
+    def write_action_mask(self, battle: DoubleBattle, out: np.ndarray):
+        out[:] = _unpack_bitmask(DoublesEnv.get_action_bitmask(battle), len(out))
 
     @staticmethod
     def get_action_mask_individual(battle: DoubleBattle, pos: int) -> list[int]:
+        size = DoublesEnv.get_action_space_size(battle.gen)
+        return _unpack_bitmask(
+            DoublesEnv.get_action_bitmask(battle) >> (pos * size), size
+        ).tolist()
+
+    @staticmethod
+    def get_action_bitmask(battle: DoubleBattle) -> int:
+        """
+        Returns the legal actions of both positions as a bitmask, where bit i is set
+        if action i is legal for the first position, and bit i + n if it is legal for
+        the second one, n being the action space size. It is computed once per
+        request and stored on the battle.
+
+        :param battle: The current battle state
+        :type battle: DoubleBattle
+
+        :return: The bitmask of legal actions.
+        :rtype: int
+        """
+        bitmask = battle._action_mask
+        if bitmask is None:
+            size = DoublesEnv.get_action_space_size(battle.gen)
+            bitmask = 0
+            for pos in range(2):
+                individual = DoublesEnv._compute_action_bitmask_individual(battle, pos)
+                bitmask |= (individual & ((1 << size) - 1)) << (pos * size)
+            if battle.last_request and not battle.teampreview:
+                battle._action_mask = bitmask
+        return bitmask
+
+    @staticmethod
+    def _compute_action_bitmask_individual(battle: DoubleBattle, pos: int) -> int:
+        switch_species = {p.base_species for p in battle.available_switches[pos]}
         switch_space = [
             i + 1
             for i, pokemon in enumerate(battle.team.values())
-            if not battle.trapped[pos]
-            and pokemon.base_species
-            in [p.base_species for p in battle.available_switches[pos]]
+            if not battle.trapped[pos] and pokemon.base_species in switch_species
         ]
         active_mon = battle.active_pokemon[pos]
         if battle._wait or (any(battle.force_switch) and not battle.force_switch[pos]):
@@ -391,13 +435,14 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
             actions = switch_space
         else:
             known_moves = list(active_mon.moves.values())[:4]
+            avail_move_ids = {m.id for m in battle.available_moves[pos]}
             move_spaces = [
                 [
                     7 + 5 * i + j + 2
                     for j in battle.get_possible_showdown_targets(move, active_mon)
                 ]
                 for i, move in enumerate(known_moves)
-                if move.id in [m.id for m in battle.available_moves[pos]]
+                if move.id in avail_move_ids
             ]
             move_space = [i for s in move_spaces for i in s]
             if (
@@ -411,8 +456,7 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
                         battle.available_moves[pos][0], active_mon
                     )
                 ]
-            avail_move_ids = [m.id for m in battle.available_moves[pos]]
-            available_z_ids = [m.id for m in active_mon.available_z_moves]
+            available_z_ids = {m.id for m in active_mon.available_z_moves}
             mega_space = [i + 20 for i in move_space if battle.can_mega_evolve[pos]]
             zmove_spaces = [
                 [
@@ -451,12 +495,10 @@ class DoublesEnv(PokeEnv[npt.NDArray[np.int64]]):
                 + dynamax_space
                 + tera_space
             )
-        actions = actions or [0]
-        action_mask = [
-            int(i in actions)
-            for i in range(DoublesEnv.get_action_space_size(battle.gen))
-        ]
-        return action_mask
+        bitmask = 0
+        for i in actions:
+            bitmask |= 1 << i
+        return bitmask or 1
 
     @staticmethod
     def get_action_space_size(gen: int) -> int:
@@ -3,14 +3,27 @@ For a black-box implementation consider using the module env_player.
 """
 
 import asyncio
+import threading
 import time
 from abc import abstractmethod
+from collections import deque
 from concurrent.futures import Future
-from threading import Thread
-from typing import Any, Awaitable, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+from typing import (
+    Any,
+    Awaitable,
+    Deque,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from weakref import WeakKeyDictionary
 
 import numpy as np
+import numpy.typing as npt
 from gymnasium import spaces
 from gymnasium.spaces import Space
 from gymnasium.spaces.utils import flatdim
@@ -22,7 +35,7 @@ from poke_env.battle.abstract_battle import AbstractBattle
 from poke_env.battle.battle import Battle
 from poke_env.battle.double_battle import DoubleBattle
 from poke_env.battle.pokemon import Pokemon
-from poke_env.concurrency import create_in_poke_loop
+from poke_env.concurrency import LIFECYCLE, SHUTDOWN_TIMEOUT
 from poke_env.player.battle_order import (
     BattleOrder,
     DoubleBattleOrder,
@@ -41,55 +54,93 @@ ItemType = TypeVar("ItemType")
 ActionType = TypeVar("ActionType")
 
 
-class _AsyncQueue(Generic[ItemType]):
-    queue: asyncio.Queue[ItemType]
+def _wake(getter: "asyncio.Future[Any]"):
+    if not getter.done():
+        getter.set_result(None)
+
+
+class _HandoffQueue(Generic[ItemType]):
+    """Queue handing items between the main thread and an event loop.
 
-    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 0):
-        self.queue = create_in_poke_loop(asyncio.Queue, loop, maxsize)
+    Putting an item wakes the oldest getter waiting in the loop with a single
+    call_soon_threadsafe, and the main thread waits for items on a threading
+    condition, without scheduling coroutines. The condition can be shared by several
+    queues, to race them against events set while notifying it.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        condition: Optional[threading.Condition] = None,
+    ):
+        self.condition = condition or threading.Condition()
         self._loop = loop
+        self._items: Deque[ItemType] = deque()
+        self._getters: Deque[asyncio.Future[None]] = deque()
 
     async def async_get(self) -> ItemType:
-        return await self.queue.get()
+        while True:
+            with self.condition:
+                if self._items:
+                    return self._items.popleft()
+                getter = self._loop.create_future()
+                self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                with self.condition:
+                    if getter in self._getters:
+                        self._getters.remove(getter)
+                        getter = None
+                    elif self._items and self._getters:
+                        # This getter was woken up for an item it will not take
+                        getter = self._getters.popleft()
+                    else:
+                        getter = None
+                if getter is not None:
+                    _wake(getter)
+                raise
 
     def get(self, timeout: Optional[float] = None) -> ItemType:
-        res = asyncio.run_coroutine_threadsafe(
-            asyncio.wait_for(self.async_get(), timeout), self._loop
-        )
-        return res.result()
+        with self.condition:
+            if not self.condition.wait_for(lambda: self._items, timeout):
+                raise asyncio.TimeoutError()
+            return self._items.popleft()
 
     def race_get(self, *events: asyncio.Event) -> Optional[ItemType]:
-        async def _race_get() -> Optional[ItemType]:
-            get_task = asyncio.create_task(self.async_get())
-            wait_tasks = [asyncio.create_task(e.wait()) for e in events]
-            done, pending = await asyncio.wait(
-                {get_task, *wait_tasks}, return_when=asyncio.FIRST_COMPLETED
+        """Waits for an item or for one of the events, which must be set while
+        notifying the condition. Returns None if an event is set first."""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self._items or any(e.is_set() for e in events)
             )
-            for p in pending:
-                p.cancel()
-            if get_task in done:
-                return get_task.result()
-            else:
-                return None
-
-        res = asyncio.run_coroutine_threadsafe(_race_get(), self._loop)
-        return res.result()
+            return self._items.popleft() if self._items else None
 
     async def async_put(self, item: ItemType):
-        await self.queue.put(item)
+        self.put(item)
 
     def put(self, item: ItemType):
-        self._loop.call_soon_threadsafe(self.queue.put_nowait, item)
+        with self.condition:
+            self._items.append(item)
+            self.condition.notify_all()
+            getter = self._getters.popleft() if self._getters else None
+        if getter is not None:
+            self._loop.call_soon_threadsafe(_wake, getter)
 
-    def empty(self):
-        return self.queue.empty()
+    def empty(self) -> bool:
+        return not self._items
 
 
 class _EnvPlayer(Player):
-    battle_queue: _AsyncQueue[AbstractBattle]
-    order_queue: _AsyncQueue[BattleOrder]
+    battle_queue: _HandoffQueue[AbstractBattle]
+    order_queue: _HandoffQueue[BattleOrder]
 
     def __init__(
-        self, *args: Any, choose_on_teampreview: bool | None = None, **kwargs: Any
+        self,
+        *args: Any,
+        choose_on_teampreview: bool | None = None,
+        condition: Optional[threading.Condition] = None,
+        **kwargs: Any,
     ):
         super().__init__(*args, **kwargs)
         if choose_on_teampreview is None:
@@ -97,8 +148,11 @@ class _EnvPlayer(Player):
                 "choose_on_teampreview arg was not set in environment - by default, teampreview decisions will be made randomly."
             )
         self._choose_on_teampreview = choose_on_teampreview or False
-        self.battle_queue = _AsyncQueue(self.ps_client.loop, maxsize=1)
-        self.order_queue = _AsyncQueue(self.ps_client.loop, maxsize=1)
+        # Shared with the opponent's queues, so that the environment can race an
+        # agent's battles against both agents' waiting and trying again events
+        self._condition = condition or threading.Condition()
+        self.battle_queue = _HandoffQueue(self.ps_client.loop, self._condition)
+        self.order_queue = _HandoffQueue(self.ps_client.loop)
         self.battle: Optional[AbstractBattle] = None
 
     def choose_move(self, battle: AbstractBattle) -> Awaitable[BattleOrder]:
@@ -150,8 +204,52 @@ class _EnvPlayer(Player):
         else:
             raise TypeError()
 
+    def _set_waiting(self, battle: AbstractBattle):
+        with self._condition:
+            super()._set_waiting(battle)
+            self._condition.notify_all()
+
+    def _set_trying_again(self, battle: AbstractBattle):
+        with self._condition:
+            super()._set_trying_again(battle)
+            self._condition.notify_all()
+
     def _battle_finished_callback(self, battle: AbstractBattle):
-        self.battle_queue.queue.put_nowait(battle)
+        self.battle_queue.put(battle)
+
+
+def _allocate_buffer(space: Space[Any]) -> Any:
+    if isinstance(space, spaces.Dict):
+        return {key: _allocate_buffer(sub) for key, sub in space.spaces.items()}
+    if isinstance(space, spaces.Tuple):
+        return tuple(_allocate_buffer(sub) for sub in space.spaces)
+    if isinstance(
+        space, (spaces.Box, spaces.Discrete, spaces.MultiBinary, spaces.MultiDiscrete)
+    ):
+        assert space.shape is not None and space.dtype is not None
+        return np.zeros(space.shape, dtype=space.dtype)
+    raise ValueError(
+        f"Observation space {space} cannot be written in place: spaces must be "
+        "composed of Box, Discrete, MultiBinary, MultiDiscrete, Dict and Tuple spaces."
+    )
+
+
+def _write_buffer(out: Any, value: Any):
+    if isinstance(out, dict):
+        for key, sub in out.items():
+            _write_buffer(sub, value[key])
+    elif isinstance(out, tuple):
+        for sub, sub_value in zip(out, value):
+            _write_buffer(sub, sub_value)
+    else:
+        out[...] = value
+
+
+def _unpack_bitmask(bitmask: int, size: int) -> npt.NDArray[np.uint8]:
+    data = (bitmask & ((1 << size) - 1)).to_bytes((size + 7) // 8, "little")
+    return np.unpackbits(
+        np.frombuffer(data, dtype=np.uint8), count=size, bitorder="little"
+    )
 
 
 class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
@@ -182,6 +280,7 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
         choose_on_teampreview: bool | None = None,
         fake: bool = False,
         strict: bool = True,
+        reuse_observation_buffers: bool = False,
     ):
         """
         :param account_configuration: Player configuration. If empty, defaults to an
@@ -243,6 +342,12 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
         :param strict: If true, action-order converters will throw an error if the move is
             illegal. Otherwise, it will return default. Defaults to True.
         :type strict: bool
+        :param reuse_observation_buffers: If true, step and reset write observations
+            into buffers allocated once per agent, with embed_battle_into and
+            write_action_mask, and return these buffers. Returned observations are
+            then overwritten by the next call and must be copied to be kept. Defaults
+            to False.
+        :type reuse_observation_buffers: bool
         """
         self.metadata = {"name": "poke-env-v0", "render_modes": ["human"]}
         self.render_mode: str | None = None
@@ -262,8 +367,10 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
         self._choose_on_teampreview = choose_on_teampreview
         self._fake = fake
         self._strict = strict
-        self._loop = asyncio.new_event_loop()
-        Thread(target=self._loop.run_forever, daemon=True).start()
+        self._reuse_observation_buffers = reuse_observation_buffers
+        self._observation_buffers: Dict[str, Dict[str, Any]] = {}
+        self._loop = LIFECYCLE.start_loop(f"{type(self).__name__}-loop")
+        condition = threading.Condition()
         self.agent1 = _EnvPlayer(
             account_configuration=account_configuration1
             or AccountConfiguration.generate(self.__class__.__name__, rand=True),
@@ -282,6 +389,7 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
             loop=self._loop,
             team=team,
             choose_on_teampreview=choose_on_teampreview,
+            condition=condition,
         )
         self.agent2 = _EnvPlayer(
             account_configuration=account_configuration2
@@ -301,6 +409,7 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
             loop=self._loop,
             team=team,
             choose_on_teampreview=choose_on_teampreview,
+            condition=condition,
         )
         self.agents: List[str] = []
         self.possible_agents = [self.agent1.username, self.agent2.username]
@@ -339,12 +448,13 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
         state["agent2"] = None
         state["_reward_buffer"] = None
         state["_challenge_task"] = None
+        state["_observation_buffers"] = {}
         return state
 
     def __setstate__(self, state: Dict[str, Any]):
         self.__dict__.update(state)
-        self._loop = asyncio.new_event_loop()
-        Thread(target=self._loop.run_forever, daemon=True).start()
+        self._loop = LIFECYCLE.start_loop(f"{type(self).__name__}-loop")
+        condition = threading.Condition()
         self.agent1 = _EnvPlayer(
             account_configuration=AccountConfiguration.generate(
                 self.__class__.__name__, rand=True
@@ -364,6 +474,7 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
             loop=self._loop,
             team=self._team,
             choose_on_teampreview=self._choose_on_teampreview,
+            condition=condition,
         )
         self.agent2 = _EnvPlayer(
             account_configuration=AccountConfiguration.generate(
@@ -384,6 +495,7 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
             loop=self._loop,
             team=self._team,
             choose_on_teampreview=self._choose_on_teampreview,
+            condition=condition,
         )
         self.agents = []
         old_names = self.possible_agents
@@ -445,14 +557,8 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
             self.agent1._trying_again.clear()
             battle2 = self.battle2
         observations = {
-            self.agents[0]: {
-                "observation": self.embed_battle(battle1),
-                "action_mask": np.array(self.get_action_mask(battle1), dtype=np.int8),
-            },
-            self.agents[1]: {
-                "observation": self.embed_battle(battle2),
-                "action_mask": np.array(self.get_action_mask(battle2), dtype=np.int8),
-            },
+            self.agents[0]: self._observation(self.agents[0], battle1),
+            self.agents[1]: self._observation(self.agents[1], battle2),
         }
         reward = {
             self.agents[0]: self.calc_reward(battle1),
@@ -503,18 +609,8 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
         self.agent1_to_move = True
         self.agent2_to_move = True
         observations = {
-            self.agents[0]: {
-                "observation": self.embed_battle(self.battle1),
-                "action_mask": np.array(
-                    self.get_action_mask(self.battle1), dtype=np.int8
-                ),
-            },
-            self.agents[1]: {
-                "observation": self.embed_battle(self.battle2),
-                "action_mask": np.array(
-                    self.get_action_mask(self.battle2), dtype=np.int8
-                ),
-            },
+            self.agents[0]: self._observation(self.agents[0], self.battle1),
+            self.agents[1]: self._observation(self.agents[1], self.battle2),
         }
         return observations, self.get_additional_info()
 
@@ -546,6 +642,18 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
             )
 
     def close(self, force: bool = True, wait: bool = True):
+        """
+        Ends the current battles. The agents stay connected, and the environment can
+        be reset again afterwards. Use :meth:`shutdown` to release its connections and
+        event loop.
+
+        :param force: If True, forfeits the ongoing battle. Defaults to True.
+        :type force: bool
+        :param wait: If True, waits for the ongoing battle to end. Defaults to True.
+        :type wait: bool
+        """
+        if LIFECYCLE.thread(self._loop) is None:
+            return
         if force:
             if self.battle1 and not self.battle1.finished:
                 assert self.battle2 is not None
@@ -581,6 +689,21 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
         while not self.agent2.battle_queue.empty():
             self.agent2.battle_queue.get()
 
+    def shutdown(self, timeout: float = SHUTDOWN_TIMEOUT):
+        """
+        Ends the current battles, then shuts down the agents' connections and event
+        loop. The environment can not be used afterwards. Calling it again does
+        nothing.
+
+        :param timeout: How long the connections and event loop have to shut down,
+            in seconds. Defaults to SHUTDOWN_TIMEOUT.
+        :type timeout: float
+        """
+        if LIFECYCLE.thread(self._loop) is None:
+            return
+        self.close()
+        LIFECYCLE.stop_loop(self._loop, timeout)
+
     def observation_space(self, agent: str) -> Space[Dict[str, Any]]:
         return self.observation_spaces[agent]
 
@@ -679,6 +802,33 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
     ###################################################################################
     # Helper methods
 
+    def embed_battle_into(self, battle: AbstractBattle, out: Any):
+        """
+        Writes the embedding of the current battle state into out, a buffer shaped
+        like the raw observation space: a numpy array, or a dict or tuple of numpy
+        arrays. Used instead of embed_battle when observation buffers are reused.
+
+        The default implementation copies the output of embed_battle. Override it to
+        fill out directly and avoid allocating a new embedding at every step.
+
+        :param battle: The current battle state.
+        :type battle: AbstractBattle
+        :param out: The buffer to write the embedding into.
+        :type out: Any
+        """
+        _write_buffer(out, self.embed_battle(battle))
+
+    def write_action_mask(self, battle: Any, out: np.ndarray):
+        """
+        Writes the action mask of the current battle state into out, in place.
+
+        :param battle: The current battle state.
+        :type battle: AbstractBattle
+        :param out: The array to write the mask into, of the action space's size.
+        :type out: np.ndarray
+        """
+        out[:] = self.get_action_mask(battle)
+
     def reward_computing_helper(
         self,
         battle: AbstractBattle,
@@ -791,6 +941,20 @@ class PokeEnv(ParallelEnv[str, Dict[str, Any], ActionType]):
                 truncated = True
         return terminated, truncated
 
+    def _observation(self, agent: str, battle: AbstractBattle) -> Dict[str, Any]:
+        if not self._reuse_observation_buffers:
+            return {
+                "observation": self.embed_battle(battle),
+                "action_mask": np.array(self.get_action_mask(battle), dtype=np.int8),
+            }
+        out = self._observation_buffers.get(agent)
+        if out is None:
+            out = _allocate_buffer(self.observation_spaces[agent])
+            self._observation_buffers[agent] = out
+        self.embed_battle_into(battle, out["observation"])
+        self.write_action_mask(battle, out["action_mask"])
+        return out
+
     def reset_battles(self):
         """Resets the player's inner battle tracker."""
         self.agent1.reset_battles()
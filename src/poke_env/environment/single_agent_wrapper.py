@@ -4,8 +4,12 @@ import numpy as np
 import numpy.typing as npt
 from gymnasium import Env
 from gymnasium.envs.registration import EnvSpec
+from gymnasium.vector import VectorEnv
+from gymnasium.vector.utils import create_empty_array
 
+from poke_env.battle.abstract_battle import AbstractBattle
 from poke_env.environment.env import ActionType, PokeEnv
+from poke_env.environment.vector_env import PokeVectorEnv
 from poke_env.player.battle_order import DefaultBattleOrder
 from poke_env.player.player import Player
 
@@ -33,43 +37,9 @@ class SingleAgentWrapper(Env[Dict[str, Any], ActionType]):
         :rtype: Tuple[Dict[str, Any], float, bool, bool, Dict[str, Any]]
         """
         assert self.env.battle2 is not None
-        if self.env.battle2.wait:
-            opp_action = self.env.order_to_action(
-                DefaultBattleOrder(),
-                self.env.battle2,
-                fake=self.env._fake,
-                strict=self.env._strict,
-            )
-        elif not self.env.battle2.teampreview:
-            opp_order = self.opponent.choose_move(self.env.battle2)
-            assert not isinstance(opp_order, Awaitable)
-            opp_action = self.env.order_to_action(
-                opp_order,
-                self.env.battle2,
-                fake=self.env._fake,
-                strict=self.env._strict,
-            )
-        elif self.env.battle2.format is None or "vgc" not in self.env.battle2.format:
-            raise NotImplementedError(
-                "Teampreview is only supported for VGC formats in SingleAgentWrapper."
-            )
-        elif self.second_teampreview_action is None:
-            tp_order = self.opponent.teampreview(self.env.battle2)
-            assert not isinstance(tp_order, Awaitable)
-            assert len(tp_order) == 10, f"{tp_order} must specify 4 slots in VGC!"
-            teampreview_order_list = [int(i) for i in tp_order[-4:]]
-            opp_action = np.array(teampreview_order_list[:2])  # type: ignore
-            self.second_teampreview_action = np.array(teampreview_order_list[2:])
-            # only the first two pokemon are selected in teampreview for now
-            for i, pokemon in enumerate(self.env.battle2.team.values(), start=1):
-                pokemon._selected_in_teampreview = i in teampreview_order_list[:2]
-        else:
-            opp_action = self.second_teampreview_action  # type: ignore
-            # now the second two pokemon are selected in teampreview
-            for i in opp_action:  # type: ignore
-                mon = list(self.env.battle2.team.values())[i - 1]
-                mon._selected_in_teampreview = True
-            self.second_teampreview_action = None
+        opp_action, self.second_teampreview_action = _opponent_action(
+            self.env, self.opponent, self.env.battle2, self.second_teampreview_action
+        )
         actions = {
             self.env.agent1.username: action,
             self.env.agent2.username: opp_action,
@@ -98,3 +68,124 @@ class SingleAgentWrapper(Env[Dict[str, Any], ActionType]):
 
     def close(self):
         self.env.close()
+
+
+class SingleAgentVectorWrapper(VectorEnv[Dict[str, Any], Any, Any]):
+    """
+    Gymnasium vector environment playing the first agent of a
+    :class:`~poke_env.environment.vector_env.PokeVectorEnv`, while ``opponent``
+    chooses the second agent's moves in every slot.
+    """
+
+    def __init__(self, env: PokeVectorEnv, opponent: Player):
+        self.env = env
+        self.opponent = opponent
+        self.num_envs = env.num_envs
+        self.metadata = {"autoreset_mode": env.metadata["autoreset_mode"]}
+        self.single_observation_space = env.single_observation_spaces[
+            env.agent1.username
+        ]
+        self.single_action_space = env.single_action_spaces[env.agent1.username]
+        self.observation_space = env.observation_spaces[env.agent1.username]
+        self.action_space = env.action_spaces[env.agent1.username]
+        self._second_teampreview_actions: Dict[str, npt.NDArray[np.int64]] = {}
+
+    def step(
+        self, actions: Any
+    ) -> Tuple[
+        Dict[str, Any],
+        npt.NDArray[np.float64],
+        npt.NDArray[np.bool_],
+        npt.NDArray[np.bool_],
+        Dict[str, Any],
+    ]:
+        """Run one timestep of every slot.
+
+        Takes the main agent's batched actions, and generates the opponent's actions
+        in slots where it is expected to move with the opponent's choose_move method.
+
+        :param actions: Batched actions of the main agent.
+        :type actions: Any
+        :return: Tuple of batched (observation, reward, terminated, truncated, info)
+            for the main agent.
+        :rtype: Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray,
+            Dict[str, Any]]
+        """
+        opp_actions = create_empty_array(
+            self.env.single_action_spaces[self.env.agent2.username], self.num_envs
+        )
+        to_move = self.env.to_move
+        for k, battle in enumerate(self.env.battles2):
+            if not to_move[k, 1]:
+                continue
+            opp_actions[k], second_action = _opponent_action(
+                self.env.env,
+                self.opponent,
+                battle,
+                self._second_teampreview_actions.pop(battle.battle_tag, None),
+            )
+            if second_action is not None:
+                self._second_teampreview_actions[battle.battle_tag] = second_action
+        obs, rewards, terms, truncs, infos = self.env.step(
+            {self.env.agent1.username: actions, self.env.agent2.username: opp_actions}
+        )
+        return (
+            obs[self.env.agent1.username],
+            rewards[self.env.agent1.username],
+            terms[self.env.agent1.username],
+            truncs[self.env.agent1.username],
+            infos[self.env.agent1.username],
+        )
+
+    def reset(
+        self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        obs, infos = self.env.reset(seed, options)
+        self._second_teampreview_actions = {}
+        self._np_random = self.env._np_random
+        return obs[self.env.agent1.username], infos[self.env.agent1.username]
+
+    def close_extras(self, **kwargs: Any):
+        self.env.close()
+
+
+def _opponent_action(
+    env: PokeEnv[ActionType],
+    opponent: Player,
+    battle: AbstractBattle,
+    second_teampreview_action: Optional[npt.NDArray[np.int64]],
+) -> Tuple[ActionType, Optional[npt.NDArray[np.int64]]]:
+    """Returns the opponent's action in battle, and the second half of its VGC
+    teampreview, to play on the next step."""
+    if battle.wait:
+        opp_action = env.order_to_action(
+            DefaultBattleOrder(), battle, fake=env._fake, strict=env._strict
+        )
+    elif not battle.teampreview:
+        opp_order = opponent.choose_move(battle)
+        assert not isinstance(opp_order, Awaitable)
+        opp_action = env.order_to_action(
+            opp_order, battle, fake=env._fake, strict=env._strict
+        )
+    elif battle.format is None or "vgc" not in battle.format:
+        raise NotImplementedError(
+            "Teampreview is only supported for VGC formats in SingleAgentWrapper."
+        )
+    elif second_teampreview_action is None:
+        tp_order = opponent.teampreview(battle)
+        assert not isinstance(tp_order, Awaitable)
+        assert len(tp_order) == 10, f"{tp_order} must specify 4 slots in VGC!"
+        teampreview_order_list = [int(i) for i in tp_order[-4:]]
+        opp_action = np.array(teampreview_order_list[:2])  # type: ignore
+        second_teampreview_action = np.array(teampreview_order_list[2:])
+        # only the first two pokemon are selected in teampreview for now
+        for i, pokemon in enumerate(battle.team.values(), start=1):
+            pokemon._selected_in_teampreview = i in teampreview_order_list[:2]
+    else:
+        opp_action = second_teampreview_action  # type: ignore
+        # now the second two pokemon are selected in teampreview
+        for i in opp_action:  # type: ignore
+            mon = list(battle.team.values())[i - 1]
+            mon._selected_in_teampreview = True
+        second_teampreview_action = None
+    return opp_action, second_teampreview_action
@@ -6,7 +6,7 @@ from gymnasium.spaces import Discrete, Space
 from poke_env.battle import Battle, Pokemon
 from poke_env.battle.move import SPECIAL_MOVES
 from poke_env.data import GenData
-from poke_env.environment.env import PokeEnv
+from poke_env.environment.env import PokeEnv, _unpack_bitmask
 from poke_env.player.battle_order import (
     BattleOrder,
     DefaultBattleOrder,
@@ -46,6 +46,7 @@ class SinglesEnv(PokeEnv[np.int64]):
         choose_on_teampreview: bool = True,
         fake: bool = False,
         strict: bool = True,
+        reuse_observation_buffers: bool = False,
     ):
         super().__init__(
             account_configuration1=account_configuration1,
@@ -66,6 +67,7 @@ class SinglesEnv(PokeEnv[np.int64]):
             choose_on_teampreview=choose_on_teampreview,
             fake=fake,
             strict=strict,
+            reuse_observation_buffers=reuse_observation_buffers,
         )
         gen = GenData.from_format(battle_format).gen
         self.action_spaces: dict[str, Space[Any]] = {
@@ -141,7 +143,14 @@ class SinglesEnv(PokeEnv[np.int64]):
                     dynamax=18 <= action.item() < 22,
                     terastallize=22 <= action.item() < 26,
                 )
-            if not fake and str(order) not in [str(o) for o in battle.valid_orders]:
+            if (
+                not fake
+                and not (
+                    action >= 0
+                    and SinglesEnv.get_action_bitmask(battle) >> int(action) & 1
+                )
+                and str(order) not in [str(o) for o in battle.valid_orders]
+            ):
                 raise ValueError(
                     f"Invalid action {action} from player {battle.player_username} "
                     f"in battle {battle.battle_tag} - converted order {order} "
@@ -231,61 +240,77 @@ class SinglesEnv(PokeEnv[np.int64]):
 
     @staticmethod
     def get_action_mask(battle: Battle) -> list[int]:
-        switch_space = [
-            i
-            for i, pokemon in enumerate(battle.team.values())
-            if not battle.trapped
-            and pokemon.base_species
-            in [p.base_species for p in battle.available_switches]
-        ]
+        return _unpack_bitmask(
+            SinglesEnv.get_action_bitmask(battle),
+            SinglesEnv.get_action_space_size(battle.gen),
+        ).tolist()
+
+    def write_action_mask(self, battle: Battle, out: np.ndarray):
+        out[:] = _unpack_bitmask(SinglesEnv.get_action_bitmask(battle), len(out))
+
+    @staticmethod
+    def get_action_bitmask(battle: Battle) -> int:
+        """
+        Returns the legal actions as a bitmask, where bit i is set if action i is
+        legal. It is computed once per request and stored on the battle.
+
+        :param battle: The current battle state
+        :type battle: Battle
+
+        :return: The bitmask of legal actions.
+        :rtype: int
+        """
+        bitmask = battle._action_mask
+        if bitmask is None:
+            bitmask = SinglesEnv._compute_action_bitmask(battle)
+            if battle.last_request and not battle.teampreview:
+                battle._action_mask = bitmask
+        return bitmask
+
+    @staticmethod
+    def _compute_action_bitmask(battle: Battle) -> int:
         if battle._wait:
-            actions = [0]
-        elif battle.active_pokemon is None:
-            actions = switch_space
-        else:
-            known_moves = list(battle.active_pokemon.moves.values())[:4]
-            move_space = [
-                i + 6
-                for i, move in enumerate(known_moves)
-                if move.id in [m.id for m in battle.available_moves]
-            ]
-            if (
-                not move_space
-                and len(battle.available_moves) == 1
-                and battle.available_moves[0].id not in SPECIAL_MOVES
-            ):
-                move_space = [6]
-            avail_move_ids = [m.id for m in battle.available_moves]
-            available_z_ids = [m.id for m in battle.active_pokemon.available_z_moves]
-            mega_space = [i + 4 for i in move_space if battle.can_mega_evolve]
-            zmove_space = [
-                i + 6 + 8
-                for i, move in enumerate(known_moves)
-                if battle.can_z_move
-                and move.id in avail_move_ids
-                and move.id in available_z_ids
-            ]
-            dynamax_space = [i + 12 for i in move_space if battle.can_dynamax]
-            tera_space = [i + 16 for i in move_space if battle.can_tera]
-            if (
-                not move_space
-                and len(battle.available_moves) == 1
-                and battle.available_moves[0].id in SPECIAL_MOVES
-            ):
-                move_space = [6]
-            actions = (
-                switch_space
-                + move_space
-                + mega_space
-                + zmove_space
-                + dynamax_space
-                + tera_space
-            )
-        action_mask = [
-            int(i in actions)
-            for i in range(SinglesEnv.get_action_space_size(battle.gen))
+            return 1
+        bitmask = 0
+        if not battle.trapped:
+            switch_species = {p.base_species for p in battle.available_switches}
+            for i, pokemon in enumerate(battle.team.values()):
+                if pokemon.base_species in switch_species:
+                    bitmask |= 1 << i
+        if battle.active_pokemon is None:
+            return bitmask
+        avail_move_ids = {m.id for m in battle.available_moves}
+        known_moves = list(battle.active_pokemon.moves.values())[:4]
+        move_space = [
+            i + 6 for i, move in enumerate(known_moves) if move.id in avail_move_ids
         ]
-        return action_mask
+        if (
+            not move_space
+            and len(battle.available_moves) == 1
+            and battle.available_moves[0].id not in SPECIAL_MOVES
+        ):
+            move_space = [6]
+        for i in move_space:
+            if battle.can_mega_evolve:
+                bitmask |= 1 << (i + 4)
+            if battle.can_dynamax:
+                bitmask |= 1 << (i + 12)
+            if battle.can_tera:
+                bitmask |= 1 << (i + 16)
+        if battle.can_z_move:
+            available_z_ids = {m.id for m in battle.active_pokemon.available_z_moves}
+            for i, move in enumerate(known_moves):
+                if move.id in avail_move_ids and move.id in available_z_ids:
+                    bitmask |= 1 << (i + 6 + 8)
+        if (
+            not move_space
+            and len(battle.available_moves) == 1
+            and battle.available_moves[0].id in SPECIAL_MOVES
+        ):
+            move_space = [6]
+        for i in move_space:
+            bitmask |= 1 << i
+        return bitmask
 
     @staticmethod
     def get_action_space_size(gen: int) -> int:
@@ -0,0 +1,432 @@
+"""This module defines a vectorized environment running PokeVectorEnvs in worker
+processes, which share their observations with the main process through shared
+memory.
+"""
+
+import copy
+import multiprocessing
+import pickle
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from gymnasium.spaces import Space
+from gymnasium.vector import AutoresetMode
+from gymnasium.vector.utils import batch_space, create_empty_array
+
+from poke_env.environment.vector_env import PokeVectorEnv
+
+_ALIGNMENT = 64
+
+_STEP = b"s"
+_CLOSE = b"c"
+_OK = b""
+_ERROR = b"!"
+
+
+class _AgentArrays(NamedTuple):
+    """An agent's batched values, shared between the main process and workers."""
+
+    observation: Any
+    action: Any
+    reward: npt.NDArray[np.float64]
+    terminated: npt.NDArray[np.bool_]
+    truncated: npt.NDArray[np.bool_]
+
+
+def _create_arrays(
+    observation_spaces: List[Space[Any]],
+    action_spaces: List[Space[Any]],
+    n: int,
+    buffer: Optional[memoryview] = None,
+) -> Tuple[List[_AgentArrays], int]:
+    """Lays each agent's batched values out in buffer, and returns them with the
+    number of bytes they use. If buffer is None, the arrays are not shared, and only
+    the number of bytes is meaningful.
+
+    The layout only depends on the spaces and n, so that every process creates the
+    same arrays from the same buffer.
+    """
+    offset = 0
+
+    def allocate(shape: Tuple[int, ...], dtype: Any) -> npt.NDArray[Any]:
+        nonlocal offset
+        dtype = np.dtype(dtype)
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        if buffer is None:
+            array = np.empty(shape, dtype=dtype)
+        else:
+            array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += int(np.prod(shape)) * dtype.itemsize
+        return array
+
+    arrays = [
+        _AgentArrays(
+            observation=create_empty_array(observation_space, n, fn=allocate),
+            action=create_empty_array(action_space, n, fn=allocate),
+            reward=allocate((n,), np.float64),
+            terminated=allocate((n,), np.bool_),
+            truncated=allocate((n,), np.bool_),
+        )
+        for observation_space, action_space in zip(observation_spaces, action_spaces)
+    ]
+    for agent_arrays in arrays:
+        for leaf in _leaves(agent_arrays):
+            if not isinstance(leaf, np.ndarray):
+                raise ValueError(
+                    "Spaces must be composed of Box, Discrete, MultiDiscrete and "
+                    "MultiBinary spaces to be shared between processes."
+                )
+    return arrays, offset
+
+
+def _leaves(tree: Any) -> List[Any]:
+    if isinstance(tree, dict):
+        return [leaf for value in tree.values() for leaf in _leaves(value)]
+    if isinstance(tree, tuple):
+        return [leaf for value in tree for leaf in _leaves(value)]
+    return [tree]
+
+
+def _slice(tree: Any, start: int, stop: int) -> Any:
+    if isinstance(tree, dict):
+        return {key: _slice(value, start, stop) for key, value in tree.items()}
+    if isinstance(tree, tuple):
+        values = [_slice(value, start, stop) for value in tree]
+        return type(tree)(*values) if hasattr(tree, "_fields") else tuple(values)
+    return tree[start:stop]
+
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name, track=False)  # type: ignore[call-arg]
+    except TypeError:
+        # Before Python 3.13, attaching registers the block with the resource tracker
+        # workers share with the main process, which unlinks it
+        return SharedMemory(name)
+
+
+def _encode_tags(tags: List[Optional[str]]) -> bytes:
+    # Battle tags never contain newlines, and empty slots have no tag
+    return "\n".join(tag or "" for tag in tags).encode()
+
+
+def _decode_tags(payload: bytes) -> List[Optional[str]]:
+    return [tag or None for tag in payload.decode().split("\n")]
+
+
+def _send_error(conn: Connection, exception: Exception):
+    try:
+        payload = pickle.dumps(exception)
+    except Exception:
+        payload = pickle.dumps(RuntimeError(traceback.format_exc()))
+    conn.send_bytes(_ERROR + payload)
+
+
+def _worker(env_fn: Callable[[], PokeVectorEnv], conn: Connection):
+    try:
+        env = env_fn()
+        conn.send(
+            (
+                env.num_envs,
+                [env.single_observation_spaces[a] for a in env.possible_agents],
+                [env.single_action_spaces[a] for a in env.possible_agents],
+            )
+        )
+    except Exception as exception:
+        conn.send(exception)
+        return
+
+    name, start, stop, total = conn.recv()
+    shared_memory = _attach(name)
+    try:
+        arrays, _ = _create_arrays(
+            [env.single_observation_spaces[a] for a in env.possible_agents],
+            [env.single_action_spaces[a] for a in env.possible_agents],
+            total,
+            shared_memory.buf,
+        )
+        arrays = [_slice(agent_arrays, start, stop) for agent_arrays in arrays]
+        env._observation_buffers = {
+            agent: agent_arrays.observation
+            for agent, agent_arrays in zip(env.possible_agents, arrays)
+        }
+        while True:
+            try:
+                command = conn.recv_bytes()
+            except EOFError:
+                # The main process is gone
+                env.close()
+                return
+            try:
+                if command == _STEP:
+                    _, rewards, terminated, truncated, _ = env.step(
+                        {
+                            agent: agent_arrays.action
+                            for agent, agent_arrays in zip(env.possible_agents, arrays)
+                        }
+                    )
+                    for agent, agent_arrays in zip(env.possible_agents, arrays):
+                        agent_arrays.reward[:] = rewards[agent]
+                        agent_arrays.terminated[:] = terminated[agent]
+                        agent_arrays.truncated[:] = truncated[agent]
+                elif command == _CLOSE:
+                    env.close()
+                    conn.send_bytes(_OK)
+                    return
+                else:
+                    seed, options = pickle.loads(command)
+                    env.reset(seed, options)
+                    for agent_arrays in arrays:
+                        agent_arrays.reward[:] = 0.0
+                        agent_arrays.terminated[:] = False
+                        agent_arrays.truncated[:] = False
+            except Exception as exception:
+                _send_error(conn, exception)
+            else:
+                conn.send_bytes(_OK + _encode_tags(env._slots))
+    finally:
+        # Arrays viewing the block must be released before it can be closed
+        arrays = []
+        env._observation_buffers = None
+        try:
+            shared_memory.close()
+        except BufferError:
+            pass
+
+
+class SubprocPokeVectorEnv:
+    """
+    Runs :class:`~poke_env.environment.vector_env.PokeVectorEnv` in worker processes,
+    to spread battles over several cores.
+
+    Each worker creates its vector environment by calling one of ``env_fns``, so that
+    players and event loops are never pickled. Observations, action masks, rewards,
+    done flags and actions live in a shared memory block: workers embed battles
+    straight into it, and the main process only signals each step to the workers,
+    without pickling any value.
+
+    The API, slots and infos are the same as :class:`PokeVectorEnv`'s, with the
+    workers' slots concatenated in order. As usernames differ between workers, agents
+    are named ``agent1`` and ``agent2``. Battle tags are the only values sent back
+    through the workers' pipes.
+
+    Functions in ``env_fns`` must be picklable, eg. defined at the top level of a
+    module, or partial applications of such functions::
+
+        def make_env(num_envs):
+            return PokeVectorEnv(MySinglesEnv(start_listening=False), num_envs)
+
+        env = SubprocPokeVectorEnv([partial(make_env, 16)] * 4)
+    """
+
+    metadata: Dict[str, Any] = {
+        "name": "poke-env-vector-v0",
+        "autoreset_mode": AutoresetMode.NEXT_STEP,
+    }
+
+    def __init__(
+        self,
+        env_fns: List[Callable[[], PokeVectorEnv]],
+        *,
+        copy: bool = True,
+        context: Optional[str] = "spawn",
+    ):
+        """
+        :param env_fns: Functions creating each worker's vector environment.
+        :type env_fns: List[Callable[[], PokeVectorEnv]]
+        :param copy: If True, step and reset return copies of the shared
+            observations. Otherwise, they return arrays overwritten by the next step.
+            Defaults to True.
+        :type copy: bool
+        :param context: Multiprocessing start method. Defaults to spawn.
+        :type context: str, optional
+        """
+        if not env_fns:
+            raise ValueError("env_fns must not be empty")
+        self.copy = copy
+        ctx = multiprocessing.get_context(context)
+        self._conns: List[Connection] = []
+        self._processes: List[Any] = []
+        self._shared_memory: Optional[SharedMemory] = None
+        self.closed = False
+        for env_fn in env_fns:
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker, args=(env_fn, child_conn), daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+        try:
+            specs = [conn.recv() for conn in self._conns]
+            for spec in specs:
+                if isinstance(spec, Exception):
+                    raise spec
+            sizes = [num_envs for num_envs, _, _ in specs]
+            _, observation_spaces, action_spaces = specs[0]
+            if any(spec[1:] != (observation_spaces, action_spaces) for spec in specs):
+                raise ValueError("Workers' environments must have the same spaces")
+            _, nbytes = _create_arrays(observation_spaces, action_spaces, sum(sizes))
+        except BaseException:
+            self._terminate()
+            raise
+
+        self.num_envs = sum(sizes)
+        self._battle_tags: List[Optional[str]] = [None] * self.num_envs
+        self.agents: List[str] = []
+        self.possible_agents = ["agent1", "agent2"]
+        self.single_observation_spaces = dict(
+            zip(self.possible_agents, observation_spaces)
+        )
+        self.single_action_spaces = dict(zip(self.possible_agents, action_spaces))
+        self.observation_spaces = {
+            agent: batch_space(space, self.num_envs)
+            for agent, space in self.single_observation_spaces.items()
+        }
+        self.action_spaces = {
+            agent: batch_space(space, self.num_envs)
+            for agent, space in self.single_action_spaces.items()
+        }
+
+        self._shared_memory = SharedMemory(create=True, size=max(nbytes, 1))
+        arrays, _ = _create_arrays(
+            observation_spaces, action_spaces, self.num_envs, self._shared_memory.buf
+        )
+        self._arrays = dict(zip(self.possible_agents, arrays))
+        start = 0
+        for conn, size in zip(self._conns, sizes):
+            conn.send((self._shared_memory.name, start, start + size, self.num_envs))
+            start += size
+
+    def reset(
+        self, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Forfeits the ongoing battles, and starts new ones in every slot.
+
+        :param seed: Seed of the workers' random generators. Worker i is seeded with
+            seed + i. Optional.
+        :type seed: int, optional
+        :param options: Passed to the workers' environments.
+        :type options: Dict[str, Any], optional
+        :return: Each agent's batched observations, and infos.
+        :rtype: Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]
+        """
+        self.agents = list(self.possible_agents)
+        self._call(
+            [
+                pickle.dumps((None if seed is None else seed + i, options))
+                for i in range(len(self._conns))
+            ]
+        )
+        return self._observations(), self._infos()
+
+    def step(
+        self, actions: Dict[str, Any]
+    ) -> Tuple[
+        Dict[str, Any],
+        Dict[str, npt.NDArray[np.float64]],
+        Dict[str, npt.NDArray[np.bool_]],
+        Dict[str, npt.NDArray[np.bool_]],
+        Dict[str, Dict[str, Any]],
+    ]:
+        """Writes the agents' actions in shared memory, and waits for every worker to
+        step.
+
+        :param actions: Each agent's batched actions.
+        :type actions: Dict[str, Any]
+        :return: Each agent's batched observations, rewards, terminated and truncated
+            flags, and infos.
+        :rtype: Tuple[Dict[str, Any], Dict[str, np.ndarray], Dict[str, np.ndarray],
+            Dict[str, np.ndarray], Dict[str, Dict[str, Any]]]
+        """
+        for agent, agent_arrays in self._arrays.items():
+            agent_arrays.action[...] = actions[agent]
+        self._call([_STEP] * len(self._conns))
+        return (
+            self._observations(),
+            {agent: arrays.reward.copy() for agent, arrays in self._arrays.items()},
+            {agent: arrays.terminated.copy() for agent, arrays in self._arrays.items()},
+            {agent: arrays.truncated.copy() for agent, arrays in self._arrays.items()},
+            self._infos(),
+        )
+
+    def close(self, timeout: Optional[float] = None):
+        """Closes the workers' environments, stops the workers and frees the shared
+        memory.
+
+        :param timeout: How long each worker has to stop before being terminated, in
+            seconds. If None, waits for them.
+        :type timeout: float, optional
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for conn in self._conns:
+            try:
+                conn.send_bytes(_CLOSE)
+            except (BrokenPipeError, OSError):
+                pass
+        for conn, process in zip(self._conns, self._processes):
+            if conn.poll(timeout):
+                try:
+                    conn.recv_bytes()
+                except (EOFError, OSError):
+                    pass
+            process.join(timeout)
+        self._terminate()
+
+    def observation_space(self, agent: str) -> Space[Any]:
+        return self.observation_spaces[agent]
+
+    def action_space(self, agent: str) -> Space[Any]:
+        return self.action_spaces[agent]
+
+    def _call(self, commands: List[bytes]):
+        for conn, command in zip(self._conns, commands):
+            conn.send_bytes(command)
+        errors = []
+        battle_tags: List[Optional[str]] = []
+        for conn in self._conns:
+            response = conn.recv_bytes()
+            if response.startswith(_ERROR):
+                errors.append(pickle.loads(response[len(_ERROR) :]))
+            else:
+                battle_tags.extend(_decode_tags(response[len(_OK) :]))
+        if errors:
+            raise errors[0]
+        self._battle_tags = battle_tags
+
+    def _observations(self) -> Dict[str, Any]:
+        observations = {
+            agent: arrays.observation for agent, arrays in self._arrays.items()
+        }
+        return copy.deepcopy(observations) if self.copy else observations
+
+    def _infos(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            agent: {"battle_tag": np.array(self._battle_tags)}
+            for agent in self.possible_agents
+        }
+
+    def _terminate(self):
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        if self._shared_memory is not None:
+            self._arrays = {}
+            try:
+                self._shared_memory.close()
+            except BufferError:
+                # Observations returned with copy=False still view the block
+                pass
+            self._shared_memory.unlink()
+            self._shared_memory = None
@@ -0,0 +1,538 @@
+"""This module defines a vectorized environment running several battles over the same
+pair of connections.
+"""
+
+import asyncio
+import queue
+import sys
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+from gymnasium.spaces import Space
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode
+from gymnasium.vector.utils import batch_space, concatenate, create_empty_array
+from numpy.random import Generator
+
+from poke_env.battle.abstract_battle import AbstractBattle
+from poke_env.concurrency import LIFECYCLE, SHUTDOWN_TIMEOUT
+from poke_env.environment.env import PokeEnv, _EnvPlayer
+from poke_env.player.battle_order import BattleOrder, _EmptyBattleOrder
+from poke_env.ps_client import AccountConfiguration
+
+_REQUEST = "request"
+_WAIT = "wait"
+_RETRY = "retry"
+_FINISHED = "finished"
+
+# (agent index, kind, battle, future resolving to the agent's order)
+_Update = Tuple[int, str, AbstractBattle, Optional["asyncio.Future[BattleOrder]"]]
+
+
+def _row(batch: Any, k: int) -> Any:
+    if isinstance(batch, dict):
+        return {key: _row(sub, k) for key, sub in batch.items()}
+    if isinstance(batch, tuple):
+        return tuple(_row(sub, k) for sub in batch)
+    return batch[k, ...]
+
+
+class _VectorEnvPlayer(_EnvPlayer):
+    """Env player reporting each of its battles' events to a vectorized environment,
+    through a thread-safe queue read by the main thread."""
+
+    def __init__(
+        self, updates: "queue.SimpleQueue[_Update]", index: int, **kwargs: Any
+    ):
+        super().__init__(**kwargs)
+        self._updates = updates
+        self._index = index
+
+    async def _choose_move(self, battle: AbstractBattle) -> BattleOrder:
+        future: asyncio.Future[BattleOrder] = asyncio.get_running_loop().create_future()
+        self._updates.put((self._index, _REQUEST, battle, future))
+        return await future
+
+    def _set_waiting(self, battle: AbstractBattle):
+        self._updates.put((self._index, _WAIT, battle, None))
+
+    def _set_trying_again(self, battle: AbstractBattle):
+        self._updates.put((self._index, _RETRY, battle, None))
+
+    def _battle_finished_callback(self, battle: AbstractBattle):
+        self._updates.put((self._index, _FINISHED, battle, None))
+
+
+class _BattleState:
+    """What the main thread knows about a battle: each agent's battle object, pending
+    order and unread events.
+
+    Battle objects are updated by the event loop, so whether the battle ended is read
+    from the events, in the order the agents saw them.
+    """
+
+    def __init__(self):
+        self.battles: List[Optional[AbstractBattle]] = [None, None]
+        self.futures: List[Optional[asyncio.Future[BattleOrder]]] = [None, None]
+        self.updates: Tuple[Deque[_Update], Deque[_Update]] = (deque(), deque())
+        self.ended = [False, False]
+
+    def read(self, a: int) -> Tuple[str, Optional["asyncio.Future[BattleOrder]"]]:
+        _, kind, battle, future = self.updates[a].popleft()
+        if kind != _RETRY:
+            self.battles[a] = battle
+        if kind == _FINISHED:
+            self.ended[a] = True
+        return kind, future
+
+
+def _set_orders(orders: List[Tuple["asyncio.Future[BattleOrder]", BattleOrder]]):
+    for future, order in orders:
+        if not future.done():
+            future.set_result(order)
+
+
+class PokeVectorEnv:
+    """
+    Runs ``num_envs`` battles of a :class:`~poke_env.environment.env.PokeEnv`
+    concurrently, over a single pair of connections.
+
+    The vector environment follows the PettingZoo parallel API, with batched values:
+    for each agent, actions, observations, rewards and done flags are stacked along a
+    first axis of size ``num_envs``, as in Gymnasium vector environments. Each index
+    is a slot playing one battle at a time. Battles are embedded, rewarded and
+    converted to orders by the wrapped environment's methods.
+
+    Slots are reset automatically, following Gymnasium's next-step mode: the step
+    after a slot's battle ended ignores the slot's actions, and returns the first
+    observation of a new battle, with a reward of 0.
+
+    If the wrapped environment reuses its observation buffers, battles are written
+    directly into each agent's batched observation, which is overwritten by the next
+    step.
+
+    ::
+
+        env = MySinglesEnv(start_listening=False)
+        vec_env = PokeVectorEnv(env, num_envs=16)
+        observations, infos = vec_env.reset()
+        actions = {agent: policy(observations[agent]) for agent in vec_env.agents}
+        observations, rewards, terminated, truncated, infos = vec_env.step(actions)
+    """
+
+    metadata: Dict[str, Any] = {
+        "name": "poke-env-vector-v0",
+        "autoreset_mode": AutoresetMode.NEXT_STEP,
+    }
+
+    def __init__(
+        self,
+        env: PokeEnv[Any],
+        num_envs: int,
+        *,
+        account_configuration1: Optional[AccountConfiguration] = None,
+        account_configuration2: Optional[AccountConfiguration] = None,
+        start_listening: bool = True,
+    ):
+        """
+        :param env: The environment defining observations, rewards and actions. Its
+            configuration, eg. its battle format, server configuration and team, is
+            used for the vector environment's agents. It should be created with
+            start_listening=False, as its own agents are not used.
+        :type env: PokeEnv
+        :param num_envs: Number of battles played concurrently.
+        :type num_envs: int
+        :param account_configuration1: First agent's configuration. If empty, defaults
+            to an automatically generated username with no password.
+        :type account_configuration1: AccountConfiguration, optional
+        :param account_configuration2: Second agent's configuration. If empty, defaults
+            to an automatically generated username with no password.
+        :type account_configuration2: AccountConfiguration, optional
+        :param start_listening: Whether to start listening to the server. Defaults to
+            True.
+        :type start_listening: bool
+        """
+        if num_envs <= 0:
+            raise ValueError(f"num_envs must be positive, got {num_envs}")
+        self.env = env
+        self.num_envs = num_envs
+        self._loop = LIFECYCLE.start_loop(f"{type(self).__name__}-loop")
+        self._updates: queue.SimpleQueue[_Update] = queue.SimpleQueue()
+        self.agent1, self.agent2 = (
+            _VectorEnvPlayer(
+                self._updates,
+                index,
+                account_configuration=account_configuration
+                or AccountConfiguration.generate(type(env).__name__, rand=True),
+                avatar=env._avatar,
+                battle_format=env._battle_format,
+                log_level=env._log_level,
+                max_concurrent_battles=num_envs,
+                max_retained_battles=num_envs,
+                save_replays=env._save_replays,
+                server_configuration=env._server_configuration,
+                accept_open_team_sheet=env._accept_open_team_sheet,
+                start_timer_on_battle_start=env._start_timer_on_battle_start,
+                start_listening=start_listening,
+                open_timeout=env._open_timeout,
+                ping_interval=env._ping_interval,
+                ping_timeout=env._ping_timeout,
+                loop=self._loop,
+                team=env._team,
+                choose_on_teampreview=env._choose_on_teampreview,
+            )
+            for index, account_configuration in enumerate(
+                (account_configuration1, account_configuration2)
+            )
+        )
+        self.agents: List[str] = []
+        self.possible_agents = [self.agent1.username, self.agent2.username]
+        self.single_observation_spaces: Dict[str, Space[Any]] = {
+            agent: env.observation_spaces[env_agent]
+            for agent, env_agent in zip(self.possible_agents, env.possible_agents)
+        }
+        self.single_action_spaces: Dict[str, Space[Any]] = {
+            agent: env.action_spaces[env_agent]
+            for agent, env_agent in zip(self.possible_agents, env.possible_agents)
+        }
+        self.observation_spaces = {
+            agent: batch_space(space, num_envs)
+            for agent, space in self.single_observation_spaces.items()
+        }
+        self.action_spaces = {
+            agent: batch_space(space, num_envs)
+            for agent, space in self.single_action_spaces.items()
+        }
+        self._np_random: Optional[Generator] = None
+        self._challenge_task: Optional[Future[Any]] = None
+        self._states: Dict[str, _BattleState] = {}
+        self._unclaimed: Deque[str] = deque()
+        self._slots: List[Optional[str]] = [None] * num_envs
+        self._to_move = np.zeros((num_envs, 2), dtype=bool)
+        # Arrays observations are written into, instead of new ones
+        self._observation_buffers: Optional[Dict[str, Any]] = None
+
+    ###################################################################################
+    # PettingZoo API, with batched values
+
+    def reset(
+        self, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Forfeits the ongoing battles, and starts new ones in every slot.
+
+        :param seed: Seed of the environment's random generator. Optional.
+        :type seed: int, optional
+        :param options: Unused.
+        :type options: Dict[str, Any], optional
+        :return: Each agent's batched observations, and infos.
+        :rtype: Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]
+        """
+        self.agents = list(self.possible_agents)
+        if seed is not None:
+            self._np_random, seed = seeding.np_random(seed)
+        if self._challenge_task is None:
+            self._start_challenges()
+        else:
+            claimed = [tag for tag in self._slots if tag is not None]
+            self._forfeit(claimed)
+            for k in range(self.num_envs):
+                self._release(k)
+        self._wait({(k, a) for k in range(self.num_envs) for a in (0, 1)})
+        return self._observations(), self._infos()
+
+    def step(
+        self, actions: Dict[str, Any]
+    ) -> Tuple[
+        Dict[str, Any],
+        Dict[str, npt.NDArray[np.float64]],
+        Dict[str, npt.NDArray[np.bool_]],
+        Dict[str, npt.NDArray[np.bool_]],
+        Dict[str, Dict[str, Any]],
+    ]:
+        """Sends the agents' orders in every slot, and waits for each slot's next
+        state.
+
+        :param actions: Each agent's batched actions. Actions of agents that are not
+            expected to move, and of slots being reset, are ignored.
+        :type actions: Dict[str, Any]
+        :return: Each agent's batched observations, rewards, terminated and truncated
+            flags, and infos.
+        :rtype: Tuple[Dict[str, Any], Dict[str, np.ndarray], Dict[str, np.ndarray],
+            Dict[str, np.ndarray], Dict[str, Dict[str, Any]]]
+        """
+        orders: List[Tuple[asyncio.Future[BattleOrder], BattleOrder]] = []
+        reset = np.zeros(self.num_envs, dtype=bool)
+        for k, tag in enumerate(self._slots):
+            assert tag is not None, "reset must be called before step"
+            state = self._states[tag]
+            if any(state.ended):
+                self._release(k)
+                reset[k] = True
+                continue
+            for a, agent in enumerate(self.possible_agents):
+                if not self._to_move[k, a]:
+                    continue
+                self._to_move[k, a] = False
+                battle, future = state.battles[a], state.futures[a]
+                assert battle is not None and future is not None
+                state.futures[a] = None
+                order = self.env.action_to_order(
+                    actions[agent][k],
+                    battle,
+                    fake=self.env._fake,
+                    strict=self.env._strict,
+                )
+                orders.append((future, order))
+        if orders:
+            self._loop.call_soon_threadsafe(_set_orders, orders)
+        self._wait({(k, a) for k in range(self.num_envs) for a in (0, 1)})
+
+        rewards, terminated, truncated = {}, {}, {}
+        for a, agent in enumerate(self.possible_agents):
+            battles = self._battles(a)
+            rewards[agent] = np.array(
+                [
+                    0.0 if reset[k] else self.env.calc_reward(battle)
+                    for k, battle in enumerate(battles)
+                ]
+            )
+            term_trunc = [self.env.calc_term_trunc(battle) for battle in battles]
+            terminated[agent] = np.array([term for term, _ in term_trunc])
+            truncated[agent] = np.array([trunc for _, trunc in term_trunc])
+        return self._observations(), rewards, terminated, truncated, self._infos()
+
+    def close(self, force: bool = True, timeout: float = SHUTDOWN_TIMEOUT):
+        """
+        Stops starting battles, then shuts down the agents' connections and event
+        loop, and shuts the wrapped environment down. The vector environment can not
+        be used afterwards.
+
+        :param force: If True, forfeits the ongoing battles and waits for them to end.
+            Defaults to True.
+        :type force: bool
+        :param timeout: How long the connections and event loop have to shut down,
+            in seconds. Defaults to SHUTDOWN_TIMEOUT.
+        :type timeout: float
+        """
+        if LIFECYCLE.thread(self._loop) is None:
+            return
+        if self._challenge_task is not None:
+            self._challenge_task.cancel()
+            self._challenge_task = None
+        if force:
+            try:
+                self._forfeit(list(self._states), timeout)
+            except queue.Empty:
+                pass
+        self._states.clear()
+        self._unclaimed.clear()
+        self._slots = [None] * self.num_envs
+        self._to_move[:] = False
+        LIFECYCLE.stop_loop(self._loop, timeout)
+        self.env.shutdown(timeout)
+
+    def observation_space(self, agent: str) -> Space[Any]:
+        return self.observation_spaces[agent]
+
+    def action_space(self, agent: str) -> Space[Any]:
+        return self.action_spaces[agent]
+
+    @property
+    def battles1(self) -> List[AbstractBattle]:
+        """The first agent's battle in each slot.
+
+        :return: The battles.
+        :rtype: List[AbstractBattle]
+        """
+        return self._battles(0)
+
+    @property
+    def battles2(self) -> List[AbstractBattle]:
+        """The second agent's battle in each slot.
+
+        :return: The battles.
+        :rtype: List[AbstractBattle]
+        """
+        return self._battles(1)
+
+    @property
+    def to_move(self) -> npt.NDArray[np.bool_]:
+        """Whether each agent is expected to move in each slot.
+
+        :return: A boolean array of shape (num_envs, 2).
+        :rtype: np.ndarray
+        """
+        return self._to_move.copy()
+
+    ###################################################################################
+    # Slots management
+
+    def _start_challenges(self):
+        self._challenge_task = asyncio.run_coroutine_threadsafe(
+            self.agent1.battle_against(self.agent2, n_battles=sys.maxsize), self._loop
+        )
+
+    def _battles(self, a: int) -> List[AbstractBattle]:
+        battles = []
+        for tag in self._slots:
+            assert tag is not None
+            battle = self._states[tag].battles[a]
+            assert battle is not None
+            battles.append(battle)
+        return battles
+
+    def _release(self, k: int):
+        tag = self._slots[k]
+        if tag is None:
+            return
+        state = self._states.pop(tag)
+        orders = [(f, _EmptyBattleOrder()) for f in state.futures if f is not None]
+        if orders:
+            self._loop.call_soon_threadsafe(_set_orders, orders)
+        self._slots[k] = None
+        self._to_move[k] = False
+
+    def _route(self, update: _Update):
+        a, kind, battle, future = update
+        state = self._states.get(battle.battle_tag)
+        if state is None:
+            if battle.finished:
+                # Late events of a released battle
+                if future is not None:
+                    self._loop.call_soon_threadsafe(
+                        _set_orders, [(future, _EmptyBattleOrder())]
+                    )
+                return
+            state = self._states[battle.battle_tag] = _BattleState()
+            self._unclaimed.append(battle.battle_tag)
+        # A rejected choice means that the opponent will not be asked to move until
+        # the agent chose again
+        target = 1 - a if kind == _RETRY else a
+        state.updates[target].append(update)
+
+    def _next_update(self) -> _Update:
+        if None not in self._slots:
+            return self._updates.get()
+        try:
+            return self._updates.get(timeout=self.env._challenge_timeout)
+        except queue.Empty:
+            if self._challenge_task is not None and self._challenge_task.done():
+                self._challenge_task.result()
+            raise asyncio.TimeoutError("Agent is not challenging")
+
+    def _settle(self, k: int, a: int) -> bool:
+        tag = self._slots[k]
+        if tag is None:
+            return False
+        state = self._states[tag]
+        if not state.updates[a]:
+            return False
+        kind, future = state.read(a)
+        if kind == _REQUEST:
+            assert future is not None
+            state.futures[a] = future
+            self._to_move[k, a] = True
+        return True
+
+    def _wait(self, unsettled: Set[Tuple[int, int]]):
+        """Reads events until each of the given agents, identified by their slot and
+        agent indices, got a request, or was told it will not get one.
+
+        Free slots claim new battles on the way. Once a slot's battle ended for one
+        agent, the slot also waits for the other agent to see the battle end.
+        """
+        while True:
+            if self._unclaimed:
+                for k, tag in enumerate(self._slots):
+                    if tag is None and self._unclaimed:
+                        self._slots[k] = self._unclaimed.popleft()
+            unsettled = {(k, a) for k, a in unsettled if not self._settle(k, a)}
+            if not unsettled:
+                for k, tag in enumerate(self._slots):
+                    state = self._states[tag] if tag is not None else None
+                    if state is not None and any(state.ended):
+                        unsettled.update(
+                            (k, a) for a, ended in enumerate(state.ended) if not ended
+                        )
+                if not unsettled:
+                    return
+                continue
+            self._route(self._next_update())
+
+    def _forfeit(self, tags: List[str], timeout: Optional[float] = None):
+        """Forfeits battles, and waits for both agents to see them end.
+
+        Raises queue.Empty if no event is received for timeout seconds.
+        """
+        tags = [tag for tag in tags if not all(self._states[tag].ended)]
+        if not tags:
+            return
+        asyncio.run_coroutine_threadsafe(self._send_forfeits(tags), self._loop).result()
+        while True:
+            orders = []
+            for tag in tags:
+                state = self._states[tag]
+                for a in (0, 1):
+                    while state.updates[a]:
+                        _, future = state.read(a)
+                        if future is not None:
+                            orders.append((future, _EmptyBattleOrder()))
+                    if state.futures[a] is not None:
+                        orders.append((state.futures[a], _EmptyBattleOrder()))
+                        state.futures[a] = None
+            if orders:
+                self._loop.call_soon_threadsafe(_set_orders, orders)
+            if all(all(self._states[tag].ended) for tag in tags):
+                return
+            self._route(self._updates.get(timeout=timeout))
+
+    async def _send_forfeits(self, tags: List[str]):
+        for tag in tags:
+            await self.agent1.ps_client.send_message("/forfeit", tag)
+
+    def _observations(self) -> Dict[str, Any]:
+        if self.env._reuse_observation_buffers:
+            return self._write_observations()
+        observations = {}
+        for a, agent in enumerate(self.possible_agents):
+            space = self.single_observation_spaces[agent]
+            observations[agent] = concatenate(
+                space,
+                [
+                    {
+                        "observation": self.env.embed_battle(battle),
+                        "action_mask": np.array(
+                            self.env.get_action_mask(battle), dtype=np.int8
+                        ),
+                    }
+                    for battle in self._battles(a)
+                ],
+                (
+                    self._observation_buffers[agent]
+                    if self._observation_buffers is not None
+                    else create_empty_array(space, self.num_envs)
+                ),
+            )
+        return observations
+
+    def _write_observations(self) -> Dict[str, Any]:
+        if self._observation_buffers is None:
+            self._observation_buffers = {
+                agent: create_empty_array(space, self.num_envs)
+                for agent, space in self.single_observation_spaces.items()
+            }
+        for a, agent in enumerate(self.possible_agents):
+            out = self._observation_buffers[agent]
+            for k, battle in enumerate(self._battles(a)):
+                self.env.embed_battle_into(battle, _row(out["observation"], k))
+                self.env.write_action_mask(battle, out["action_mask"][k])
+        return self._observation_buffers
+
+    def _infos(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            agent: {"battle_tag": np.array(self._slots)}
+            for agent in self.possible_agents
+        }
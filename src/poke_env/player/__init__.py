@@ -6,6 +6,7 @@ from poke_env.player.baselines import (
     RandomPlayer,
     SimpleHeuristicsPlayer,
 )
+from poke_env.player.batched_player import BatchedPlayer
 from poke_env.player.battle_order import (
     BattleOrder,
     DefaultBattleOrder,
@@ -14,6 +15,12 @@ from poke_env.player.battle_order import (
     PassBattleOrder,
     SingleBattleOrder,
 )
+from poke_env.player.decision_latency import (
+    DecisionLatency,
+    LatencyHistogram,
+    LatencySummary,
+)
+from poke_env.player.farm import MatchResult, Matchup, PlayerFarm, PlayerSpec
 from poke_env.player.player import Player
 from poke_env.player.utils import (
     background_cross_evaluate,
@@ -28,6 +35,11 @@ __all__ = [
     "POKE_LOOP",
     "PSClient",
     "Player",
+    "BatchedPlayer",
+    "PlayerFarm",
+    "PlayerSpec",
+    "Matchup",
+    "MatchResult",
     "cross_evaluate",
     "background_cross_evaluate",
     "background_evaluate_player",
@@ -37,6 +49,9 @@ __all__ = [
     "PassBattleOrder",
     "DefaultBattleOrder",
     "DoubleBattleOrder",
+    "DecisionLatency",
+    "LatencyHistogram",
+    "LatencySummary",
     "RandomPlayer",
     "MaxBasePowerPlayer",
     "SimpleHeuristicsPlayer",
@@ -0,0 +1,171 @@
+"""This module defines a player batching the decisions of its concurrent battles."""
+
+import asyncio
+from abc import abstractmethod
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from poke_env.battle.abstract_battle import AbstractBattle
+from poke_env.player.battle_order import BattleOrder
+from poke_env.player.player import Player
+from poke_env.ps_client import AccountConfiguration
+
+_PendingDecision = Tuple[AbstractBattle, "asyncio.Future[BattleOrder]"]
+
+
+class BatchedPlayer(Player):
+    """
+    Player choosing the moves of its concurrent battles in batches.
+
+    Decisions requested within ``batch_window`` seconds of each other are collected,
+    up to ``batch_size`` of them. Each battle is then embedded with
+    :meth:`embed_battle`, the embeddings are stacked, and :meth:`choose_moves` is
+    called once for the whole batch, eg. to run a single forward pass of a model.
+
+    If the player has a thread or custom ``move_executor``, :meth:`choose_moves` runs
+    in it, outside of the event loop. Process executors are not supported.
+
+    ::
+
+        class NeuralPlayer(BatchedPlayer):
+            def embed_battle(self, battle):
+                return featurize(battle)
+
+            def choose_moves(self, battles, observations):
+                actions = model(observations).argmax(axis=1)
+                return [to_order(b, a) for b, a in zip(battles, actions)]
+
+        player = NeuralPlayer(max_concurrent_battles=64)
+    """
+
+    def __init__(
+        self,
+        account_configuration: Optional[AccountConfiguration] = None,
+        *,
+        batch_size: Optional[int] = None,
+        batch_window: float = 0.005,
+        **kwargs,
+    ):
+        """
+        :param account_configuration: Player configuration. See
+            :class:`~poke_env.player.player.Player`.
+        :type account_configuration: AccountConfiguration, optional
+        :param batch_size: Maximum number of decisions in a batch. A batch is chosen
+            as soon as it is full. If None, defaults to max_concurrent_battles, or to
+            no limit if max_concurrent_battles is 0.
+        :type batch_size: int, optional
+        :param batch_window: How long the first decision of a batch waits for others,
+            in seconds. Defaults to 0.005.
+        :type batch_window: float
+        :param kwargs: Other arguments, passed to
+            :class:`~poke_env.player.player.Player`.
+        """
+        super().__init__(account_configuration, **kwargs)
+        if self._move_executor_mode == "process":
+            raise ValueError("BatchedPlayer does not support process executors.")
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self._batch_size = batch_size or self._max_concurrent_battles or None
+        self._batch_window = batch_window
+        self._pending: List[_PendingDecision] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._running_batches: Set["asyncio.Task[None]"] = set()
+        self._n_batches = 0
+        self._n_batched_decisions = 0
+
+    @abstractmethod
+    def embed_battle(self, battle: AbstractBattle) -> npt.NDArray[np.float32]:
+        """Returns the embedding of a battle waiting for a decision.
+
+        Embeddings of a batch are stacked along a new first axis, so they must all
+        have the same shape.
+
+        :param battle: The battle.
+        :type battle: AbstractBattle
+        :return: The battle's embedding.
+        :rtype: np.ndarray
+        """
+        pass
+
+    @abstractmethod
+    def choose_moves(
+        self, battles: List[AbstractBattle], observations: npt.NDArray[np.float32]
+    ) -> Sequence[BattleOrder]:
+        """Chooses the moves of a batch of battles.
+
+        :param battles: The battles waiting for a decision.
+        :type battles: List[AbstractBattle]
+        :param observations: The battles' stacked embeddings, in the same order.
+        :type observations: np.ndarray
+        :return: One order per battle, in the same order.
+        :rtype: Sequence[BattleOrder]
+        """
+        pass
+
+    async def choose_move(self, battle: AbstractBattle) -> BattleOrder:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[BattleOrder] = loop.create_future()
+        self._pending.append((battle, future))
+        if self._batch_size is not None and len(self._pending) >= self._batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        batch = [(battle, future) for battle, future in batch if not future.done()]
+        if not batch:
+            return
+        self._n_batches += 1
+        self._n_batched_decisions += len(batch)
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._running_batches.add(task)
+        task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(self, batch: List[_PendingDecision]):
+        battles = [battle for battle, _ in batch]
+        try:
+            observations = np.stack([self.embed_battle(battle) for battle in battles])
+            if self.move_executor is not None:
+                orders = await asyncio.get_running_loop().run_in_executor(
+                    self.move_executor, self.choose_moves, battles, observations
+                )
+            else:
+                orders = self.choose_moves(battles, observations)
+            if len(orders) != len(batch):
+                raise ValueError(
+                    f"choose_moves returned {len(orders)} orders for {len(batch)} "
+                    "battles"
+                )
+        except Exception as exception:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+        for (_, future), order in zip(batch, orders):
+            if not future.done():
+                future.set_result(order)
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Mean number of decisions per batch.
+
+        :return: The mean batch size. 0 if no batch was chosen.
+        :rtype: float
+        """
+        return self._n_batched_decisions / self._n_batches if self._n_batches else 0.0
+
+    @property
+    def n_batches(self) -> int:
+        """Number of batches chosen.
+
+        :return: The number of batches.
+        :rtype: int
+        """
+        return self._n_batches
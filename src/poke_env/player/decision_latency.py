@@ -0,0 +1,183 @@
+"""This module defines histograms tracking how long players take to make decisions."""
+
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class LatencySummary(NamedTuple):
+    """Summary of a latency histogram, in seconds."""
+
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class LatencyHistogram:
+    """
+    Histogram of durations with logarithmic buckets.
+
+    Buckets grow by a factor of ``2 ** (1 / 4)``, from 1 microsecond to about 18
+    minutes, which keeps recording constant-time and percentiles within 20% of their
+    exact value. Longer durations fall in a final overflow bucket.
+    """
+
+    BOUNDS: Tuple[float, ...] = tuple(1e-6 * 2 ** (i / 4) for i in range(4 * 30 + 1))
+    """Upper bounds of the buckets, in seconds."""
+
+    def __init__(self):
+        self._counts: List[int] = [0] * (len(self.BOUNDS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, duration: float):
+        """Records a duration.
+
+        :param duration: The duration, in seconds.
+        :type duration: float
+        """
+        self._counts[bisect_left(self.BOUNDS, duration)] += 1
+        self._count += 1
+        self._total += duration
+        if duration > self._max:
+            self._max = duration
+
+    def percentile(self, q: float) -> float:
+        """Returns an upper estimate of a percentile.
+
+        :param q: The percentile, between 0 and 100.
+        :type q: float
+        :return: The percentile, in seconds. 0 if nothing was recorded.
+        :rtype: float
+        """
+        if not self._count:
+            return 0.0
+        target = q / 100 * self._count
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self._counts):
+            seen += count
+            if seen >= target and seen > 0:
+                return min(bound, self._max)
+        return self._max
+
+    def reset(self):
+        """Forgets every recorded duration."""
+        self._counts = [0] * (len(self.BOUNDS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def summary(self) -> LatencySummary:
+        """Summarizes the recorded durations.
+
+        :return: The summary.
+        :rtype: LatencySummary
+        """
+        return LatencySummary(
+            count=self._count,
+            mean=self.mean,
+            p50=self.percentile(50),
+            p90=self.percentile(90),
+            p99=self.percentile(99),
+            max=self._max,
+        )
+
+    @property
+    def buckets(self) -> List[Tuple[float, int]]:
+        """Non-empty buckets, as (upper bound, count) pairs.
+
+        The overflow bucket's upper bound is infinite.
+
+        :return: The buckets.
+        :rtype: List[Tuple[float, int]]
+        """
+        bounds = self.BOUNDS + (float("inf"),)
+        return [(b, c) for b, c in zip(bounds, self._counts) if c]
+
+    @property
+    def count(self) -> int:
+        """Number of recorded durations.
+
+        :return: The count.
+        :rtype: int
+        """
+        return self._count
+
+    @property
+    def max(self) -> float:
+        """Longest recorded duration, in seconds.
+
+        :return: The maximum.
+        :rtype: float
+        """
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        """Mean recorded duration, in seconds.
+
+        :return: The mean. 0 if nothing was recorded.
+        :rtype: float
+        """
+        return self._total / self._count if self._count else 0.0
+
+
+class DecisionLatency:
+    """
+    Latency histograms of the stages between receiving a request and answering it.
+
+    Stages are:
+
+    - ``queue``: from a battle frame's receipt to the start of its handling.
+    - ``parse``: decoding and parsing a request.
+    - ``policy``: choosing an order, including awaited policies.
+    - ``send``: from the order's choice to its message being written to the
+      transport.
+    - ``total``: from the receipt of the frame that triggered a decision to its
+      message being written to the transport.
+    """
+
+    STAGES = ("queue", "parse", "policy", "send", "total")
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram() for stage in self.STAGES
+        }
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        """Returns a stage's histogram.
+
+        :param stage: The stage.
+        :type stage: str
+        :return: The histogram.
+        :rtype: LatencyHistogram
+        """
+        return self._histograms[stage]
+
+    def record(self, stage: str, duration: float):
+        """Records a stage's duration.
+
+        :param stage: The stage.
+        :type stage: str
+        :param duration: The duration, in seconds.
+        :type duration: float
+        """
+        self._histograms[stage].record(duration)
+
+    def reset(self):
+        """Forgets every recorded duration."""
+        for histogram in self._histograms.values():
+            histogram.reset()
+
+    def summary(self) -> Dict[str, LatencySummary]:
+        """Summarizes every stage.
+
+        :return: Summary per stage.
+        :rtype: Dict[str, LatencySummary]
+        """
+        return {
+            stage: histogram.summary() for stage, histogram in self._histograms.items()
+        }
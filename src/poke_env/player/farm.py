@@ -0,0 +1,249 @@
+"""This module defines a farm playing matchups across several processes."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Type
+
+from poke_env.battle.battle_summary import BattleSummary
+from poke_env.concurrency import POKE_LOOP
+from poke_env.player.player import Player
+from poke_env.ps_client import AccountConfiguration
+
+
+class PlayerSpec(NamedTuple):
+    """Recipe of a player created in a farm worker.
+
+    Players hold connections and event loop primitives, so workers create their own
+    from a spec. The player's class must be importable from the workers, ie. defined
+    at the top level of a module.
+    """
+
+    player_class: Type[Player]
+    """The player's class."""
+    kwargs: Mapping[str, Any] = {}
+    """Arguments the player is created with. If they do not include an
+    account_configuration, a random username is generated, so that players created
+    in different workers do not collide."""
+    name: Optional[str] = None
+    """Name reported in results. Defaults to the class's name."""
+
+    @property
+    def label(self) -> str:
+        """The spec's name, or its class's name.
+
+        :return: The label.
+        :rtype: str
+        """
+        return self.name or self.player_class.__name__
+
+
+class Matchup(NamedTuple):
+    """Battles to play in a farm worker."""
+
+    player: PlayerSpec
+    """The player whose results are reported."""
+    opponent: Optional[PlayerSpec]
+    """The player's opponent. If None, the player plays on the ladder."""
+    n_battles: int
+    """Number of battles to play."""
+
+
+class MatchResult(NamedTuple):
+    """Outcome of a matchup, from its player's point of view."""
+
+    player: str
+    """Label of the matchup's player."""
+    opponent: Optional[str]
+    """Label of the matchup's opponent, or None for ladder games."""
+    n_won: int
+    """Number of battles won."""
+    n_lost: int
+    """Number of battles lost."""
+    n_tied: int
+    """Number of battles tied."""
+    summaries: List[BattleSummary]
+    """Summaries of the finished battles."""
+    duration: float
+    """How long the battles took, in seconds."""
+
+    @property
+    def n_finished(self) -> int:
+        """Number of finished battles.
+
+        :return: The number of finished battles.
+        :rtype: int
+        """
+        return self.n_won + self.n_lost + self.n_tied
+
+    @property
+    def win_rate(self) -> Optional[float]:
+        """Share of finished battles won.
+
+        :return: The win rate, or None if no battle finished.
+        :rtype: float, optional
+        """
+        return self.n_won / self.n_finished if self.n_finished else None
+
+
+class PlayerFarm:
+    """
+    Plays matchups in a pool of worker processes.
+
+    ``battle_against``, ``ladder`` and :func:`~poke_env.player.utils.cross_evaluate`
+    run every battle of the process on a single event loop, which a single core
+    bounds. A farm spreads matchups over ``n_workers`` processes instead: each worker
+    creates the matchup's players from their :class:`PlayerSpec`, plays the battles
+    on its own event loop, and sends back a :class:`MatchResult`, including the
+    summaries of the finished battles.
+
+    Workers are spawned, so scripts using a farm must guard their entry point with
+    ``if __name__ == "__main__":``::
+
+        with PlayerFarm(4) as farm:
+            results = farm.cross_evaluate(
+                [PlayerSpec(RandomPlayer), PlayerSpec(SimpleHeuristicsPlayer)], 100
+            )
+    """
+
+    def __init__(
+        self, n_workers: Optional[int] = None, *, executor: Optional[Executor] = None
+    ):
+        """
+        :param n_workers: Number of worker processes. Defaults to the number of CPUs.
+        :type n_workers: int, optional
+        :param executor: Executor playing the matchups instead of the farm's process
+            pool, eg. to reuse a pool. Defaults to None.
+        :type executor: Executor, optional
+        """
+        self._executor = executor or ProcessPoolExecutor(
+            n_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._owns_executor = executor is None
+
+    def __enter__(self) -> "PlayerFarm":
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def close(self):
+        """Shuts the farm's worker processes down."""
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    def submit(self, matchup: Matchup) -> "Future[MatchResult]":
+        """Schedules a matchup.
+
+        :param matchup: The matchup.
+        :type matchup: Matchup
+        :return: A future resolving to the matchup's result.
+        :rtype: Future[MatchResult]
+        """
+        return self._executor.submit(_play_matchup, matchup)
+
+    def run(self, matchups: Iterable[Matchup]) -> List[MatchResult]:
+        """Plays matchups concurrently, and waits for their results.
+
+        :param matchups: The matchups.
+        :type matchups: Iterable[Matchup]
+        :return: The results, in the order of the matchups.
+        :rtype: List[MatchResult]
+        """
+        futures = [self.submit(matchup) for matchup in matchups]
+        return [future.result() for future in futures]
+
+    def ladder(self, players: Iterable[PlayerSpec], n_games: int) -> List[MatchResult]:
+        """Plays ladder games with several players concurrently.
+
+        :param players: The players. Their kwargs should include the
+            account_configuration they log in with.
+        :type players: Iterable[PlayerSpec]
+        :param n_games: Number of games each player plays.
+        :type n_games: int
+        :return: The results, in the order of the players.
+        :rtype: List[MatchResult]
+        """
+        return self.run(Matchup(player, None, n_games) for player in players)
+
+    def cross_evaluate(
+        self, players: List[PlayerSpec], n_challenges: int
+    ) -> Dict[str, Dict[str, Optional[float]]]:
+        """Plays every pair of players against each other, like
+        :func:`~poke_env.player.utils.cross_evaluate`, with pairs spread over the
+        workers.
+
+        :param players: The players. Their labels must be unique.
+        :type players: List[PlayerSpec]
+        :param n_challenges: Number of battles each pair plays.
+        :type n_challenges: int
+        :return: Win rates, indexed by player label then opponent label. None on the
+            diagonal.
+        :rtype: Dict[str, Dict[str, Optional[float]]]
+        """
+        labels = [player.label for player in players]
+        if len(set(labels)) != len(labels):
+            raise ValueError(f"Player labels must be unique, got {labels}")
+        results: Dict[str, Dict[str, Optional[float]]] = {
+            p1: {p2: None for p2 in labels} for p1 in labels
+        }
+        matchups = [
+            Matchup(p1, p2, n_challenges)
+            for i, p1 in enumerate(players)
+            for p2 in players[i + 1 :]
+        ]
+        for result in self.run(matchups):
+            assert result.opponent is not None
+            results[result.player][result.opponent] = result.win_rate
+            results[result.opponent][result.player] = (
+                result.n_lost / result.n_finished if result.n_finished else None
+            )
+        return results
+
+
+def _create_player(spec: PlayerSpec) -> Player:
+    kwargs = dict(spec.kwargs)
+    if kwargs.get("account_configuration") is None:
+        kwargs["account_configuration"] = AccountConfiguration.generate(
+            spec.label, rand=True
+        )
+    return spec.player_class(**kwargs)
+
+
+def _play_matchup(matchup: Matchup) -> MatchResult:
+    return asyncio.run_coroutine_threadsafe(
+        _play_matchup_async(matchup), POKE_LOOP
+    ).result()
+
+
+async def _play_matchup_async(matchup: Matchup) -> MatchResult:
+    player = _create_player(matchup.player)
+    players = [player]
+    try:
+        start = perf_counter()
+        if matchup.opponent is None:
+            await player.ladder(matchup.n_battles)
+        else:
+            opponent = _create_player(matchup.opponent)
+            players.append(opponent)
+            await player.battle_against(opponent, n_battles=matchup.n_battles)
+        duration = perf_counter() - start
+
+        summaries = list(player.battle_summaries.values()) + [
+            BattleSummary.from_battle(battle)
+            for battle in player.battles.values()
+            if battle.finished
+        ]
+        return MatchResult(
+            player=matchup.player.label,
+            opponent=matchup.opponent.label if matchup.opponent else None,
+            n_won=player.n_won_battles,
+            n_lost=player.n_lost_battles,
+            n_tied=player.n_tied_battles,
+            summaries=summaries,
+            duration=duration,
+        )
+    finally:
+        for p in players:
+            await p.ps_client.stop_listening()
@@ -3,22 +3,39 @@
 from __future__ import annotations
 
 import asyncio
+import multiprocessing
+import pickle
 import random
 from abc import ABC, abstractmethod
 from asyncio import Condition, Event, Queue, Semaphore
-from logging import Logger
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from logging import Logger, getLogger
 from pathlib import Path
 from time import perf_counter
-from typing import Any, Awaitable, Dict, List, Optional, Set, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Union,
+)
 
 import orjson
 
 from poke_env.battle.abstract_battle import AbstractBattle
 from poke_env.battle.battle import Battle
+from poke_env.battle.battle_summary import BattleSummary
 from poke_env.battle.double_battle import DoubleBattle
 from poke_env.battle.move import Move
 from poke_env.battle.pokemon import Pokemon
 from poke_env.concurrency import (
+    LIFECYCLE,
     POKE_LOOP,
     create_in_poke_loop,
     handle_threaded_coroutines,
@@ -31,12 +48,15 @@ from poke_env.player.battle_order import (
     DoubleBattleOrder,
     SingleBattleOrder,
 )
+from poke_env.player.decision_latency import DecisionLatency
 from poke_env.ps_client import PSClient
 from poke_env.ps_client.account_configuration import AccountConfiguration
+from poke_env.ps_client.frame import ProtocolFrame
 from poke_env.ps_client.server_configuration import (
     LocalhostServerConfiguration,
     ServerConfiguration,
 )
+from poke_env.ps_client.transport import Transport
 from poke_env.teambuilder.constant_teambuilder import ConstantTeambuilder
 from poke_env.teambuilder.teambuilder import Teambuilder
 
@@ -52,6 +72,18 @@ class Player(ABC):
     # chance of being showdown's default order to prevent infinite loops
     DEFAULT_CHOICE_CHANCE = 1 / 1000
 
+    _RUNTIME_ATTRIBUTES = (
+        "ps_client",
+        "_battle_semaphore",
+        "_battle_start_condition",
+        "_battle_count_queue",
+        "_battle_end_condition",
+        "_challenge_queue",
+        "_waiting",
+        "_trying_again",
+        "_move_executor",
+    )
+
     def __init__(
         self,
         account_configuration: Optional[AccountConfiguration] = None,
@@ -71,6 +103,14 @@ class Player(ABC):
         loop: asyncio.AbstractEventLoop = POKE_LOOP,
         team: Optional[Union[str, Teambuilder]] = None,
         strict_battle_tracking: bool = False,
+        transport: Optional[Transport] = None,
+        protocol_trace_size: int = 0,
+        max_reconnect_attempts: int = 0,
+        send_interval: float = 0.0,
+        move_executor: Optional[Union[str, Executor]] = None,
+        move_executor_workers: Optional[int] = None,
+        max_retained_battles: Optional[int] = None,
+        decision_budget: Optional[float] = None,
     ):
         """
         :param account_configuration: Player configuration. If empty, defaults to an
@@ -120,6 +160,52 @@ class Player(ABC):
             team string, a showdown packed team string, or a Teambuilder object.
             Defaults to None.
         :type team: str or Teambuilder, optional
+        :param transport: Transport used to communicate with the server. If None, the
+            player connects to the server configuration's websocket url.
+        :type transport: Transport, optional
+        :param protocol_trace_size: Number of frames recorded per battle, which are
+            logged when showdown reports an unexpected error. If 0, recording is
+            disabled. Defaults to 0.
+        :type protocol_trace_size: int
+        :param max_reconnect_attempts: Number of consecutive attempts made to reconnect
+            when the connection drops. Battles in progress are resumed once reconnected.
+            If 0, the player stops listening when the connection drops. Defaults to 0.
+        :type max_reconnect_attempts: int
+        :param send_interval: Minimum delay between outgoing messages once a short
+            burst is spent, in seconds. Showdown's main server throttles regular users
+            at 0.6s. If 0, messages are only paced after the server reports dropping
+            one. Defaults to 0.
+        :type send_interval: float
+        :param move_executor: Where choose_move and teampreview run. If None, they run
+            in the event loop, blocking it while they compute. If "thread", they run
+            in a thread pool, and receive a snapshot of the battle, taken when the
+            decision is requested, so that the battle keeps being updated safely while
+            they run. If "process", they run in a process pool, on copies
+            of the player and battle; the player's runtime state, such as its client
+            and battles, is not copied, and choices can not be awaitables. An
+            executor can also be given, in which case choose_move and teampreview are
+            submitted to it like in "thread" mode. Defaults to None.
+        :type move_executor: str or Executor, optional
+        :param move_executor_workers: Number of workers of the pool created when
+            move_executor is "thread" or "process". Defaults to concurrent.futures'
+            default.
+        :type move_executor_workers: int, optional
+        :param max_retained_battles: Number of finished battles kept in full. Older
+            finished battles are replaced by a BattleSummary, available in
+            battle_summaries and still counted by n_won_battles and win_rate, once the
+            server closed their room. If None, every battle is kept until
+            reset_battles is called. Defaults to None.
+        :type max_retained_battles: int, optional
+        :param decision_budget: Time the policy has to answer a request, in seconds,
+            counted from the request's receipt. Past it, the order returned by
+            choose_fallback_move, or a random team order at team preview, is sent
+            instead, and the policy's late answer is ignored. Awaitable policies are
+            cancelled. Policies running synchronously in the event loop can not be
+            interrupted: they block the loop until they return, and should run in a
+            move_executor. Late policies in a thread executor keep running on their
+            battle snapshot, and keep their worker busy until they return. If None,
+            the policy has no deadline. Defaults to None.
+        :type decision_budget: float, optional
         """
         self._format: str = battle_format
         self._max_concurrent_battles: int = max_concurrent_battles
@@ -128,6 +214,15 @@ class Player(ABC):
         self._accept_open_team_sheet: bool = accept_open_team_sheet
 
         self._battles: Dict[str, AbstractBattle] = {}
+        self._battle_summaries: Dict[str, BattleSummary] = {}
+        self._finished_battle_tags: Deque[str] = deque()
+        if max_retained_battles is not None and max_retained_battles < 0:
+            raise ValueError(
+                f"max_retained_battles must be non-negative, got {max_retained_battles}"
+            )
+        self._max_retained_battles = max_retained_battles
+        self._decision_budget = decision_budget
+        self._n_missed_deadlines = 0
         self._bestof_games: Set[str] = set()
         self._battle_semaphore: Semaphore = create_in_poke_loop(Semaphore, loop, 0)
 
@@ -141,6 +236,27 @@ class Player(ABC):
         self._trying_again: Event = create_in_poke_loop(Event, loop)
         self._team: Optional[Teambuilder] = None
         self._strict_battle_tracking = strict_battle_tracking
+        self._decision_latency = DecisionLatency()
+
+        if isinstance(move_executor, ProcessPoolExecutor):
+            raise ValueError(
+                "Process pools can not run the player's bound methods: use "
+                'move_executor="process" instead.'
+            )
+        if move_executor not in (None, "thread", "process") and not isinstance(
+            move_executor, Executor
+        ):
+            raise ValueError(
+                f"move_executor must be None, 'thread', 'process' or an Executor, got "
+                f"{move_executor!r}"
+            )
+        self._move_executor_mode = (
+            move_executor if isinstance(move_executor, str) else None
+        )
+        self._move_executor: Optional[Executor] = (
+            move_executor if isinstance(move_executor, Executor) else None
+        )
+        self._move_executor_workers = move_executor_workers
 
         if isinstance(team, Teambuilder):
             self._team = team
@@ -161,10 +277,28 @@ class Player(ABC):
             ping_interval=ping_interval,
             ping_timeout=ping_timeout,
             loop=loop,
+            transport=transport,
+            protocol_trace_size=protocol_trace_size,
+            max_reconnect_attempts=max_reconnect_attempts,
+            send_interval=send_interval,
         )
 
         self.logger.debug("Player initialisation finished")
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickled players, eg. copies sent to process pool workers, are detached from
+        # their client, battles and event loop
+        state = self.__dict__.copy()
+        for attribute in self._RUNTIME_ATTRIBUTES:
+            state[attribute] = None
+        # Detached copies keep their username, and log through a logger of that name
+        state["_detached_username"] = self.username
+        state["_battles"] = {}
+        state["_battle_summaries"] = {}
+        state["_finished_battle_tags"] = deque()
+        state["_bestof_games"] = set()
+        return state
+
     def _battle_finished_callback(self, battle: AbstractBattle):
         pass
 
@@ -195,34 +329,11 @@ class Player(ABC):
             if battle_tag in self._battles:
                 return self._battles[battle_tag]
             else:
-                gen = GenData.from_format(self.format).gen
-                if self.format_is_doubles:
-                    battle: AbstractBattle = DoubleBattle(
-                        battle_tag=battle_tag,
-                        username=self.username,
-                        logger=self.logger,
-                        save_replays=self._save_replays,
-                        gen=gen,
-                    )
-                else:
-                    battle = Battle(
-                        battle_tag=battle_tag,
-                        username=self.username,
-                        logger=self.logger,
-                        gen=gen,
-                        save_replays=self._save_replays,
-                    )
-
-                # Add our team as teampreview_team, as part of battle initialisation
-                if isinstance(self._team, ConstantTeambuilder):
-                    battle.teampreview_team = [
-                        Pokemon(gen=gen, teambuilder=tb_mon)
-                        for tb_mon in self._team.team
-                    ]
+                battle = self._new_battle(battle_tag)
 
                 if self.format_is_bestof:
                     # In bo3, counting is handled by the game room, not sub-battles
-                    self._battles[battle_tag] = battle
+                    self._register_battle(battle)
                 else:
                     await self._battle_count_queue.put(None)
                     if battle_tag in self._battles:
@@ -231,20 +342,29 @@ class Player(ABC):
                     async with self._battle_start_condition:
                         self._battle_semaphore.release()
                         self._battle_start_condition.notify_all()
-                        self._battles[battle_tag] = battle
+                        self._register_battle(battle)
 
+                # Messages queued together are coalesced into a single frame
+                sends = []
                 if self._start_timer_on_battle_start:
-                    await self.ps_client.send_message("/timer on", battle.battle_tag)
+                    sends.append(
+                        self.ps_client.send_message("/timer on", battle.battle_tag)
+                    )
 
                 if "vgc" in self.format and not self.format_is_bestof:
                     if self.accept_open_team_sheet:
-                        await self.ps_client.send_message(
-                            "/acceptopenteamsheets", room=battle_tag
+                        sends.append(
+                            self.ps_client.send_message(
+                                "/acceptopenteamsheets", room=battle_tag
+                            )
                         )
                     else:
-                        await self.ps_client.send_message(
-                            "/rejectopenteamsheets", room=battle_tag
+                        sends.append(
+                            self.ps_client.send_message(
+                                "/rejectopenteamsheets", room=battle_tag
+                            )
                         )
+                await asyncio.gather(*sends)
 
                 return battle
         else:
@@ -253,19 +373,79 @@ class Player(ABC):
             )
             raise ShowdownException()
 
-    async def _get_battle(self, battle_tag: str) -> AbstractBattle:
-        battle_tag = battle_tag[1:]
-        while True:
-            if battle_tag in self._battles:
-                return self._battles[battle_tag]
-            async with self._battle_start_condition:
-                await self._battle_start_condition.wait()
+    def _new_battle(self, battle_tag: str) -> AbstractBattle:
+        """Returns a new battle object matching the player's format.
+
+        :param battle_tag: The battle's tag.
+        :type battle_tag: str
+        :return: The new battle object.
+        :rtype: AbstractBattle
+        """
+        gen = GenData.from_format(self.format).gen
+        if self.format_is_doubles:
+            battle: AbstractBattle = DoubleBattle(
+                battle_tag=battle_tag,
+                username=self.username,
+                logger=self.logger,
+                save_replays=self._save_replays,
+                gen=gen,
+            )
+        else:
+            battle = Battle(
+                battle_tag=battle_tag,
+                username=self.username,
+                logger=self.logger,
+                gen=gen,
+                save_replays=self._save_replays,
+            )
 
-    async def _handle_bestof_message(self, split_messages: List[List[str]]):
+        # Add our team as teampreview_team, as part of battle initialisation
+        if isinstance(self._team, ConstantTeambuilder):
+            battle.teampreview_team = [
+                Pokemon(gen=gen, teambuilder=tb_mon) for tb_mon in self._team.team
+            ]
+        return battle
+
+    def _resume_battle(self, battle: AbstractBattle):
+        """Prepares a running battle to be rebuilt from its room's log.
+
+        Showdown sends a room's full log when it is joined again, for instance after a
+        reconnection. The battle's state is reset in place, so that the log can be
+        replayed into the same object.
+
+        :param battle: The battle to reset.
+        :type battle: AbstractBattle
+        """
+        self.logger.info("Resuming battle %s from its log", battle.battle_tag)
+        battle._copy_state_from(self._new_battle(battle.battle_tag))
+
+    def _register_battle(self, battle: AbstractBattle):
+        """Tracks a new battle.
+
+        :param battle: The battle.
+        :type battle: AbstractBattle
+        """
+        self._battles[battle.battle_tag] = battle
+
+    def _get_battle(self, battle_tag: str) -> Optional[AbstractBattle]:
+        """Returns the battle a room's frame is addressed to.
+
+        Frames of a given room are handled in order, so a battle's init frame is always
+        handled before the room's other frames. Battles that are not tracked are not
+        going to be: they were dropped, or their room was never joined as a battle.
+
+        :param battle_tag: The room id, with its leading '>'.
+        :type battle_tag: str
+        :return: The battle, or None if it is not tracked.
+        :rtype: AbstractBattle, optional
+        """
+        return self._battles.get(battle_tag[1:])
+
+    async def _handle_bestof_message(self, split_messages: Sequence[List[str]]):
         """Handles messages from a best-of series room (e.g. bo3).
 
         :param split_messages: The received best-of room messages.
-        :type split_messages: List[List[str]]
+        :type split_messages: Sequence[List[str]]
         """
         game_tag = split_messages[0][0][1:]
         for split_message in split_messages[1:]:
@@ -292,16 +472,24 @@ class Player(ABC):
                 if "confirmready" in joined and "disabled" not in joined:
                     await self.ps_client.send_message("/confirmready", room=game_tag)
 
-    async def _handle_battle_message(self, split_messages: List[List[str]]):
+    async def _handle_battle_message(self, split_messages: Sequence[List[str]]):
         """Handles a battle message.
 
-        :param split_message: The received battle message.
-        :type split_message: str
+        Lines are split lazily when the messages are a
+        :class:`~poke_env.ps_client.frame.ProtocolFrame`.
+
+        :param split_messages: The received battle messages.
+        :type split_messages: Sequence[List[str]]
         """
         if split_messages[0][0].startswith(">game"):
             await self._handle_bestof_message(split_messages)
             return
 
+        received_at = None
+        if isinstance(split_messages, ProtocolFrame):
+            received_at = split_messages.received_at
+            self._decision_latency.record("queue", perf_counter() - received_at)
+
         # Battle messages can be multiline
         if (
             len(split_messages) > 1
@@ -309,11 +497,36 @@ class Player(ABC):
             and split_messages[1][1] == "init"
         ):
             battle_info = split_messages[0][0].split("-")
-            battle = await self._create_battle(battle_info)
+            battle_tag = split_messages[0][0][1:]
+            existing_battle = self._battles.get(battle_tag)
+            if (
+                existing_battle is not None and existing_battle.finished
+            ) or battle_tag in self._battle_summaries:
+                # A room rejoined after a reconnect, before its deinit frame, replays
+                # the log of a battle that already ended: the room is left again
+                self.logger.debug("Dropping log replay of finished %s", battle_tag)
+                await self.ps_client.send_message(f"/leave {battle_tag}")
+                return
+            if existing_battle is not None:
+                self._resume_battle(existing_battle)
+                battle = existing_battle
+            else:
+                battle = await self._create_battle(battle_info)
         else:
-            battle = await self._get_battle(split_messages[0][0])
+            maybe_battle = self._get_battle(split_messages[0][0])
+            if maybe_battle is None:
+                self.logger.debug(
+                    "Dropping frame for untracked room %s", split_messages[0][0][1:]
+                )
+                return
+            battle = maybe_battle
 
-        for split_message in split_messages[1:]:
+        messages = (
+            split_messages.iter_messages(1)
+            if isinstance(split_messages, ProtocolFrame)
+            else split_messages[1:]
+        )
+        for split_message in messages:
             if not split_message:
                 continue
             elif len(split_message) == 1:
@@ -329,14 +542,18 @@ class Player(ABC):
                 pass
             elif split_message[1] == "request":
                 if split_message[2]:
+                    parse_start = perf_counter()
                     request = orjson.loads(split_message[2])
                     battle.parse_request(request, self._strict_battle_tracking)
+                    self._decision_latency.record("parse", perf_counter() - parse_start)
                     if self.format_is_bestof or not (
                         battle.teampreview and self.accept_open_team_sheet
                     ):
                         # if we want OTS in non-bo3 game, we need to wait for showteam
                         # message to be received before making teampreview decision
-                        await self._handle_battle_request(battle)
+                        await self._handle_battle_request(
+                            battle, received_at=received_at
+                        )
             elif split_message[1] == "showteam":
                 role = split_message[2]
                 teambuilder_team = Teambuilder.parse_packed_team(
@@ -366,58 +583,210 @@ class Player(ABC):
                 ):
                     # in non-bo3 games, we need to wait for both showteam messages
                     # to be received before making our teampreview decision
-                    await self._handle_battle_request(battle)
+                    await self._handle_battle_request(battle, received_at=received_at)
             elif split_message[1] == "win" or split_message[1] == "tie":
                 if split_message[1] == "win":
                     battle.won_by(split_message[2])
                 else:
                     battle.tied()
-                # In bo3, counting/notification are handled by the game room
-                if not self.format_is_bestof:
-                    await self._battle_count_queue.get()
-                    self._battle_count_queue.task_done()
-                self._battle_finished_callback(battle)
-                if not self.format_is_bestof:
-                    async with self._battle_end_condition:
-                        self._battle_end_condition.notify_all()
-                await self.ps_client.send_message(f"/leave {battle.battle_tag}")
+                await self._handle_battle_end(battle)
+            elif split_message[1] == "noinit":
+                # The room no longer exists, eg. it expired while we were disconnected
+                if not battle.finished:
+                    self.logger.warning(
+                        "Battle %s can not be resumed: %s",
+                        battle.battle_tag,
+                        "|".join(split_message),
+                    )
+                    battle._finish_battle()
+                    await self._handle_battle_end(battle)
+                    # The room is gone: no deinit frame follows
+                    self._retain_battle(battle)
+            elif split_message[1] == "deinit":
+                # The room is closed, after the battle's last frames such as ratings
+                battle.parse_message(split_message)
+                if battle.finished:
+                    self._retain_battle(battle)
             elif split_message[1] == "error":
                 self.logger.log(
                     25, "Error message received: %s", "|".join(split_message)
                 )
                 if split_message[2].startswith("[Unavailable choice]"):
-                    self._trying_again.set()
+                    self._set_trying_again(battle)
                 elif split_message[2].startswith("[Invalid choice]"):
-                    await self._handle_battle_request(battle, maybe_default_order=True)
+                    await self._handle_battle_request(
+                        battle, maybe_default_order=True, received_at=received_at
+                    )
                 else:
                     self.logger.critical("Unexpected error message: %s", split_message)
+                    self.ps_client.dump_protocol_trace(battle.battle_tag)
             elif split_message[1] == "bigerror":
                 self.logger.warning("Received 'bigerror' message: %s", split_message)
+                self.ps_client.dump_protocol_trace(battle.battle_tag)
             else:
                 battle.parse_message(split_message)
 
+    async def _handle_battle_end(self, battle: AbstractBattle):
+        # In bo3, counting/notification are handled by the game room
+        if not self.format_is_bestof:
+            await self._battle_count_queue.get()
+            self._battle_count_queue.task_done()
+        self._battle_finished_callback(battle)
+        if not self.format_is_bestof:
+            async with self._battle_end_condition:
+                self._battle_end_condition.notify_all()
+        await self.ps_client.send_message(f"/leave {battle.battle_tag}")
+
+    def _set_waiting(self, battle: AbstractBattle):
+        """Signals that the player received a request without a decision to make,
+        eg. while its opponent replaces a fainted pokemon.
+
+        :param battle: The battle.
+        :type battle: AbstractBattle
+        """
+        self._waiting.set()
+
+    def _set_trying_again(self, battle: AbstractBattle):
+        """Signals that the server rejected the player's last choice, and that the
+        player is choosing again.
+
+        :param battle: The battle.
+        :type battle: AbstractBattle
+        """
+        self._trying_again.set()
+
+    def _retain_battle(self, battle: AbstractBattle):
+        """Applies the retention policy once a finished battle's room is closed.
+
+        :param battle: The finished battle.
+        :type battle: AbstractBattle
+        """
+        if (
+            self._max_retained_battles is None
+            or battle.battle_tag in self._finished_battle_tags
+        ):
+            return
+        self._finished_battle_tags.append(battle.battle_tag)
+        while len(self._finished_battle_tags) > self._max_retained_battles:
+            battle_tag = self._finished_battle_tags.popleft()
+            demoted = self._battles.pop(battle_tag, None)
+            if demoted is not None:
+                self._battle_summaries[battle_tag] = BattleSummary.from_battle(demoted)
+
     async def _handle_battle_request(
-        self, battle: AbstractBattle, maybe_default_order: bool = False
+        self,
+        battle: AbstractBattle,
+        maybe_default_order: bool = False,
+        received_at: Optional[float] = None,
     ):
         if battle._wait:
-            self._waiting.set()
+            self._set_waiting(battle)
             return
+        policy_start = perf_counter()
         if maybe_default_order and random.random() < self.DEFAULT_CHOICE_CHANCE:
             message = self.choose_default_move().message
         elif battle.teampreview:
-            m = self.teampreview(battle)
-            if isinstance(m, Awaitable):
-                m = await m
-            message = m
+            message = await self._choose_before_deadline(battle, True, received_at)
         else:
             if maybe_default_order:
-                self._trying_again.set()
+                self._set_trying_again(battle)
+            message = await self._choose_before_deadline(battle, False, received_at)
+        chosen_at = perf_counter()
+        self._decision_latency.record("policy", chosen_at - policy_start)
+        if message:
+            await self.ps_client.send_message(message, battle.battle_tag)
+            sent_at = perf_counter()
+            self._decision_latency.record("send", sent_at - chosen_at)
+            if received_at is not None:
+                self._decision_latency.record("total", sent_at - received_at)
+
+    async def _choose_before_deadline(
+        self, battle: AbstractBattle, teampreview: bool, received_at: Optional[float]
+    ) -> str:
+        if self._decision_budget is None:
+            return await self._choose_message(battle, teampreview)
+
+        deadline = (
+            received_at if received_at is not None else perf_counter()
+        ) + self._decision_budget
+        choice = asyncio.ensure_future(self._choose_message(battle, teampreview))
+        await asyncio.wait([choice], timeout=max(deadline - perf_counter(), 0))
+        # Synchronous policies running in the loop only return once they are done,
+        # possibly past the deadline
+        if choice.done() and perf_counter() <= deadline:
+            return choice.result()
+
+        # Late answers are ignored, as executors can not interrupt running policies,
+        # and so are late failures
+        if not choice.done():
+            choice.cancel()
+        elif not choice.cancelled():
+            choice.exception()
+        self._n_missed_deadlines += 1
+        self.logger.info(
+            "Policy missed its %.3fs deadline in %s, sending a fallback order",
+            self._decision_budget,
+            battle.battle_tag,
+        )
+        if teampreview:
+            return self.random_teampreview(battle)
+        return self.choose_fallback_move(battle).message
+
+    def choose_fallback_move(self, battle: AbstractBattle) -> BattleOrder:
+        """Returns the order sent when the policy misses its decision budget.
+
+        It runs in the event loop, and should be cheap. Defaults to a random order.
+
+        :param battle: The battle.
+        :type battle: AbstractBattle
+        :return: The fallback order.
+        :rtype: BattleOrder
+        """
+        return self.choose_random_move(battle)
+
+    async def _choose_message(self, battle: AbstractBattle, teampreview: bool) -> str:
+        if self._move_executor is None and self._move_executor_mode is None:
+            if teampreview:
+                m = self.teampreview(battle)
+                if isinstance(m, Awaitable):
+                    m = await m
+                return m
             choice = self.choose_move(battle)
             if isinstance(choice, Awaitable):
                 choice = await choice
-            message = choice.message
-        if message:
-            await self.ps_client.send_message(message, battle.battle_tag)
+            return choice.message
+
+        try:
+            return await self._choose_message_in_executor(battle, teampreview)
+        except Exception:
+            # Failures in executors lose the policy's traceback context otherwise
+            self.logger.exception(
+                "Policy raised an exception in %s's executor while choosing for %s",
+                self.username,
+                battle.battle_tag,
+            )
+            raise
+
+    async def _choose_message_in_executor(
+        self, battle: AbstractBattle, teampreview: bool
+    ) -> str:
+        loop = asyncio.get_running_loop()
+        executor = self.move_executor
+        assert executor is not None
+        if self._move_executor_mode == "process":
+            return await loop.run_in_executor(
+                executor, _choose_in_process, battle, teampreview
+            )
+        # Policies read a snapshot: the battle's room resumes once the decision is sent,
+        # possibly before the policy returns if it misses its decision budget
+        snapshot = pickle.dumps(battle, pickle.HIGHEST_PROTOCOL)
+        policy = self.teampreview if teampreview else self.choose_move
+        choice = await loop.run_in_executor(
+            executor, _choose_on_snapshot, policy, snapshot
+        )
+        if isinstance(choice, Awaitable):
+            choice = await choice
+        return choice if teampreview else choice.message
 
     async def _handle_challenge_request(self, split_message: List[str]):
         """Handles an individual challenge."""
@@ -603,11 +972,18 @@ class Player(ABC):
 
     async def _battle_against(self, *opponents: Player, n_battles: int):
         for opponent in opponents:
+            if opponent.ps_client.loop is self.ps_client.loop:
+                to_wait: Optional[Event] = opponent.ps_client.logged_in
+            else:
+                # The opponent is sharded on another loop, whose events can only be
+                # awaited from that loop
+                to_wait = None
+                await handle_threaded_coroutines(
+                    opponent.ps_client.logged_in.wait(), opponent.ps_client.loop
+                )
             await asyncio.gather(
                 self.send_challenges(
-                    to_id_str(opponent.username),
-                    n_battles,
-                    to_wait=opponent.ps_client.logged_in,
+                    to_id_str(opponent.username), n_battles, to_wait=to_wait
                 ),
                 opponent.accept_challenges(to_id_str(self.username), n_battles),
             )
@@ -680,6 +1056,8 @@ class Player(ABC):
                     "Can not reset player's battles while they are still running"
                 )
         self._battles = {}
+        self._battle_summaries = {}
+        self._finished_battle_tags.clear()
         self._bestof_games = set()
 
     def teampreview(self, battle: AbstractBattle) -> Union[str, Awaitable[str]]:
@@ -766,10 +1144,83 @@ class Player(ABC):
     def battles(self) -> Dict[str, AbstractBattle]:
         return self._battles
 
+    @property
+    def battle_summaries(self) -> Dict[str, BattleSummary]:
+        """Summaries of the finished battles that are no longer kept in full, in the
+        order they finished.
+
+        :return: The summaries, by battle tag.
+        :rtype: Dict[str, BattleSummary]
+        """
+        return self._battle_summaries
+
+    @property
+    def decision_latency(self) -> DecisionLatency:
+        """Latency histograms of the player's decisions, from the receipt of a
+        request to the sending of the chosen order, broken down by stage.
+
+        :return: The decision latency histograms.
+        :rtype: DecisionLatency
+        """
+        return self._decision_latency
+
     @property
     def format(self) -> str:
         return self._format
 
+    @property
+    def n_missed_deadlines(self) -> int:
+        """Number of decisions replaced by a fallback order because the policy missed
+        its decision budget.
+
+        :return: The number of missed deadlines.
+        :rtype: int
+        """
+        return self._n_missed_deadlines
+
+    @property
+    def move_executor(self) -> Optional[Executor]:
+        """The executor running choose_move and teampreview, created on first use
+        when move_executor was "thread" or "process".
+
+        :return: The executor, or None if decisions run in the event loop.
+        :rtype: Executor, optional
+        """
+        if self._move_executor is None and self._move_executor_mode is not None:
+            if self._move_executor_mode == "thread":
+                self._move_executor = ThreadPoolExecutor(
+                    self._move_executor_workers,
+                    thread_name_prefix=f"{self.username}-policy",
+                )
+            else:
+                # Workers get a copy of the player, detached from its runtime state
+                self._move_executor = ProcessPoolExecutor(
+                    self._move_executor_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process_player,
+                    initargs=(self,),
+                )
+            LIFECYCLE.track_executor(self._move_executor, f"{self.username}-policy")
+        return self._move_executor
+
+    def close_move_executor(self, wait: bool = True):
+        """Shuts down the executor created when move_executor was "thread" or
+        "process". Pending decisions are cancelled. A new executor is created if the
+        player makes decisions afterwards.
+
+        Executors passed to the player are left to their owner.
+
+        :param wait: Whether to wait for running decisions to finish. Defaults to
+            True.
+        :type wait: bool
+        """
+        executor = self._move_executor
+        if executor is None or self._move_executor_mode is None:
+            return
+        self._move_executor = None
+        LIFECYCLE.untrack_executor(executor)
+        executor.shutdown(wait=wait, cancel_futures=True)
+
     @property
     def format_is_doubles(self) -> bool:
         format_lowercase = self._format.lower()
@@ -785,11 +1236,15 @@ class Player(ABC):
 
     @property
     def n_finished_battles(self) -> int:
-        return len([None for b in self._battles.values() if b.finished])
+        return len([None for b in self._battles.values() if b.finished]) + len(
+            self._battle_summaries
+        )
 
     @property
     def n_lost_battles(self) -> int:
-        return len([None for b in self._battles.values() if b.lost])
+        return len([None for b in self._battles.values() if b.lost]) + len(
+            [None for s in self._battle_summaries.values() if s.lost]
+        )
 
     @property
     def n_tied_battles(self) -> int:
@@ -797,7 +1252,9 @@ class Player(ABC):
 
     @property
     def n_won_battles(self) -> int:
-        return len([None for b in self._battles.values() if b.won])
+        return len([None for b in self._battles.values() if b.won]) + len(
+            [None for s in self._battle_summaries.values() if s.won]
+        )
 
     @property
     def accept_open_team_sheet(self) -> bool:
@@ -809,10 +1266,14 @@ class Player(ABC):
 
     @property
     def logger(self) -> Logger:
+        if self.ps_client is None:
+            return getLogger(self._detached_username)
         return self.ps_client.logger
 
     @property
     def username(self) -> str:
+        if self.ps_client is None:
+            return self._detached_username
         return self.ps_client.username
 
     @property
@@ -820,3 +1281,34 @@ class Player(ABC):
         if self._team:
             return self._team.yield_team()
         return None
+
+
+_process_player: Optional[Player] = None
+
+
+def _init_process_player(player: Player):
+    global _process_player
+    _process_player = player
+
+
+def _choose_on_snapshot(
+    policy: Callable[[AbstractBattle], Any], snapshot: bytes
+) -> Any:
+    return policy(pickle.loads(snapshot))
+
+
+def _choose_in_process(battle: AbstractBattle, teampreview: bool) -> str:
+    assert _process_player is not None
+    choice = (
+        _process_player.teampreview(battle)
+        if teampreview
+        else _process_player.choose_move(battle)
+    )
+    if isinstance(choice, Awaitable):
+        if asyncio.iscoroutine(choice):
+            choice.close()
+        raise TypeError(
+            "Policies running in a process pool must return their choice directly, "
+            "not an awaitable."
+        )
+    return choice if teampreview else choice.message
@@ -1,15 +1,40 @@
 from poke_env.ps_client.account_configuration import AccountConfiguration
+from poke_env.ps_client.authentication import AuthenticationClient
+from poke_env.ps_client.connection_manager import ConnectionManager, ConnectionStatus
+from poke_env.ps_client.protocol_recorder import ProtocolRecord, ProtocolRecorder
 from poke_env.ps_client.ps_client import PSClient
+from poke_env.ps_client.send_queue import SendQueue, SendQueueStats
 from poke_env.ps_client.server_configuration import (
     LocalhostServerConfiguration,
     ServerConfiguration,
     ShowdownServerConfiguration,
 )
+from poke_env.ps_client.transport import (
+    ProcessTransport,
+    QueueTransport,
+    RecordingTransport,
+    ReplayTransport,
+    Transport,
+    WebsocketTransport,
+)
 
 __all__ = [
     "AccountConfiguration",
+    "AuthenticationClient",
+    "ConnectionManager",
+    "ConnectionStatus",
     "LocalhostServerConfiguration",
     "PSClient",
+    "ProcessTransport",
+    "ProtocolRecord",
+    "ProtocolRecorder",
+    "QueueTransport",
+    "RecordingTransport",
+    "ReplayTransport",
+    "SendQueue",
+    "SendQueueStats",
     "ServerConfiguration",
     "ShowdownServerConfiguration",
+    "Transport",
+    "WebsocketTransport",
 ]
@@ -0,0 +1,179 @@
+"""This module defines the client performing showdown authentication requests."""
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from time import monotonic
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from poke_env.concurrency import LIFECYCLE
+
+
+class _LoginSession(NamedTuple):
+    session: requests.Session
+    expires_at: float
+
+
+class AuthenticationClient:
+    """
+    Performs showdown authentication requests without blocking the event loop.
+
+    Requests run in a dedicated thread pool and share one pool of HTTP connections.
+    Each account keeps its own cookie jar: once an account has logged in with its
+    password, the login server's session cookie is cached and later challenges are
+    answered with an ``upkeep`` request, which does not resend the password. Cached
+    sessions expire after ``session_ttl`` seconds, and are dropped if the login server
+    rejects them.
+
+    Assertions themselves are never reused, as showdown binds them to the challenge
+    string of a single connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 16,
+        pool_maxsize: int = 16,
+        session_ttl: float = 3600.0,
+        timeout: float = 10.0,
+    ):
+        """
+        :param max_workers: Maximum number of concurrent authentication requests.
+        :type max_workers: int
+        :param pool_maxsize: Maximum number of pooled connections per host.
+        :type pool_maxsize: int
+        :param session_ttl: How long a login session is reused, in seconds.
+        :type session_ttl: float
+        :param timeout: Timeout of each authentication request, in seconds.
+        :type timeout: float
+        """
+        self._max_workers = max_workers
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self._session_ttl = session_ttl
+        self._timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sessions: Dict[Tuple[str, str], _LoginSession] = {}
+        self._lock = threading.Lock()
+
+    async def get_assertion(
+        self,
+        authentication_url: str,
+        username: str,
+        password: str,
+        challstr: str,
+        logger: Optional[Logger] = None,
+    ) -> str:
+        """Returns an assertion answering the server's challenge.
+
+        :param authentication_url: The authentication endpoint url.
+        :type authentication_url: str
+        :param username: The account's username.
+        :type username: str
+        :param password: The account's password.
+        :type password: str
+        :param challstr: The challenge string sent by the server.
+        :type challstr: str
+        :param logger: Logger reporting authentication steps. Optional.
+        :type logger: Logger, optional
+        :return: The assertion.
+        :rtype: str
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self._max_workers, thread_name_prefix="poke-env-auth"
+                )
+                LIFECYCLE.track_executor(self._executor, "poke-env-auth")
+            executor = self._executor
+        return await asyncio.get_running_loop().run_in_executor(
+            executor,
+            self._get_assertion,
+            authentication_url,
+            username,
+            password,
+            challstr,
+            logger,
+        )
+
+    def _get_assertion(
+        self,
+        authentication_url: str,
+        username: str,
+        password: str,
+        challstr: str,
+        logger: Optional[Logger],
+    ) -> str:
+        key = (authentication_url, username)
+        with self._lock:
+            cached = self._sessions.get(key)
+        if cached is not None and cached.expires_at > monotonic():
+            if logger is not None:
+                logger.info("Sending authentication upkeep request")
+            assertion = self._post(
+                cached.session,
+                authentication_url,
+                {"act": "upkeep", "challstr": challstr},
+            )
+            if self._is_valid(assertion):
+                return assertion
+            with self._lock:
+                self._sessions.pop(key, None)
+
+        if logger is not None:
+            logger.info("Sending authentication request")
+        session = requests.Session()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        assertion = self._post(
+            session,
+            authentication_url,
+            {"act": "login", "name": username, "pass": password, "challstr": challstr},
+        )
+        if self._is_valid(assertion):
+            with self._lock:
+                self._sessions[key] = _LoginSession(
+                    session, monotonic() + self._session_ttl
+                )
+        return assertion
+
+    def _post(self, session: requests.Session, url: str, data: Dict[str, str]) -> str:
+        response = session.post(url, data=data, timeout=self._timeout)
+        # Responses are prefixed with a ']' to prevent json hijacking
+        return json.loads(response.text[1:]).get("assertion") or ""
+
+    @staticmethod
+    def _is_valid(assertion: str) -> bool:
+        # Rejected requests return an error message starting with ';'
+        return bool(assertion) and not assertion.startswith(";")
+
+    def clear(self):
+        """Forgets every cached login session."""
+        with self._lock:
+            self._sessions.clear()
+
+    def close(self):
+        """Forgets cached sessions and stops the request thread pool."""
+        self.clear()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            LIFECYCLE.untrack_executor(executor)
+            executor.shutdown(wait=False)
+
+    @property
+    def n_cached_sessions(self) -> int:
+        """Number of cached login sessions, including expired ones.
+
+        :return: The number of cached sessions.
+        :rtype: int
+        """
+        return len(self._sessions)
+
+
+DEFAULT_AUTHENTICATION_CLIENT = AuthenticationClient()
+"""Authentication client shared by every PSClient that is not given its own."""
@@ -0,0 +1,259 @@
+"""This module defines a manager running many PSClients over a single event loop."""
+
+import asyncio
+import logging
+from time import perf_counter
+from typing import Dict, List, NamedTuple, Optional
+
+from poke_env.concurrency import POKE_LOOP, handle_threaded_coroutines
+from poke_env.ps_client.authentication import AuthenticationClient
+from poke_env.ps_client.ps_client import PSClient
+
+
+class ConnectionStatus(NamedTuple):
+    """Health of a managed connection."""
+
+    username: str
+    """The client's username."""
+    listening: bool
+    """Whether the client is listening to its transport."""
+    logged_in: bool
+    """Whether the client is logged in."""
+    idle_time: Optional[float]
+    """Seconds since the client received its last frame, or None if it received
+    none."""
+    n_restarts: int
+    """Number of times the manager restarted the client after it stopped."""
+
+
+class ConnectionManager:
+    """
+    Connects, monitors and shuts down many PSClients sharing an event loop.
+
+    Clients must be created with ``start_listening=False``, on the manager's loop, and
+    added with :meth:`add`. :meth:`start` then connects them concurrently, with at
+    most ``max_concurrent_logins`` logins in flight and connections opened
+    ``stagger`` seconds apart, which avoids tripping the server's connection rate
+    limits. Every client authenticates through the same
+    :class:`~poke_env.ps_client.authentication.AuthenticationClient`, sharing its
+    pooled HTTP connections.
+
+    Once started, the manager checks its clients every ``health_check_interval``
+    seconds, and restarts clients that stopped listening. :meth:`stop` shuts every
+    client down at once.
+
+    For players, add their client::
+
+        players = [RandomPlayer(start_listening=False) for _ in range(500)]
+        manager = ConnectionManager(max_concurrent_logins=32)
+        for player in players:
+            manager.add(player.ps_client)
+        await manager.start()
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent_logins: int = 16,
+        stagger: float = 0.0,
+        login_timeout: float = 30.0,
+        health_check_interval: Optional[float] = 10.0,
+        authentication_client: Optional[AuthenticationClient] = None,
+        loop: asyncio.AbstractEventLoop = POKE_LOOP,
+    ):
+        """
+        :param max_concurrent_logins: Maximum number of clients connecting and logging
+            in at once. Defaults to 16.
+        :type max_concurrent_logins: int
+        :param stagger: Delay between the starts of consecutive connections, in
+            seconds. Defaults to 0.
+        :type stagger: float
+        :param login_timeout: How long each client has to log in, in seconds.
+            Defaults to 30.
+        :type login_timeout: float
+        :param health_check_interval: Delay between health checks, in seconds. If
+            None, clients are not monitored. Defaults to 10.
+        :type health_check_interval: float, optional
+        :param authentication_client: Client performing the authentication requests
+            of every managed client. If None, clients keep their own.
+        :type authentication_client: AuthenticationClient, optional
+        :param loop: The event loop clients run in. Defaults to POKE_LOOP.
+        :type loop: asyncio.AbstractEventLoop
+        """
+        if max_concurrent_logins <= 0:
+            raise ValueError(
+                f"max_concurrent_logins must be positive, got {max_concurrent_logins}"
+            )
+        self._max_concurrent_logins = max_concurrent_logins
+        self._stagger = stagger
+        self._login_timeout = login_timeout
+        self._health_check_interval = health_check_interval
+        self._authentication_client = authentication_client
+        self.loop = loop
+
+        self._clients: List[PSClient] = []
+        self._listening: Dict[PSClient, asyncio.Task[None]] = {}
+        self._n_restarts: Dict[PSClient, int] = {}
+        self._health_task: Optional[asyncio.Task[None]] = None
+        self._logger = logging.getLogger(f"{__name__}.{type(self).__name__}")
+
+    def add(self, client: PSClient):
+        """Adds a client to the manager. It is connected by the next :meth:`start`.
+
+        :param client: The client, created with ``start_listening=False``.
+        :type client: PSClient
+        """
+        if client.loop is not self.loop:
+            raise ValueError(
+                f"{client.username}'s client does not run in the manager's loop"
+            )
+        if self._authentication_client is not None:
+            client.authentication_client = self._authentication_client
+        self._clients.append(client)
+        self._n_restarts[client] = 0
+
+    async def start(self) -> List[PSClient]:
+        """Connects and logs in every client that is not listening yet.
+
+        :return: The clients that failed to log in within ``login_timeout``.
+        :rtype: List[PSClient]
+        """
+        return await handle_threaded_coroutines(self._start(), self.loop)
+
+    async def _start(self) -> List[PSClient]:
+        semaphore = asyncio.Semaphore(self._max_concurrent_logins)
+        to_start = [c for c in self._clients if not self._is_listening(c)]
+
+        async def connect(index: int, client: PSClient) -> bool:
+            await asyncio.sleep(index * self._stagger)
+            async with semaphore:
+                self._listen(client)
+                try:
+                    await asyncio.wait_for(
+                        client.logged_in.wait(), timeout=self._login_timeout
+                    )
+                except asyncio.TimeoutError:
+                    return False
+                return True
+
+        start = perf_counter()
+        logged_in = await asyncio.gather(
+            *(connect(i, client) for i, client in enumerate(to_start))
+        )
+        failed = [client for client, ok in zip(to_start, logged_in) if not ok]
+        self._logger.info(
+            "Started %d clients in %.2fs, %d failed to log in",
+            len(to_start),
+            perf_counter() - start,
+            len(failed),
+        )
+        for client in failed:
+            self._logger.warning("%s failed to log in", client.username)
+
+        if self._health_check_interval is not None and (
+            self._health_task is None or self._health_task.done()
+        ):
+            self._health_task = asyncio.create_task(self._monitor())
+        return failed
+
+    async def stop(self, timeout: float = 5.0):
+        """Stops every client.
+
+        Clients whose listening did not stop within ``timeout`` seconds are cancelled.
+
+        :param timeout: How long clients have to stop, in seconds. Defaults to 5.
+        :type timeout: float
+        """
+        await handle_threaded_coroutines(self._stop(timeout), self.loop)
+
+    async def _stop(self, timeout: float):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+        await asyncio.gather(
+            *(client._stop_listening() for client in self._listening),
+            return_exceptions=True,
+        )
+        tasks = list(self._listening.values())
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._logger.warning(
+                    "Cancelled %d clients that did not stop within %.1fs",
+                    len(pending),
+                    timeout,
+                )
+                await asyncio.gather(*pending, return_exceptions=True)
+        self._listening.clear()
+
+    def check_health(self) -> List[ConnectionStatus]:
+        """Returns the health of every client, restarting clients that stopped.
+
+        Must be called from the manager's loop.
+
+        :return: The status of every client, in the order they were added.
+        :rtype: List[ConnectionStatus]
+        """
+        for client, task in list(self._listening.items()):
+            if task.done():
+                self._logger.warning(
+                    "%s stopped listening, restarting it", client.username
+                )
+                self._n_restarts[client] += 1
+                self._listen(client)
+        return self.statuses()
+
+    def statuses(self) -> List[ConnectionStatus]:
+        """Returns the health of every client.
+
+        :return: The status of every client, in the order they were added.
+        :rtype: List[ConnectionStatus]
+        """
+        now = perf_counter()
+        return [
+            ConnectionStatus(
+                username=client.username,
+                listening=self._is_listening(client),
+                logged_in=client.logged_in.is_set(),
+                idle_time=(
+                    now - client.last_received_at
+                    if client.last_received_at is not None
+                    else None
+                ),
+                n_restarts=self._n_restarts[client],
+            )
+            for client in self._clients
+        ]
+
+    def _is_listening(self, client: PSClient) -> bool:
+        task = self._listening.get(client)
+        return task is not None and not task.done()
+
+    def _listen(self, client: PSClient):
+        self._listening[client] = asyncio.create_task(client.listen())
+
+    async def _monitor(self):
+        assert self._health_check_interval is not None
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            statuses = self.check_health()
+            n_logged_in = sum(status.logged_in for status in statuses)
+            if n_logged_in < len(statuses):
+                self._logger.warning(
+                    "%d of %d clients are not logged in",
+                    len(statuses) - n_logged_in,
+                    len(statuses),
+                )
+
+    @property
+    def clients(self) -> List[PSClient]:
+        """The managed clients, in the order they were added.
+
+        :return: The clients.
+        :rtype: List[PSClient]
+        """
+        return list(self._clients)
@@ -0,0 +1,147 @@
+"""This module defines the dispatcher routing received frames to per-room queues."""
+
+import asyncio
+from logging import Logger
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from poke_env.ps_client.frame import ProtocolFrame
+
+FrameHandler = Callable[[ProtocolFrame], Awaitable[None]]
+
+
+class DispatcherStats(NamedTuple):
+    """Snapshot of a dispatcher's queues."""
+
+    n_rooms: int
+    """Number of rooms with a live worker."""
+    n_queued: int
+    """Number of frames currently waiting across all rooms."""
+    max_depth: int
+    """Highest queue depth observed in any room since the dispatcher was created."""
+    n_dispatched: int
+    """Total number of frames dispatched."""
+    n_blocked: int
+    """Number of dispatches that had to wait for room in a full queue."""
+
+
+class MessageDispatcher:
+    """
+    Routes frames to one bounded FIFO queue per room.
+
+    Each room is consumed by a single long-lived worker, which handles its frames one at
+    a time and in order. When a room's queue is full, :meth:`dispatch` waits for it to
+    drain, which propagates backpressure to the reader.
+    """
+
+    def __init__(self, handler: FrameHandler, logger: Logger, maxsize: int = 256):
+        """
+        :param handler: Coroutine function called with every frame.
+        :type handler: Callable[[ProtocolFrame], Awaitable[None]]
+        :param logger: Logger used to report handler failures.
+        :type logger: Logger
+        :param maxsize: Maximum number of frames waiting in each room's queue.
+        :type maxsize: int
+        """
+        self._handler = handler
+        self._logger = logger
+        self._maxsize = maxsize
+        self._queues: Dict[str, asyncio.Queue[Optional[ProtocolFrame]]] = {}
+        self._workers: Dict[str, asyncio.Task[None]] = {}
+        self._max_depth = 0
+        self._n_dispatched = 0
+        self._n_blocked = 0
+
+    async def dispatch(self, room: str, frame: ProtocolFrame):
+        """Queues a frame to be handled by the room's worker.
+
+        :param room: The room the frame belongs to.
+        :type room: str
+        :param frame: The frame.
+        :type frame: ProtocolFrame
+        """
+        queue = self._queues.get(room)
+        if queue is None:
+            queue = asyncio.Queue(self._maxsize)
+            self._queues[room] = queue
+            self._workers[room] = asyncio.create_task(self._work(room, queue))
+        if queue.full():
+            self._n_blocked += 1
+            await queue.put(frame)
+        else:
+            queue.put_nowait(frame)
+        self._n_dispatched += 1
+        depth = queue.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+
+    async def release(self, room: str):
+        """Stops the room's worker once the frames already queued are handled.
+
+        :param room: The room to release.
+        :type room: str
+        """
+        queue = self._queues.pop(room, None)
+        if queue is not None:
+            await queue.put(None)
+
+    async def join(self):
+        """Waits until every queued frame has been handled."""
+        for queue in list(self._queues.values()):
+            await queue.join()
+
+    async def close(self):
+        """Cancels every worker, dropping frames that have not been handled yet."""
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queues.clear()
+        self._workers.clear()
+
+    async def _work(self, room: str, queue: "asyncio.Queue[Optional[ProtocolFrame]]"):
+        try:
+            while True:
+                frame = await queue.get()
+                try:
+                    if frame is None:
+                        return
+                    await self._handler(frame)
+                except Exception:
+                    # The handler logs its own failures; keep serving the room
+                    self._logger.debug("Frame handling failed in room %s", room)
+                finally:
+                    queue.task_done()
+        finally:
+            if self._workers.get(room) is asyncio.current_task():
+                self._workers.pop(room)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Returns the number of frames waiting in each room's queue.
+
+        :return: Queue depth per room.
+        :rtype: Dict[str, int]
+        """
+        return {room: queue.qsize() for room, queue in self._queues.items()}
+
+    @property
+    def rooms(self) -> List[str]:
+        """Rooms whose frames are currently routed by the dispatcher.
+
+        :return: The rooms.
+        :rtype: List[str]
+        """
+        return list(self._queues)
+
+    def stats(self) -> DispatcherStats:
+        """Returns a snapshot of the dispatcher's queues.
+
+        :return: The dispatcher's statistics.
+        :rtype: DispatcherStats
+        """
+        return DispatcherStats(
+            n_rooms=len(self._workers),
+            n_queued=sum(queue.qsize() for queue in self._queues.values()),
+            max_depth=self._max_depth,
+            n_dispatched=self._n_dispatched,
+            n_blocked=self._n_blocked,
+        )
@@ -0,0 +1,128 @@
+"""This module defines a lazy view over showdown protocol frames."""
+
+from __future__ import annotations
+
+from time import perf_counter
+from typing import Any, Iterator, List, Optional, Sequence
+
+
+class ProtocolFrame(Sequence[List[str]]):
+    """
+    Read-only view of a showdown frame.
+
+    A frame is a newline-separated sequence of pipe-separated messages. The view
+    behaves like the list of split messages, ``[m.split("|") for m in
+    frame.split("\\n")]``, but only splits a line into fields when that line is
+    accessed. Routing information, such as the frame's room and kind, is read directly
+    from the raw frame.
+
+    Frames are timestamped with :func:`time.perf_counter` when created, which is when
+    they are received.
+    """
+
+    __slots__ = ("message", "received_at", "_lines", "_fields")
+
+    def __init__(self, message: str):
+        """
+        :param message: The raw frame.
+        :type message: str
+        """
+        self.message = message
+        self.received_at = perf_counter()
+        self._lines: Optional[List[str]] = None
+        self._fields: Optional[List[Optional[List[str]]]] = None
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ProtocolFrame):
+            return self.message == other.message
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._fields is None:
+            self._fields = [None] * len(self.lines)
+        fields = self._fields[index]
+        if fields is None:
+            fields = self.lines[index].split("|")
+            self._fields[index] = fields
+        return fields
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def iter_messages(self, start: int = 0) -> Iterator[List[str]]:
+        """Iterates over the split messages from a given line, splitting each line
+        when it is reached without caching it or building a list.
+
+        :param start: Index of the first line. Defaults to 0.
+        :type start: int
+        :return: An iterator over the split messages.
+        :rtype: Iterator[List[str]]
+        """
+        lines = self.lines
+        fields = self._fields
+        if fields is None:
+            for i in range(start, len(lines)):
+                yield lines[i].split("|")
+            return
+        for i in range(start, len(lines)):
+            split = fields[i]
+            yield lines[i].split("|") if split is None else split
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __repr__(self) -> str:
+        return f"ProtocolFrame({self.message!r})"
+
+    @property
+    def first_line(self) -> str:
+        """The frame's first line, without splitting the rest of the frame.
+
+        :return: The first line.
+        :rtype: str
+        """
+        if self._lines is not None:
+            return self._lines[0]
+        return self.message.partition("\n")[0]
+
+    @property
+    def kind(self) -> str:
+        """The message type of the frame's first line, eg. ``challstr`` or ``pm``.
+
+        Frames addressed to a room start with a ``>ROOMID`` line, in which case the
+        kind is an empty string.
+
+        :return: The frame's kind.
+        :rtype: str
+        """
+        parts = self.first_line.split("|", 2)
+        return parts[1] if len(parts) > 1 else ""
+
+    @property
+    def lines(self) -> List[str]:
+        """The frame's raw lines.
+
+        :return: The lines.
+        :rtype: List[str]
+        """
+        if self._lines is None:
+            self._lines = self.message.split("\n")
+        return self._lines
+
+    @property
+    def room(self) -> str:
+        """The room the frame is addressed to, or an empty string for global frames.
+
+        :return: The room id.
+        :rtype: str
+        """
+        if self.message.startswith(">"):
+            return self.first_line[1:]
+        return ""
@@ -0,0 +1,114 @@
+"""This module defines a recorder keeping the last protocol frames of each room."""
+
+import logging
+from collections import deque
+from logging import Logger
+from time import time
+from typing import Deque, Dict, List, NamedTuple
+
+
+class ProtocolRecord(NamedTuple):
+    """A recorded frame, with the direction it travelled in."""
+
+    timestamp: float
+    """Wall-clock time at which the frame was recorded."""
+    direction: str
+    """``<<<`` for received frames, ``>>>`` for sent messages."""
+    message: str
+    """The raw frame or message."""
+
+
+class ProtocolRecorder:
+    """
+    Keeps the last frames exchanged in each room in fixed-size ring buffers.
+
+    Recording a frame is a deque append, which keeps the recorder cheap enough to be
+    left on in production; the buffers are only formatted when dumped, typically when a
+    battle desyncs or showdown reports an error.
+    """
+
+    RECEIVED = "<<<"
+    SENT = ">>>"
+
+    def __init__(self, capacity: int = 64):
+        """
+        :param capacity: Number of frames kept per room.
+        :type capacity: int
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self._capacity = capacity
+        self._buffers: Dict[str, Deque[ProtocolRecord]] = {}
+
+    def record(self, room: str, direction: str, message: str):
+        """Records a frame.
+
+        :param room: The room the frame belongs to. Global frames use an empty string.
+        :type room: str
+        :param direction: :attr:`RECEIVED` or :attr:`SENT`.
+        :type direction: str
+        :param message: The raw frame or message.
+        :type message: str
+        """
+        buffer = self._buffers.get(room)
+        if buffer is None:
+            buffer = deque(maxlen=self._capacity)
+            self._buffers[room] = buffer
+        buffer.append(ProtocolRecord(time(), direction, message))
+
+    def discard(self, room: str):
+        """Forgets a room's frames.
+
+        :param room: The room to forget.
+        :type room: str
+        """
+        self._buffers.pop(room, None)
+
+    def dump(self, room: str, logger: Logger, level: int = logging.WARNING):
+        """Logs a room's recorded frames, oldest first.
+
+        :param room: The room to dump.
+        :type room: str
+        :param logger: The logger to write to.
+        :type logger: Logger
+        :param level: The level to log at. Defaults to WARNING.
+        :type level: int
+        """
+        records = self.records(room)
+        if not records or not logger.isEnabledFor(level):
+            return
+        logger.log(
+            level,
+            "Last %d protocol frames in room '%s':\n%s",
+            len(records),
+            room,
+            "\n".join(f"{r.timestamp:.3f} {r.direction} {r.message}" for r in records),
+        )
+
+    def records(self, room: str) -> List[ProtocolRecord]:
+        """Returns a room's recorded frames, oldest first.
+
+        :param room: The room.
+        :type room: str
+        :return: The recorded frames.
+        :rtype: List[ProtocolRecord]
+        """
+        return list(self._buffers.get(room, ()))
+
+    @property
+    def capacity(self) -> int:
+        """Number of frames kept per room.
+
+        :return: The capacity.
+        :rtype: int
+        """
+        return self._capacity
+
+    @property
+    def rooms(self) -> List[str]:
+        """Rooms with recorded frames.
+
+        :return: The rooms.
+        :rtype: List[str]
+        """
+        return list(self._buffers)
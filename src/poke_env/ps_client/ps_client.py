@@ -1,31 +1,40 @@
 """This module defines a base class for communicating with showdown servers."""
 
 import asyncio
-import json
 import logging
+import random
+import warnings
 from logging import Logger
 from time import perf_counter
-from typing import Awaitable, Callable, List, Optional, Set
+from typing import Awaitable, Callable, List, Optional, Sequence, Set, Union
 
-import requests
-import websockets as ws
 from websockets import ClientConnection
 from websockets.exceptions import ConnectionClosedOK
 
 from poke_env.concurrency import (
+    LIFECYCLE,
     POKE_LOOP,
     create_in_poke_loop,
     handle_threaded_coroutines,
 )
 from poke_env.exceptions import ShowdownException
 from poke_env.ps_client.account_configuration import AccountConfiguration
+from poke_env.ps_client.authentication import (
+    DEFAULT_AUTHENTICATION_CLIENT,
+    AuthenticationClient,
+)
+from poke_env.ps_client.dispatcher import MessageDispatcher
+from poke_env.ps_client.frame import ProtocolFrame
+from poke_env.ps_client.protocol_recorder import ProtocolRecorder
+from poke_env.ps_client.send_queue import SendQueue
 from poke_env.ps_client.server_configuration import ServerConfiguration
+from poke_env.ps_client.transport import Transport, WebsocketTransport
 
-BattleMessageCallback = Callable[[List[List[str]]], Awaitable[None]]
+BattleMessageCallback = Callable[[Sequence[List[str]]], Awaitable[None]]
 ChallengeCallback = Callable[[List[str]], Awaitable[None]]
 
 
-async def _noop_battle_message(split_messages: List[List[str]]) -> None:
+async def _noop_battle_message(split_messages: Sequence[List[str]]) -> None:
     return None
 
 
@@ -57,6 +66,15 @@ class PSClient:
         ping_interval: Optional[float] = 20.0,
         ping_timeout: Optional[float] = 20.0,
         loop: asyncio.AbstractEventLoop = POKE_LOOP,
+        transport: Optional[Transport] = None,
+        max_room_queue_size: int = 256,
+        protocol_trace_size: int = 0,
+        authentication_client: Optional[AuthenticationClient] = None,
+        max_reconnect_attempts: int = 0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        send_interval: float = 0.0,
+        send_burst: int = 6,
     ):
         """
         :param account_configuration: Account configuration.
@@ -83,12 +101,53 @@ class PSClient:
             Increase only if timeouts occur during runtime).
             If None pings will never time out.
         :type ping_timeout: float, optional
+        :param transport: Transport used to communicate with the server. If None, a
+            websocket transport connecting to the server configuration's websocket url
+            is used.
+        :type transport: Transport, optional
+        :param max_room_queue_size: Maximum number of frames waiting to be handled in
+            each battle room. Reading from the transport pauses while a room's queue is
+            full. Defaults to 256.
+        :type max_room_queue_size: int
+        :param protocol_trace_size: Number of frames recorded per room, to be dumped
+            when something goes wrong. If 0, recording is disabled. Defaults to 0.
+        :type protocol_trace_size: int
+        :param authentication_client: Client performing authentication requests. If
+            None, a client shared by every PSClient is used.
+        :type authentication_client: AuthenticationClient, optional
+        :param max_reconnect_attempts: Number of consecutive attempts made to reconnect
+            when the connection drops. If 0, the client stops listening when the
+            connection drops. Defaults to 0.
+        :type max_reconnect_attempts: int
+        :param reconnect_delay: Base delay before reconnecting, in seconds. The delay
+            doubles with every failed attempt, and is jittered. Defaults to 1.
+        :type reconnect_delay: float
+        :param max_reconnect_delay: Maximum delay before reconnecting, in seconds.
+            Defaults to 30.
+        :type max_reconnect_delay: float
+        :param send_interval: Minimum delay between outgoing frames once the burst is
+            spent, in seconds. Showdown's main server throttles regular users at
+            0.6s. If 0, outgoing frames are only paced after the server reports a
+            dropped message. Defaults to 0.
+        :type send_interval: float
+        :param send_burst: Number of outgoing frames that can be sent back to back
+            before pacing applies. Defaults to 6.
+        :type send_burst: int
         """
         self._active_tasks: Set[asyncio.Task] = set()
-        self._battle_locks: dict[str, asyncio.Lock] = {}
         self._open_timeout = open_timeout
         self._ping_interval = ping_interval
         self._ping_timeout = ping_timeout
+        self._transport = transport
+        self._max_reconnect_attempts = max_reconnect_attempts
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._rooms_to_rejoin: Set[str] = set()
+        self._stopping = False
+        self._last_received_at: Optional[float] = None
+        self._authentication_client = (
+            authentication_client or DEFAULT_AUTHENTICATION_CLIENT
+        )
 
         self._server_configuration = server_configuration
         self._account_configuration = account_configuration
@@ -102,15 +161,28 @@ class PSClient:
         self._logged_in: asyncio.Event = create_in_poke_loop(asyncio.Event, loop)
         self._sending_lock: asyncio.Lock = create_in_poke_loop(asyncio.Lock, loop)
 
-        self.websocket: ClientConnection
         self._logger: Logger = self._create_logger(log_level)
+        self._recorder: Optional[ProtocolRecorder] = (
+            ProtocolRecorder(protocol_trace_size) if protocol_trace_size else None
+        )
+        self._dispatcher = MessageDispatcher(
+            self._handle_message, self._logger, maxsize=max_room_queue_size
+        )
+        self._send_queue = SendQueue(
+            self._send_frame,
+            self._logger,
+            send_interval=send_interval,
+            burst=send_burst,
+        )
+
+        LIFECYCLE.track_client(self)
 
         if start_listening:
             self._listening_coroutine = asyncio.run_coroutine_threadsafe(
                 self.listen(), self.loop
             )
 
-    async def _handle_battle_message(self, split_messages: List[List[str]]) -> None:
+    async def _handle_battle_message(self, split_messages: Sequence[List[str]]) -> None:
         await self._on_battle_message(split_messages)
 
     async def _update_challenges(self, split_message: List[str]) -> None:
@@ -121,13 +193,17 @@ class PSClient:
 
     async def accept_challenge(self, username: str, packed_team: Optional[str]):
         assert self.logged_in.is_set(), f"Expected {self.username} to be logged in."
-        await self.set_team(packed_team)
-        await self.send_message("/accept %s" % username)
+        # Both messages are queued together, and go out as a single frame
+        await asyncio.gather(
+            self.set_team(packed_team), self.send_message("/accept %s" % username)
+        )
 
     async def challenge(self, username: str, format_: str, packed_team: Optional[str]):
         assert self.logged_in.is_set(), f"Expected {self.username} to be logged in."
-        await self.set_team(packed_team)
-        await self.send_message(f"/challenge {username}, {format_}")
+        await asyncio.gather(
+            self.set_team(packed_team),
+            self.send_message(f"/challenge {username}, {format_}"),
+        )
 
     def _create_logger(self, log_level: Optional[int]) -> Logger:
         """Creates a logger for the client.
@@ -153,85 +229,84 @@ class PSClient:
         logger.addHandler(stream_handler)
         return logger
 
-    async def _handle_message(self, message: str):
+    async def _handle_message(self, message: Union[str, ProtocolFrame]):
         """Handle received messages.
 
-        :param message: The message to parse.
-        :type message: str
+        :param message: The message to parse, raw or wrapped in a frame.
+        :type message: str or ProtocolFrame
         """
+        frame = (
+            message if isinstance(message, ProtocolFrame) else ProtocolFrame(message)
+        )
         try:
-            # Showdown websocket messages are pipe-separated sequences
-            split_messages = [m.split("|") for m in message.split("\n")]
-            # The type of message is determined by the first entry in the message
-            # For battles, this is the zero-th entry
-            # Otherwise it is the one-th entry
-            if split_messages[0][0].startswith((">battle", ">game")):
+            # Showdown websocket messages are pipe-separated sequences, which are only
+            # split when read. Battle frames start with their room id, other frames are
+            # routed on the type of their first message
+            kind = frame.kind
+            if frame.message.startswith((">battle", ">game")):
                 # Battle update or best-of room
-                battle_tag = split_messages[0][0][1:]
-                if battle_tag not in self._battle_locks:
-                    self._battle_locks[battle_tag] = asyncio.Lock()
-                async with self._battle_locks[battle_tag]:
-                    await self._handle_battle_message(split_messages)  # type: ignore
-                if "|deinit" in message:
-                    self._battle_locks.pop(battle_tag)
-            elif split_messages[0][1] == "challstr":
+                # Frames of a given room are handled in order by the dispatcher
+                await self._handle_battle_message(frame)
+            elif kind == "challstr":
                 # Confirms connection to the server: we can login
-                await self.log_in(split_messages[0])
-            elif split_messages[0][1] == "updateuser":
-                if split_messages[0][2] in [
-                    " " + self.username,
-                    " " + self.username + "@!",
-                ]:
+                await self.log_in(frame[0])
+            elif kind == "updateuser":
+                if frame[0][2] in [" " + self.username, " " + self.username + "@!"]:
                     # Confirms successful login
                     self.logged_in.set()
-                elif not split_messages[0][2].startswith(" Guest "):
+                    if self._rooms_to_rejoin:
+                        await self._rejoin_rooms()
+                elif not frame[0][2].startswith(" Guest "):
                     self.logger.warning(
                         """Trying to login as %s, showdown returned %s """
                         """- this might prevent future actions from this agent. """
                         """Changing the agent's username might solve this problem.""",
                         self.username,
-                        split_messages[0][2],
+                        frame[0][2],
                     )
-            elif "updatechallenges" in split_messages[0][1]:
+            elif "updatechallenges" in kind:
                 # Contain information about current challenge
-                await self._update_challenges(split_messages[0])  # type: ignore
-            elif split_messages[0][1] == "updatesearch":
+                await self._update_challenges(frame[0])
+            elif kind == "updatesearch":
                 pass
-            elif split_messages[0][1] == "popup":
-                self.logger.warning("Popup message received: %s", message)
-            elif split_messages[0][1] in ["nametaken"]:
-                self.logger.critical("Error message received: %s", message)
-                raise ShowdownException("Error message received: %s", message)
-            elif split_messages[0][1] == "pm":
-                if len(split_messages) == 1:
-                    if split_messages[0][4].startswith("/challenge"):
-                        await self._handle_challenge_request(split_messages[0])  # type: ignore
-                    elif split_messages[0][4].startswith("/text"):
-                        self.logger.info("Received pm with text: %s", message)
-                    elif split_messages[0][4].startswith("/nonotify"):
-                        self.logger.info("Received pm: %s", message)
-                    elif split_messages[0][4].startswith("/log"):
-                        self.logger.info("Received pm: %s", message)
+            elif kind == "popup":
+                self.logger.warning("Popup message received: %s", frame.message)
+            elif kind in ["nametaken"]:
+                self.logger.critical("Error message received: %s", frame.message)
+                raise ShowdownException("Error message received: %s", frame.message)
+            elif kind == "pm":
+                if len(frame) == 1:
+                    if frame[0][4].startswith("/challenge"):
+                        await self._handle_challenge_request(frame[0])
+                    elif frame[0][4].startswith("/text"):
+                        self.logger.info("Received pm with text: %s", frame.message)
+                    elif frame[0][4].startswith("/nonotify"):
+                        self.logger.info("Received pm: %s", frame.message)
+                    elif frame[0][4].startswith("/log"):
+                        self.logger.info("Received pm: %s", frame.message)
                     else:
-                        self.logger.warning("Received pm: %s", message)
-                elif len(split_messages) == 2:
-                    self.logger.info("Received pm: %s", message)
+                        self.logger.warning("Received pm: %s", frame.message)
+                elif len(frame) == 2:
+                    self.logger.info("Received pm: %s", frame.message)
                 else:
                     raise ValueError(
-                        f"Expected len({split_messages}) to be 1 or 2, got {len(split_messages)}"
+                        f"Expected len({list(frame)}) to be 1 or 2, got {len(frame)}"
                     )
             else:
-                self.logger.warning("Unhandled message: %s", message)
+                self.logger.warning("Unhandled message: %s", frame.message)
         except asyncio.CancelledError as e:
             self.logger.critical("CancelledError intercepted: %s", e)
         except Exception as exception:
             self.logger.exception(
-                "Unhandled exception raised while handling message:\n%s", message
+                "Unhandled exception raised while handling message:\n%s", frame.message
             )
+            self.dump_protocol_trace(frame.room)
             raise exception
 
     async def _stop_listening(self):
-        await self.websocket.close()
+        self._stopping = True
+        await self.transport.close()
+        await self._send_queue.close()
 
     async def change_avatar(self, avatar_name: Optional[str]):
         """Changes the account's avatar.
@@ -243,23 +318,82 @@ class PSClient:
         if avatar_name is not None:
             await self.send_message(f"/avatar {avatar_name}")
 
+    def dump_protocol_trace(self, room: str, level: int = logging.WARNING):
+        """Logs the last frames exchanged in a room, if protocol tracing is enabled.
+
+        :param room: The room, without leading '>'. Global frames use an empty string.
+        :type room: str
+        :param level: The level to log at. Defaults to WARNING.
+        :type level: int
+        """
+        if self._recorder is not None:
+            self._recorder.dump(room, self.logger, level)
+
     async def listen(self):
-        """Listen to a showdown websocket and dispatch messages to be handled."""
-        self.logger.info("Starting listening to showdown websocket")
+        """Listen to the transport and dispatch messages to be handled.
+
+        If the connection drops and reconnection is enabled, the client reconnects
+        with a jittered exponential backoff, logs back in and rejoins the battle rooms
+        it was in.
+        """
+        self.logger.info(
+            "Starting listening to showdown with %s", type(self.transport).__name__
+        )
+        self._stopping = False
+        n_attempts = 0
+        while True:
+            await self._listen_once()
+            if self.logged_in.is_set():
+                n_attempts = 0
+            if self._stopping or n_attempts >= self._max_reconnect_attempts:
+                return
+            n_attempts += 1
+            self.logged_in.clear()
+            self._rooms_to_rejoin.update(self._dispatcher.rooms)
+            delay = random.uniform(
+                0,
+                min(
+                    self._max_reconnect_delay,
+                    self._reconnect_delay * 2 ** (n_attempts - 1),
+                ),
+            )
+            self.logger.warning(
+                "Connection lost, reconnecting in %.2fs (attempt %d of %d)",
+                delay,
+                n_attempts,
+                self._max_reconnect_attempts,
+            )
+            await asyncio.sleep(delay)
+
+    async def _listen_once(self):
         try:
-            async with ws.connect(
-                self.websocket_url,
-                max_queue=None,
-                open_timeout=self._open_timeout,
-                ping_interval=self._ping_interval,
-                ping_timeout=self._ping_timeout,
-            ) as websocket:
-                self.websocket = websocket
-                async for message in websocket:
-                    self.logger.info("\033[92m\033[1m<<<\033[0m %s", message)
-                    task = asyncio.create_task(self._handle_message(str(message)))
-                    self._active_tasks.add(task)
-                    task.add_done_callback(self._active_tasks.discard)
+            async with self.transport as transport:
+                async for message in transport:
+                    # Traces are kept by the protocol recorder, frames are only
+                    # logged when debugging
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("\033[92m\033[1m<<<\033[0m %s", message)
+                    frame = ProtocolFrame(message)
+                    self._last_received_at = frame.received_at
+                    if SendQueue.THROTTLE_NOTICE in message:
+                        self._send_queue.notify_throttled()
+                    if self._recorder is not None:
+                        self._recorder.record(
+                            frame.room, ProtocolRecorder.RECEIVED, message
+                        )
+                    if message.startswith((">battle", ">game")):
+                        # Battle rooms are served by long-lived ordered workers
+                        room = frame.room
+                        await self._dispatcher.dispatch(room, frame)
+                        if "|deinit" in message:
+                            await self._dispatcher.release(room)
+                            self._rooms_to_rejoin.discard(room)
+                            if self._recorder is not None:
+                                self._recorder.discard(room)
+                    else:
+                        task = asyncio.create_task(self._handle_message(frame))
+                        self._active_tasks.add(task)
+                        task.add_done_callback(self._active_tasks.discard)
 
         except ConnectionClosedOK:
             self.logger.warning(
@@ -267,9 +401,20 @@ class PSClient:
             )
         except (asyncio.CancelledError, RuntimeError) as e:
             self.logger.critical("Listen interrupted by %s", e)
+            self._stopping = True
         except Exception as e:
             self.logger.exception(e)
 
+    async def _rejoin_rooms(self):
+        """Rejoins the rooms left open by a dropped connection.
+
+        Showdown answers with the room's full log, from which battles are resumed.
+        """
+        rooms, self._rooms_to_rejoin = self._rooms_to_rejoin, set()
+        for room in sorted(rooms):
+            self.logger.info("Rejoining %s", room)
+            await self.send_message(f"/join {room}")
+
     async def log_in(self, split_message: List[str]):
         """Log in with specified username and password.
 
@@ -280,18 +425,13 @@ class PSClient:
         :type split_message: List[str]
         """
         if self.account_configuration.password:
-            log_in_request = requests.post(
+            assertion = await self._authentication_client.get_assertion(
                 self.server_configuration.authentication_url,
-                data={
-                    "act": "login",
-                    "name": self.account_configuration.username,
-                    "pass": self.account_configuration.password,
-                    "challstr": split_message[2] + "%7C" + split_message[3],
-                },
-                timeout=10.0,
+                self.account_configuration.username,
+                self.account_configuration.password,
+                split_message[2] + "%7C" + split_message[3],
+                self.logger,
             )
-            self.logger.info("Sending authentication request")
-            assertion = json.loads(log_in_request.text[1:])["assertion"]
         else:
             self.logger.info("Bypassing authentication request")
             assertion = ""
@@ -301,8 +441,9 @@ class PSClient:
         await self.change_avatar(self._avatar)
 
     async def search_ladder_game(self, format_: str, packed_team: Optional[str]):
-        await self.set_team(packed_team)
-        await self.send_message(f"/search {format_}")
+        await asyncio.gather(
+            self.set_team(packed_team), self.send_message(f"/search {format_}")
+        )
 
     async def send_message(
         self, message: str, room: str = "", message_2: Optional[str] = None
@@ -311,6 +452,10 @@ class PSClient:
 
         `message_2` can be used to send a sequence of length 2.
 
+        The message goes through the client's send queue, and may be sent in the same
+        frame as other messages addressed to the room. This coroutine returns once the
+        message has been written to the transport.
+
         :param message: The message to send.
         :type message: str
         :param room: The room to which the message should be sent.
@@ -319,11 +464,15 @@ class PSClient:
         :type message_2: str, optional
         """
         if message_2:
-            to_send = "|".join([room, message, message_2])
-        else:
-            to_send = "|".join([room, message])
-        self.logger.info("\033[93m\033[1m>>>\033[0m %s", to_send)
-        await self.websocket.send(to_send)
+            message = "|".join([message, message_2])
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("\033[93m\033[1m>>>\033[0m %s|%s", room, message)
+        if self._recorder is not None:
+            self._recorder.record(room, ProtocolRecorder.SENT, f"{room}|{message}")
+        await self._send_queue.send(message, room)
+
+    async def _send_frame(self, frame: str):
+        await self.transport.send(frame)
 
     async def set_team(self, packed_team: Optional[str]):
         if packed_team:
@@ -351,6 +500,37 @@ class PSClient:
         """
         return self._account_configuration
 
+    @property
+    def authentication_client(self) -> AuthenticationClient:
+        """Client performing the authentication requests made when logging in.
+
+        :return: The authentication client.
+        :rtype: AuthenticationClient
+        """
+        return self._authentication_client
+
+    @authentication_client.setter
+    def authentication_client(self, authentication_client: AuthenticationClient):
+        self._authentication_client = authentication_client
+
+    @property
+    def dispatcher(self) -> MessageDispatcher:
+        """Dispatcher routing battle room frames to their ordered queues.
+
+        :return: The dispatcher.
+        :rtype: MessageDispatcher
+        """
+        return self._dispatcher
+
+    @property
+    def last_received_at(self) -> Optional[float]:
+        """When the last frame was received, as a :func:`time.perf_counter` value.
+
+        :return: The receipt time of the last frame, or None if no frame was received.
+        :rtype: float, optional
+        """
+        return self._last_received_at
+
     @property
     def logged_in(self) -> asyncio.Event:
         """Event object associated with user login.
@@ -369,6 +549,24 @@ class PSClient:
         """
         return self._logger
 
+    @property
+    def protocol_recorder(self) -> Optional[ProtocolRecorder]:
+        """Recorder keeping the last frames of each room, if tracing is enabled.
+
+        :return: The protocol recorder.
+        :rtype: ProtocolRecorder, optional
+        """
+        return self._recorder
+
+    @property
+    def send_queue(self) -> SendQueue:
+        """The queue pacing and coalescing outgoing messages.
+
+        :return: The send queue.
+        :rtype: SendQueue
+        """
+        return self._send_queue
+
     @property
     def server_configuration(self) -> ServerConfiguration:
         """The client's server configuration.
@@ -378,6 +576,24 @@ class PSClient:
         """
         return self._server_configuration
 
+    @property
+    def transport(self) -> Transport:
+        """The transport used to communicate with the server.
+
+        Defaults to a websocket transport connecting to the websocket url.
+
+        :return: The transport.
+        :rtype: Transport
+        """
+        if self._transport is None:
+            self._transport = WebsocketTransport(
+                self.websocket_url,
+                open_timeout=self._open_timeout,
+                ping_interval=self._ping_interval,
+                ping_timeout=self._ping_timeout,
+            )
+        return self._transport
+
     @property
     def username(self) -> str:
         """The account's username.
@@ -387,6 +603,25 @@ class PSClient:
         """
         return self.account_configuration.username
 
+    @property
+    def websocket(self) -> Optional[ClientConnection]:
+        """The websocket connection, if the client uses a websocket transport.
+
+        Deprecated: use :attr:`transport` instead.
+
+        :return: The websocket connection, or None if the client is not connected
+            through a websocket transport.
+        :rtype: ClientConnection, optional
+        """
+        warnings.warn(
+            "PSClient.websocket is deprecated, use PSClient.transport instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if isinstance(self.transport, WebsocketTransport):
+            return self.transport.websocket
+        return None
+
     @property
     def websocket_url(self) -> str:
         """The websocket url.
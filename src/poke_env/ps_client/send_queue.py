@@ -0,0 +1,240 @@
+"""This module defines the queue pacing and coalescing outgoing messages."""
+
+import asyncio
+from collections import deque
+from logging import Logger
+from time import perf_counter
+from typing import Awaitable, Callable, Deque, List, NamedTuple, Optional
+
+MessageSender = Callable[[str], Awaitable[None]]
+
+
+class _OutboundMessage(NamedTuple):
+    room: str
+    text: str
+    future: "asyncio.Future[None]"
+    queued_at: float
+
+
+class SendQueueStats(NamedTuple):
+    """Snapshot of a send queue."""
+
+    n_queued: int
+    """Number of messages currently waiting to be sent."""
+    max_depth: int
+    """Highest number of waiting messages observed since the queue was created."""
+    n_messages: int
+    """Total number of messages sent."""
+    n_frames: int
+    """Total number of frames written to the transport."""
+    n_throttled: int
+    """Number of throttle notices received from the server."""
+    mean_latency: float
+    """Mean delay between queueing a message and sending it, in seconds."""
+    max_latency: float
+    """Highest delay between queueing a message and sending it, in seconds."""
+
+
+class SendQueue:
+    """
+    Serializes the messages sent over a connection.
+
+    Messages are sent in the order they are queued. Consecutive messages waiting for
+    the same room are coalesced into a single multi-line frame, which showdown handles
+    line by line.
+
+    Showdown throttles the messages of each user: past a small buffer, messages sent
+    faster than the throttle delay are dropped. When ``send_interval`` is set, the
+    queue paces frames with a token bucket allowing ``burst`` frames at once, then one
+    frame every ``send_interval`` seconds. When the server reports that a message was
+    dropped, the queue falls back to the server's throttle delay for
+    ``throttle_cooldown`` seconds.
+    """
+
+    MAX_LINES = 3
+    """Maximum number of lines showdown accepts in a single frame from regular users."""
+    SERVER_THROTTLE_DELAY = 0.6
+    """Delay enforced by showdown between the messages of regular users, in seconds."""
+    THROTTLE_NOTICE = "message-throttle-notice"
+    """Marker of the notice sent by showdown when it drops a message."""
+
+    def __init__(
+        self,
+        send: MessageSender,
+        logger: Logger,
+        *,
+        send_interval: float = 0.0,
+        burst: int = 6,
+        max_lines: int = MAX_LINES,
+        throttle_cooldown: float = 60.0,
+    ):
+        """
+        :param send: Coroutine function writing a frame to the transport.
+        :type send: Callable[[str], Awaitable[None]]
+        :param logger: Logger used to report throttling.
+        :type logger: Logger
+        :param send_interval: Minimum delay between frames once the burst is spent,
+            in seconds. If 0, frames are only paced after a throttle notice.
+            Defaults to 0.
+        :type send_interval: float
+        :param burst: Number of frames that can be sent back to back. Defaults to 6.
+        :type burst: int
+        :param max_lines: Maximum number of lines in a coalesced frame. Defaults to 3.
+        :type max_lines: int
+        :param throttle_cooldown: How long the server's throttle delay is enforced
+            after a throttle notice, in seconds. Defaults to 60.
+        :type throttle_cooldown: float
+        """
+        if burst <= 0:
+            raise ValueError(f"burst must be positive, got {burst}")
+        if max_lines <= 0:
+            raise ValueError(f"max_lines must be positive, got {max_lines}")
+        self._send = send
+        self._logger = logger
+        self._send_interval = send_interval
+        self._burst = burst
+        self._max_lines = max_lines
+        self._throttle_cooldown = throttle_cooldown
+
+        self._pending: Deque[_OutboundMessage] = deque()
+        self._worker: Optional[asyncio.Task[None]] = None
+        self._in_flight: List[_OutboundMessage] = []
+        self._tokens = float(burst)
+        self._last_refill = perf_counter()
+        self._throttled_until = 0.0
+
+        self._max_depth = 0
+        self._n_messages = 0
+        self._n_frames = 0
+        self._n_throttled = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    async def send(self, text: str, room: str = ""):
+        """Queues a message and waits until it is written to the transport.
+
+        :param text: The message, without its room prefix.
+        :type text: str
+        :param room: The room the message is addressed to.
+        :type room: str
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_OutboundMessage(room, text, future, perf_counter()))
+        if len(self._pending) > self._max_depth:
+            self._max_depth = len(self._pending)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+        await future
+
+    def notify_throttled(self):
+        """Slows sending down after the server reported a dropped message."""
+        self._n_throttled += 1
+        self._throttled_until = perf_counter() + self._throttle_cooldown
+        self._tokens = 0.0
+        self._logger.warning(
+            "Showdown dropped a message sent too quickly, pacing messages every %.2fs",
+            self.SERVER_THROTTLE_DELAY,
+        )
+
+    async def close(self):
+        """Stops sending, cancelling the messages that have not been sent yet."""
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+        # The batch being sent when the worker was cancelled left the pending queue
+        in_flight, self._in_flight = self._in_flight, []
+        for message in in_flight:
+            message.future.cancel()
+        while self._pending:
+            self._pending.popleft().future.cancel()
+
+    async def _work(self):
+        while self._pending:
+            await self._wait_for_token()
+            batch = self._in_flight = self._next_batch()
+            frame = batch[0].room + "|" + "\n".join(m.text for m in batch)
+            try:
+                await self._send(frame)
+            except Exception as exception:
+                self._in_flight = []
+                for message in batch:
+                    if not message.future.done():
+                        message.future.set_exception(exception)
+                continue
+            self._in_flight = []
+            sent_at = perf_counter()
+            self._n_frames += 1
+            for message in batch:
+                latency = sent_at - message.queued_at
+                self._total_latency += latency
+                if latency > self._max_latency:
+                    self._max_latency = latency
+                if not message.future.done():
+                    message.future.set_result(None)
+            self._n_messages += len(batch)
+
+    def _next_batch(self) -> List[_OutboundMessage]:
+        first = self._pending.popleft()
+        batch = [first]
+        n_lines = first.text.count("\n") + 1
+        while self._pending and self._pending[0].room == first.room:
+            n_lines += self._pending[0].text.count("\n") + 1
+            if n_lines > self._max_lines:
+                break
+            batch.append(self._pending.popleft())
+        return batch
+
+    async def _wait_for_token(self):
+        interval = self.send_interval
+        if interval <= 0:
+            return
+        now = perf_counter()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._last_refill) / interval
+        )
+        self._last_refill = now
+        if self._tokens < 1:
+            delay = (1 - self._tokens) * interval
+            await asyncio.sleep(delay)
+            self._tokens = 1.0
+            self._last_refill = perf_counter()
+        self._tokens -= 1
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be sent.
+
+        :return: The queue depth.
+        :rtype: int
+        """
+        return len(self._pending)
+
+    @property
+    def send_interval(self) -> float:
+        """Current minimum delay between frames once the burst is spent, in seconds.
+
+        :return: The send interval.
+        :rtype: float
+        """
+        if perf_counter() < self._throttled_until:
+            return max(self._send_interval, self.SERVER_THROTTLE_DELAY)
+        return self._send_interval
+
+    def stats(self) -> SendQueueStats:
+        """Returns a snapshot of the queue.
+
+        :return: The queue's statistics.
+        :rtype: SendQueueStats
+        """
+        return SendQueueStats(
+            n_queued=len(self._pending),
+            max_depth=self._max_depth,
+            n_messages=self._n_messages,
+            n_frames=self._n_frames,
+            n_throttled=self._n_throttled,
+            mean_latency=(
+                self._total_latency / self._n_messages if self._n_messages else 0.0
+            ),
+            max_latency=self._max_latency,
+        )
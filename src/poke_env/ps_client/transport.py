@@ -0,0 +1,405 @@
+"""This module defines the transports PSClient can use to exchange frames with a
+showdown server or a local stand-in."""
+
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import orjson
+import websockets as ws
+from websockets import ClientConnection
+
+SendCallback = Callable[[str], Awaitable[None]]
+
+
+class Transport(ABC):
+    """
+    Base class for transports.
+
+    A transport carries showdown protocol frames: each received item is a full frame,
+    as it would be received from a showdown websocket, and each sent item is a
+    ``ROOM|TEXT`` message.
+
+    Transports are used as async context managers, and iterated to receive frames::
+
+        async with transport:
+            async for frame in transport:
+                ...
+    """
+
+    async def __aenter__(self) -> Transport:
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self.frames()
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Opens the transport."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Closes the transport. Pending iterations terminate once it is closed."""
+        pass
+
+    @abstractmethod
+    def frames(self) -> AsyncIterator[str]:
+        """Returns an async iterator over received frames.
+
+        :return: An async iterator over received frames.
+        :rtype: AsyncIterator[str]
+        """
+        pass
+
+    @abstractmethod
+    async def send(self, message: str) -> None:
+        """Sends a message.
+
+        :param message: The message to send.
+        :type message: str
+        """
+        pass
+
+
+class WebsocketTransport(Transport):
+    """Transport communicating with a showdown server over a websocket."""
+
+    def __init__(
+        self,
+        websocket_url: str,
+        *,
+        open_timeout: Optional[float] = 10.0,
+        ping_interval: Optional[float] = 20.0,
+        ping_timeout: Optional[float] = 20.0,
+        max_queue: Optional[int] = 16,
+    ):
+        """
+        :param websocket_url: The websocket url.
+        :type websocket_url: str
+        :param open_timeout: How long to wait for a timeout when connecting the socket.
+            If None connect will never time out.
+        :type open_timeout: float, optional
+        :param ping_interval: How long between keepalive pings. If None, disables
+            keepalive entirely.
+        :type ping_interval: float, optional
+        :param ping_timeout: How long to wait for a timeout of a specific ping. If None
+            pings will never time out.
+        :type ping_timeout: float, optional
+        :param max_queue: Maximum number of received frames buffered before reading
+            from the network pauses. If None, the buffer is unbounded.
+        :type max_queue: int, optional
+        """
+        self._websocket_url = websocket_url
+        self._open_timeout = open_timeout
+        self._ping_interval = ping_interval
+        self._ping_timeout = ping_timeout
+        self._max_queue = max_queue
+        self.websocket: Optional[ClientConnection] = None
+
+    async def connect(self) -> None:
+        self.websocket = await ws.connect(
+            self._websocket_url,
+            max_queue=self._max_queue,
+            open_timeout=self._open_timeout,
+            ping_interval=self._ping_interval,
+            ping_timeout=self._ping_timeout,
+        )
+
+    async def close(self) -> None:
+        if self.websocket is not None:
+            await self.websocket.close()
+
+    async def frames(self) -> AsyncIterator[str]:
+        assert self.websocket is not None, "Transport is not connected."
+        async for message in self.websocket:
+            yield str(message)
+
+    async def send(self, message: str) -> None:
+        assert self.websocket is not None, "Transport is not connected."
+        await self.websocket.send(message)
+
+    @property
+    def websocket_url(self) -> str:
+        """The websocket url.
+
+        :return: The websocket url.
+        :rtype: str
+        """
+        return self._websocket_url
+
+
+class QueueTransport(Transport):
+    """In-process transport backed by a queue.
+
+    Frames are fed with :meth:`feed` and sent messages are forwarded to an optional
+    ``on_send`` callback, which makes it suitable for scripted fakes and for in-process
+    simulators answering the client's messages. Every method must be called from the
+    event loop the client runs in.
+    """
+
+    def __init__(self, on_send: Optional[SendCallback] = None):
+        """
+        :param on_send: Coroutine function called with every sent message. Optional.
+        :type on_send: Callable[[str], Awaitable[None]], optional
+        """
+        self._on_send = on_send
+        self._queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._closed = False
+        self.sent_messages: List[str] = []
+
+    async def connect(self) -> None:
+        self._closed = False
+
+    async def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+    def feed(self, frame: str) -> None:
+        """Makes a frame available to the client.
+
+        :param frame: The frame to feed.
+        :type frame: str
+        """
+        self._queue.put_nowait(frame)
+
+    async def frames(self) -> AsyncIterator[str]:
+        while True:
+            frame = await self._queue.get()
+            if frame is None:
+                return
+            yield frame
+
+    async def send(self, message: str) -> None:
+        self.sent_messages.append(message)
+        if self._on_send is not None:
+            await self._on_send(message)
+
+
+class ProcessTransport(Transport):
+    """Transport communicating with a local process over its standard streams.
+
+    The process is expected to speak showdown's client protocol, with frames encoded
+    as one JSON string per line in both directions. poke-env does not ship such a
+    process: showdown's ``simulate-battle`` command speaks the simulator protocol,
+    not the client one, so a bridge handling logins, challenges and rooms must be
+    provided to play without a server.
+    """
+
+    # Request frames can be much larger than asyncio's default 64 KiB line limit
+    STREAM_LIMIT = 2**24
+
+    def __init__(self, command: List[str]):
+        """
+        :param command: The command starting the process, as a list of arguments.
+        :type command: List[str]
+        """
+        self._command = command
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    async def connect(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            *self._command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=self.STREAM_LIMIT,
+        )
+
+    async def close(self) -> None:
+        if self.process is None or self.process.returncode is not None:
+            return
+        assert self.process.stdin is not None
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+    async def frames(self) -> AsyncIterator[str]:
+        assert self.process is not None, "Transport is not connected."
+        assert self.process.stdout is not None
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                return
+            if line.strip():
+                yield orjson.loads(line)
+
+    async def send(self, message: str) -> None:
+        assert self.process is not None, "Transport is not connected."
+        assert self.process.stdin is not None
+        self.process.stdin.write(orjson.dumps(message) + b"\n")
+        await self.process.stdin.drain()
+
+
+class RecordingTransport(Transport):
+    """Transport recording every frame received through another transport.
+
+    Recorded frames can be saved, then played back with :class:`ReplayTransport`.
+    """
+
+    def __init__(self, transport: Transport):
+        """
+        :param transport: The transport to record.
+        :type transport: Transport
+        """
+        self._transport = transport
+        self.recorded_frames: List[str] = []
+
+    async def connect(self) -> None:
+        await self._transport.connect()
+
+    async def close(self) -> None:
+        await self._transport.close()
+
+    async def frames(self) -> AsyncIterator[str]:
+        async for frame in self._transport.frames():
+            self.recorded_frames.append(frame)
+            yield frame
+
+    async def send(self, message: str) -> None:
+        await self._transport.send(message)
+
+
+class ReplayTransport(Transport):
+    """Transport playing recorded frames back at full speed, without a server.
+
+    The recording's global frames are played first, except challenges, so that the
+    client does not try to log in. Battle rooms are then played in an interleaved
+    fashion: up to ``interleave`` rooms are in flight at once, and their frames are
+    fed round-robin, each room's frames keeping their order. Each room is played
+    ``n_copies`` times, copies being renamed with a ``-rN`` suffix.
+
+    Sent messages are counted and discarded, and the stream ends once every frame has
+    been played. The replaying client must use the recorded account's username,
+    available as :attr:`username`, and handle the recorded battle formats.
+    """
+
+    def __init__(
+        self, frames: Sequence[str], *, n_copies: int = 1, interleave: int = 16
+    ):
+        """
+        :param frames: The recorded frames.
+        :type frames: Sequence[str]
+        :param n_copies: Number of times each battle room is played. Defaults to 1.
+        :type n_copies: int
+        :param interleave: Maximum number of battle rooms in flight. Defaults to 16.
+        :type interleave: int
+        """
+        if n_copies <= 0:
+            raise ValueError(f"n_copies must be positive, got {n_copies}")
+        if interleave <= 0:
+            raise ValueError(f"interleave must be positive, got {interleave}")
+        self._interleave = interleave
+        self._global_frames: List[str] = []
+        rooms: Dict[str, List[str]] = {}
+        for frame in frames:
+            if frame.startswith((">battle", ">game")):
+                room, _, body = frame.partition("\n")
+                rooms.setdefault(room, []).append(body)
+            elif not frame.startswith("|challstr|"):
+                self._global_frames.append(frame)
+        self._rooms = [
+            (room if copy == 0 else f"{room}-r{copy}", bodies)
+            for copy in range(n_copies)
+            for room, bodies in rooms.items()
+        ]
+        self._closed = False
+        self.n_sent_messages = 0
+
+    async def connect(self) -> None:
+        self._closed = False
+
+    async def close(self) -> None:
+        self._closed = True
+
+    async def frames(self) -> AsyncIterator[str]:
+        for frame in self._global_frames:
+            if self._closed:
+                return
+            yield frame
+            await asyncio.sleep(0)
+
+        pending = iter(self._rooms)
+        in_flight: List[Tuple[str, Iterator[str]]] = []
+        while True:
+            while len(in_flight) < self._interleave:
+                next_room = next(pending, None)
+                if next_room is None:
+                    break
+                in_flight.append((next_room[0], iter(next_room[1])))
+            if not in_flight:
+                return
+            for stream in list(in_flight):
+                room, bodies = stream
+                body = next(bodies, None)
+                if body is None:
+                    in_flight.remove(stream)
+                    continue
+                if self._closed:
+                    return
+                yield f"{room}\n{body}" if body else room
+                # Let the client handle frames as a network transport would
+                await asyncio.sleep(0)
+
+    async def send(self, message: str) -> None:
+        self.n_sent_messages += 1
+
+    @property
+    def n_frames(self) -> int:
+        """Total number of frames played by a full replay.
+
+        :return: The number of frames.
+        :rtype: int
+        """
+        return len(self._global_frames) + sum(len(b) for _, b in self._rooms)
+
+    @property
+    def n_rooms(self) -> int:
+        """Number of battle rooms played by a full replay, copies included.
+
+        :return: The number of rooms.
+        :rtype: int
+        """
+        return len(self._rooms)
+
+    @property
+    def rooms(self) -> List[str]:
+        """Battle rooms played by a full replay, copies included, in order.
+
+        :return: The rooms, without leading '>'.
+        :rtype: List[str]
+        """
+        return [room[1:] for room, _ in self._rooms]
+
+    @property
+    def username(self) -> Optional[str]:
+        """The recorded account's username, read from its last login confirmation.
+
+        :return: The username, or None if the recording holds no login confirmation.
+        :rtype: str, optional
+        """
+        for frame in reversed(self._global_frames):
+            if frame.startswith("|updateuser|"):
+                name = frame.split("|")[2].strip()
+                if not name.startswith("Guest "):
+                    return name.rstrip("@!")
+        return None
@@ -0,0 +1,136 @@
+import os
+from functools import partial
+
+import numpy as np
+import pytest
+from gymnasium.spaces import Box, Dict, Discrete, Text
+
+from poke_env.environment import SubprocPokeVectorEnv
+
+
+class CounterVectorEnv:
+    """Stands for a PokeVectorEnv: observations count steps and echo actions."""
+
+    def __init__(self, num_envs, observation_space=None):
+        self.num_envs = num_envs
+        self.possible_agents = ["p1", "p2"]
+        self.single_observation_spaces = {
+            agent: Dict(
+                {
+                    "observation": observation_space
+                    or Box(0, np.inf, shape=(3,), dtype=np.float32),
+                    "action_mask": Box(0, 1, shape=(4,), dtype=np.int8),
+                }
+            )
+            for agent in self.possible_agents
+        }
+        self.single_action_spaces = {
+            agent: Discrete(4) for agent in self.possible_agents
+        }
+        self._observation_buffers = None
+        self._slots = [None] * num_envs
+        self.turn = 0
+
+    def _write(self, actions=None):
+        for agent, out in self._observation_buffers.items():
+            out["observation"][:, 0] = self.turn
+            out["observation"][:, 1] = 0 if actions is None else actions[agent]
+            out["observation"][:, 2] = os.getpid()
+            out["action_mask"][:] = 1
+        # The first slot has no battle
+        self._slots = [None] + [
+            f"battle-{self.turn}-{k}" for k in range(1, self.num_envs)
+        ]
+
+    def reset(self, seed=None, options=None):
+        self.turn = 0
+        self._write()
+
+    def step(self, actions):
+        if (actions["p1"] < 0).any():
+            raise ValueError("Negative action")
+        self.turn += 1
+        self._write(actions)
+        rewards = {agent: actions[agent] * 0.5 for agent in self.possible_agents}
+        done = {
+            agent: np.full(self.num_envs, self.turn == 2)
+            for agent in self.possible_agents
+        }
+        truncated = {
+            agent: np.zeros(self.num_envs, dtype=bool) for agent in self.possible_agents
+        }
+        return None, rewards, done, truncated, None
+
+    def close(self):
+        pass
+
+
+def test_subproc_vector_env():
+    env = SubprocPokeVectorEnv(
+        [partial(CounterVectorEnv, 2), partial(CounterVectorEnv, 3)]
+    )
+    try:
+        assert env.num_envs == 5
+        assert env.possible_agents == ["agent1", "agent2"]
+        assert env.observation_space("agent1")["observation"].shape == (5, 3)
+        assert env.action_space("agent2").shape == (5,)
+
+        obs, infos = env.reset(seed=0)
+        assert env.agents == ["agent1", "agent2"]
+        assert infos["agent1"]["battle_tag"].tolist() == [
+            None,
+            "battle-0-1",
+            None,
+            "battle-0-1",
+            "battle-0-2",
+        ]
+        assert (
+            infos["agent2"]["battle_tag"].tolist()
+            == infos["agent1"]["battle_tag"].tolist()
+        )
+        assert obs["agent1"]["observation"][:, 0].tolist() == [0] * 5
+        assert obs["agent2"]["action_mask"].tolist() == [[1] * 4] * 5
+        pids = obs["agent1"]["observation"][:, 2]
+        # Each worker wrote its own slots
+        assert len(set(pids[:2])) == len(set(pids[2:])) == 1
+        assert pids[0] != pids[2] and os.getpid() not in pids
+
+        actions = {"agent1": np.arange(5) % 4, "agent2": np.full(5, 3)}
+        obs, rewards, terminated, truncated, infos = env.step(actions)
+        assert infos["agent1"]["battle_tag"][4] == "battle-1-2"
+        assert obs["agent1"]["observation"][:, :2].tolist() == [
+            [1, a] for a in [0, 1, 2, 3, 0]
+        ]
+        assert rewards["agent1"].tolist() == [0, 0.5, 1, 1.5, 0]
+        assert rewards["agent2"].tolist() == [1.5] * 5
+        assert not terminated["agent1"].any() and not truncated["agent1"].any()
+
+        previous = obs
+        obs, _, terminated, _, _ = env.step(actions)
+        assert terminated["agent2"].all()
+        # Returned observations are copies
+        assert previous["agent1"]["observation"][0, 0] == 1
+        assert obs["agent1"]["observation"][0, 0] == 2
+
+        with pytest.raises(ValueError, match="Negative action"):
+            env.step({"agent1": np.full(5, -1), "agent2": np.zeros(5)})
+        # Workers survive errors
+        env.reset()
+    finally:
+        env.close()
+    assert env.closed
+    env.close()
+
+
+def test_subproc_vector_env_validation():
+    with pytest.raises(ValueError):
+        SubprocPokeVectorEnv([])
+    with pytest.raises(ValueError, match="same spaces"):
+        SubprocPokeVectorEnv(
+            [
+                partial(CounterVectorEnv, 1),
+                partial(CounterVectorEnv, 1, Box(0, 1, shape=(2,))),
+            ]
+        )
+    with pytest.raises(ValueError, match="Spaces must be composed"):
+        SubprocPokeVectorEnv([partial(CounterVectorEnv, 1, Text(5))])
@@ -0,0 +1,173 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from gymnasium.spaces import Box
+
+from poke_env.battle import Battle
+from poke_env.environment import PokeVectorEnv, SingleAgentVectorWrapper, SinglesEnv
+from poke_env.player import DefaultBattleOrder
+from poke_env.ps_client import AccountConfiguration, ServerConfiguration
+
+server_configuration = ServerConfiguration("server.url", "auth.url")
+
+
+class TurnEnv(SinglesEnv):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.observation_spaces = {
+            agent: Box(0, 100, shape=(1,), dtype=np.float32)
+            for agent in self.possible_agents
+        }
+
+    def calc_reward(self, battle):
+        return 1.0
+
+    def embed_battle(self, battle):
+        return np.array([battle.turn], dtype=np.float32)
+
+
+@pytest.fixture(params=[False, True], ids=["new_buffers", "reused_buffers"])
+def vec_env(monkeypatch, request):
+    monkeypatch.setattr(PokeVectorEnv, "_start_challenges", lambda self: None)
+    env = TurnEnv(
+        server_configuration=server_configuration,
+        start_listening=False,
+        battle_format="gen8randombattle",
+        strict=False,
+        reuse_observation_buffers=request.param,
+    )
+    vec_env = PokeVectorEnv(
+        env,
+        2,
+        account_configuration1=AccountConfiguration("vector1", None),
+        account_configuration2=AccountConfiguration("vector2", None),
+        start_listening=False,
+    )
+    yield vec_env
+    vec_env.close(force=False)
+
+
+def request(vec_env, player, battle):
+    return asyncio.run_coroutine_threadsafe(player._choose_move(battle), vec_env._loop)
+
+
+def start_battle(vec_env, tag, turn=0):
+    battles, orders = [], []
+    for player, role in ((vec_env.agent1, "p1"), (vec_env.agent2, "p2")):
+        battle = Battle(tag, player.username, player.logger, gen=8)
+        battle._player_role = role
+        battle._team_size = {"p1": 6, "p2": 6}
+        battle._turn = turn
+        battles.append(battle)
+        orders.append(request(vec_env, player, battle))
+    return battles, orders
+
+
+def test_vector_env_spaces(vec_env):
+    agent = vec_env.possible_agents[0]
+    assert vec_env.observation_space(agent)["observation"].shape == (2, 1)
+    assert vec_env.observation_space(agent)["action_mask"].shape == (2, 22)
+    assert vec_env.action_space(agent).shape == (2,)
+    with pytest.raises(ValueError):
+        PokeVectorEnv(vec_env.env, 0, start_listening=False)
+
+
+def test_vector_env_steps_and_autoresets(vec_env):
+    agent1, agent2 = vec_env.possible_agents
+    (b0, b0_opp), orders0 = start_battle(vec_env, "battle-gen8randombattle-0", 3)
+    (b1, b1_opp), orders1 = start_battle(vec_env, "battle-gen8randombattle-1", 5)
+
+    obs, infos = vec_env.reset()
+    assert vec_env.agents == [agent1, agent2]
+    assert obs[agent1]["observation"].tolist() == [[3], [5]]
+    first_observation = obs[agent1]["observation"]
+    assert obs[agent2]["action_mask"].shape == (2, 22)
+    assert infos[agent1]["battle_tag"].tolist() == [b0.battle_tag, b1.battle_tag]
+    assert vec_env.to_move.all()
+
+    # Battle 0 ends, and battle 1's second agent waits for its opponent
+    for battle, player in ((b0, vec_env.agent1), (b0_opp, vec_env.agent2)):
+        battle._finish_battle()
+        player._battle_finished_callback(battle)
+    b1._turn = 6
+    next_order1 = request(vec_env, vec_env.agent1, b1)
+    vec_env.agent2._set_waiting(b1_opp)
+
+    actions = {agent1: np.array([-2, -2]), agent2: np.array([-2, -2])}
+    obs, rewards, terminated, truncated, _ = vec_env.step(actions)
+    for order in orders0 + orders1:
+        assert order.result(timeout=1).message == DefaultBattleOrder().message
+    assert obs[agent1]["observation"].tolist() == [[3], [6]]
+    assert rewards[agent1].tolist() == [1.0, 1.0]
+    assert (obs[agent1]["observation"] is first_observation) == (
+        vec_env.env._reuse_observation_buffers
+    )
+    assert (terminated[agent1] | truncated[agent1]).tolist() == [True, False]
+    assert vec_env.to_move.tolist() == [[False, False], [True, False]]
+
+    # Slot 0 is reset with a new battle, ignoring its actions
+    (b2, _), _ = start_battle(vec_env, "battle-gen8randombattle-2", 1)
+    request(vec_env, vec_env.agent1, b1)
+    request(vec_env, vec_env.agent2, b1_opp)
+    obs, rewards, terminated, truncated, infos = vec_env.step(actions)
+    assert next_order1.result(timeout=1).message == DefaultBattleOrder().message
+    assert infos[agent1]["battle_tag"].tolist() == [b2.battle_tag, b1.battle_tag]
+    assert obs[agent1]["observation"].tolist() == [[1], [6]]
+    assert rewards[agent1].tolist() == [0.0, 1.0]
+    assert not terminated[agent1].any() and not truncated[agent1].any()
+    assert vec_env.battles1 == [b2, b1]
+
+
+def test_vector_env_retry(vec_env):
+    agent1, agent2 = vec_env.possible_agents
+    (b0, b0_opp), _ = start_battle(vec_env, "battle-gen8randombattle-0")
+    (b1, b1_opp), _ = start_battle(vec_env, "battle-gen8randombattle-1")
+    vec_env.reset()
+
+    # The second agent's choice is rejected: it chooses again, its opponent waits
+    vec_env.agent2._set_trying_again(b0_opp)
+    request(vec_env, vec_env.agent2, b0_opp)
+    for battle in (b0, b1):
+        request(vec_env, vec_env.agent1, battle)
+    request(vec_env, vec_env.agent2, b1_opp)
+
+    actions = {agent1: np.array([-2, -2]), agent2: np.array([-2, -2])}
+    vec_env.step(actions)
+    assert vec_env.to_move.tolist() == [[False, True], [True, True]]
+
+    # The first agent's request is read once its opponent chose again
+    vec_env.agent2._set_waiting(b0_opp)
+    vec_env.agent1._set_waiting(b1)
+    vec_env.agent2._set_waiting(b1_opp)
+    vec_env.step(actions)
+    assert vec_env.to_move.tolist() == [[True, False], [False, False]]
+
+
+def test_single_agent_vector_wrapper(vec_env):
+    opponent = MagicMock()
+    opponent.choose_move.return_value = DefaultBattleOrder()
+    wrapper = SingleAgentVectorWrapper(vec_env, opponent)
+    assert wrapper.num_envs == 2
+    assert wrapper.single_observation_space["observation"].shape == (1,)
+    assert wrapper.observation_space["observation"].shape == (2, 1)
+
+    (b0, b0_opp), _ = start_battle(vec_env, "battle-gen8randombattle-0", 2)
+    (b1, b1_opp), orders = start_battle(vec_env, "battle-gen8randombattle-1", 4)
+    obs, infos = wrapper.reset(seed=42)
+    assert obs["observation"].tolist() == [[2], [4]]
+    assert infos["battle_tag"].tolist() == [b0.battle_tag, b1.battle_tag]
+
+    for battle in (b0, b1):
+        request(vec_env, vec_env.agent1, battle)
+    for battle in (b0_opp, b1_opp):
+        request(vec_env, vec_env.agent2, battle)
+    obs, rewards, terminated, truncated, _ = wrapper.step(np.array([-2, -2]))
+    assert [call.args[0] for call in opponent.choose_move.call_args_list] == [
+        b0_opp,
+        b1_opp,
+    ]
+    assert orders[1].result(timeout=1).message == DefaultBattleOrder().message
+    assert rewards.tolist() == [1.0, 1.0]
+    assert not terminated.any() and not truncated.any()
@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import orjson
+import pytest
+
+from poke_env import AccountConfiguration
+from poke_env.player import BatchedPlayer
+from poke_env.ps_client.frame import ProtocolFrame
+
+
+class TurnPlayer(BatchedPlayer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def embed_battle(self, battle):
+        return np.array([int(battle.battle_tag.split("-")[-1])], dtype=np.float32)
+
+    def choose_moves(self, battles, observations):
+        self.batches.append(observations)
+        return [self.create_order(battle.available_moves[0]) for battle in battles]
+
+
+async def request_moves(player, n_battles, request):
+    frames = []
+    for i in range(n_battles):
+        tag = f">battle-gen8randombattle-{i}"
+        await player._handle_battle_message(ProtocolFrame(f"{tag}\n|init|battle"))
+        frames.append(
+            ProtocolFrame(f"{tag}\n|request|" + orjson.dumps(request).decode())
+        )
+    await asyncio.gather(*(player._handle_battle_message(f) for f in frames))
+
+
+def create_player(**kwargs):
+    player = TurnPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        **kwargs,
+    )
+    player.ps_client.send_message = AsyncMock()
+    return player
+
+
+@pytest.mark.asyncio
+async def test_concurrent_decisions_are_batched(example_request):
+    player = create_player(max_concurrent_battles=4, batch_window=0.01)
+    await request_moves(player, 3, example_request)
+
+    assert player.n_batches == 1
+    assert player.mean_batch_size == 3
+    np.testing.assert_array_equal(player.batches[0], [[0], [1], [2]])
+    assert player.ps_client.send_message.await_count == 3
+    assert player.decision_latency.histogram("policy").count == 3
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_chosen_immediately(example_request):
+    player = create_player(max_concurrent_battles=3, batch_size=2, batch_window=0.01)
+    await request_moves(player, 3, example_request)
+
+    assert [len(batch) for batch in player.batches] == [2, 1]
+    assert player.ps_client.send_message.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_battle(example_request):
+    player = create_player(max_concurrent_battles=2, move_executor="thread")
+    player.choose_moves = lambda battles, observations: []
+    battle_tag = "battle-gen8randombattle-0"
+    await player._handle_battle_message(ProtocolFrame(f">{battle_tag}\n|init|battle"))
+    battle = player.battles[battle_tag]
+    battle.parse_request(example_request)
+
+    with pytest.raises(ValueError, match="0 orders for 1 battles"):
+        await player.choose_move(battle)
+    player.close_move_executor()
+
+
+def test_batched_player_rejects_process_executors():
+    with pytest.raises(ValueError):
+        create_player(move_executor="process")
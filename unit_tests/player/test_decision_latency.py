@@ -0,0 +1,73 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import orjson
+import pytest
+
+from poke_env import AccountConfiguration
+from poke_env.player import DecisionLatency, LatencyHistogram, RandomPlayer
+from poke_env.ps_client.frame import ProtocolFrame
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.summary().count == 0
+    assert histogram.percentile(50) == 0
+
+    for i in range(1, 101):
+        histogram.record(i / 1000)
+
+    summary = histogram.summary()
+    assert summary.count == 100
+    assert summary.mean == pytest.approx(0.0505)
+    assert summary.max == 0.1
+    # Percentiles are bucket upper bounds, within 20% of the exact values
+    assert 0.05 <= summary.p50 <= 0.05 * 1.2
+    assert 0.09 <= summary.p90 <= 0.09 * 1.2
+    assert 0.099 <= summary.p99 <= 0.1
+    assert sum(count for _, count in histogram.buckets) == 100
+
+    histogram.record(1e4)
+    assert histogram.buckets[-1] == (float("inf"), 1)
+
+    histogram.reset()
+    assert histogram.count == 0
+    assert histogram.buckets == []
+
+
+@pytest.mark.asyncio
+async def test_player_records_decision_latency(example_request):
+    class SlowPlayer(RandomPlayer):
+        async def choose_move(self, battle):
+            await asyncio.sleep(0.02)
+            return self.choose_random_move(battle)
+
+    player = SlowPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+    )
+    player.ps_client.send_message = AsyncMock()
+
+    await player._handle_battle_message(
+        ProtocolFrame(">battle-gen8randombattle-1\n|init|battle")
+    )
+    await player._handle_battle_message(
+        ProtocolFrame(
+            ">battle-gen8randombattle-1\n|request|"
+            + orjson.dumps(example_request).decode()
+        )
+    )
+
+    summary = player.decision_latency.summary()
+    assert set(summary) == set(DecisionLatency.STAGES)
+    assert summary["queue"].count == 2
+    assert summary["parse"].count == 1
+    assert summary["policy"].count == 1
+    assert summary["policy"].max >= 0.02
+    assert summary["send"].count == 1
+    assert summary["total"].count == 1
+    assert summary["total"].max >= summary["policy"].max + summary["parse"].max
+
+    player.decision_latency.reset()
+    assert player.decision_latency.histogram("total").count == 0
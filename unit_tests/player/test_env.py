@@ -1,6 +1,7 @@
 import asyncio
 import pickle
 import sys
+import time
 from io import StringIO
 from unittest.mock import AsyncMock
 
@@ -21,7 +22,7 @@ from poke_env.battle import (
 )
 from poke_env.concurrency import POKE_LOOP
 from poke_env.environment import DoublesEnv, PokeEnv, SinglesEnv
-from poke_env.environment.env import _AsyncQueue, _EnvPlayer
+from poke_env.environment.env import _EnvPlayer, _HandoffQueue
 from poke_env.player import (
     BattleOrder,
     DefaultBattleOrder,
@@ -74,12 +75,12 @@ def test_pickle_unpickle():
 
 
 def test_init_queue():
-    q = _AsyncQueue(POKE_LOOP)
-    assert isinstance(q, _AsyncQueue)
+    q = _HandoffQueue(POKE_LOOP)
+    assert isinstance(q, _HandoffQueue)
 
 
 def test_queue():
-    q = _AsyncQueue(POKE_LOOP)
+    q = _HandoffQueue(POKE_LOOP)
     assert q.empty()
     q.put(1)
     item = q.get()
@@ -90,6 +91,61 @@ def test_queue():
     assert q.empty()
 
 
+def test_queue_race_get():
+    player = _EnvPlayer(start_listening=False)
+    battle = Battle("bat1", player.username, player.logger, gen=8)
+    # Events set while racing end the race
+    POKE_LOOP.call_soon_threadsafe(player._set_waiting, battle)
+    assert player.battle_queue.race_get(player._waiting) is None
+    # Items are returned before set events
+    player.battle_queue.put(battle)
+    assert player.battle_queue.race_get(player._waiting) is battle
+    player._waiting.clear()
+    with pytest.raises(asyncio.TimeoutError):
+        player.battle_queue.get(timeout=0.01)
+
+
+def test_queue_cancelled_getter():
+    q = _HandoffQueue(POKE_LOOP)
+    future = asyncio.run_coroutine_threadsafe(q.async_get(), POKE_LOOP)
+    while not q._getters:
+        time.sleep(0.001)
+    future.cancel()
+    q.put(1)
+    # The item is kept for the next getter
+    assert asyncio.run_coroutine_threadsafe(q.async_get(), POKE_LOOP).result() == 1
+    assert q.empty()
+
+
+def test_queue_concurrent_getters():
+    q = _HandoffQueue(POKE_LOOP)
+    futures = [
+        asyncio.run_coroutine_threadsafe(q.async_get(), POKE_LOOP) for _ in range(3)
+    ]
+    while len(q._getters) < 3:
+        time.sleep(0.001)
+    for i in range(3):
+        q.put(i)
+    assert sorted(f.result(timeout=1) for f in futures) == [0, 1, 2]
+    assert q.empty() and not q._getters
+
+
+def test_queue_woken_getter_cancelled_before_taking_its_item():
+    q = _HandoffQueue(POKE_LOOP)
+
+    async def handoff():
+        first = asyncio.ensure_future(q.async_get())
+        second = asyncio.ensure_future(q.async_get())
+        await asyncio.sleep(0)
+        # The first getter is woken up, but cancelled before it takes the item
+        q.put(1)
+        first.cancel()
+        return await asyncio.wait_for(second, timeout=1)
+
+    assert asyncio.run_coroutine_threadsafe(handoff(), POKE_LOOP).result() == 1
+    assert q.empty()
+
+
 def test_async_player():
     def embed_battle(battle):
         return "battle"
@@ -179,7 +235,51 @@ def test_reset_step_close():
     # Additional info should be empty.
     assert add_info_step == {env.agents[0]: {}, env.agents[1]: {}}
 
-    # --- Part 3: Test close() ---
+    # --- Part 3: Test close() and shutdown() ---
+    env.close()
+    # Closed environments can be reset again
+    assert not env._loop.is_closed()
+    env.shutdown()
+    assert env._loop.is_closed()
+    env.shutdown()
+    env.close()
+
+
+def test_reuse_observation_buffers():
+    env = CustomEnv(
+        account_configuration1=account_configuration1,
+        account_configuration2=account_configuration2,
+        battle_format="gen8randombattles",
+        server_configuration=server_configuration,
+        start_listening=False,
+        strict=False,
+        reuse_observation_buffers=True,
+    )
+    env.agent1.battle_against = AsyncMock(return_value=None)
+    battle1 = Battle("new_battle1", env.agent1.username, env.agent1.logger, gen=8)
+    battle2 = Battle("new_battle2", env.agent2.username, env.agent2.logger, gen=8)
+    env.agent1.battle = battle1
+    env.agent2.battle = battle2
+    env.agent1.battle_queue.put(battle1)
+    env.agent2.battle_queue.put(battle2)
+    obs, _ = env.reset()
+    agent = env.agents[0]
+    np.testing.assert_array_equal(obs[agent]["observation"], np.array([0, 1, 2]))
+    assert obs[agent]["observation"].dtype == np.float32
+    assert obs[agent]["action_mask"].dtype == np.int8
+    assert obs[agent]["action_mask"].tolist() == env.get_action_mask(battle1)
+
+    # The same buffers are written by the next step
+    observation, action_mask = obs[agent]["observation"], obs[agent]["action_mask"]
+    battle1._available_switches = [Pokemon(species="charizard", gen=8)]
+    battle1._team = {"charizard": battle1._available_switches[0]}
+    env.agent1.battle_queue.put(battle1)
+    env.agent2.battle_queue.put(battle2)
+    obs, *_ = env.step({agent: np.int64(6), env.agents[1]: np.int64(6)})
+    assert obs[agent]["observation"] is observation
+    assert obs[agent]["action_mask"] is action_mask
+    assert action_mask[0] == 1
+    assert action_mask.tolist() == env.get_action_mask(battle1)
     env.close()
 
 
@@ -398,6 +498,36 @@ def test_action_space():
         )
 
 
+def test_action_bitmask_cached_per_request(example_request, example_doubles_request):
+    p = SinglesEnv(battle_format="gen8randombattle", start_listening=False)
+    battle = Battle("bat1", p.agent1.username, p.agent1.logger, gen=8)
+    battle.parse_request(example_request)
+    mask = SinglesEnv.get_action_mask(battle)
+    assert mask == [0, 0] + [1] * 8 + [0] * 12
+    assert battle._action_mask == SinglesEnv.get_action_bitmask(battle)
+    assert p.action_to_order(np.int64(6), battle).message == "/choose move leechseed"
+
+    # The mask is only computed again for a new request
+    battle._available_moves = []
+    assert SinglesEnv.get_action_mask(battle) == mask
+    battle.trapped = True
+    assert SinglesEnv.get_action_mask(battle) == [0] * 22
+    battle.parse_request(example_request)
+    assert SinglesEnv.get_action_mask(battle) == mask
+
+    p = DoublesEnv(battle_format="gen8randomdoublesbattle", start_listening=False)
+    battle = DoubleBattle("bat1", p.agent1.username, p.agent1.logger, gen=8)
+    battle._player_role = "p1"
+    battle.parse_request(example_doubles_request)
+    size = DoublesEnv.get_action_space_size(8)
+    mask = DoublesEnv.get_action_mask(battle)
+    assert mask[:size] == DoublesEnv.get_action_mask_individual(battle, 0)
+    assert mask[size:] == DoublesEnv.get_action_mask_individual(battle, 1)
+    assert battle._action_mask is not None
+    battle._available_moves = [[], []]
+    assert DoublesEnv.get_action_mask(battle) == mask
+
+
 def test_singles_action_order_conversions():
     for gen, (has_megas, has_z_moves, has_dynamax, has_tera) in enumerate(
         [
@@ -423,6 +553,7 @@ def test_singles_action_order_conversions():
         mask = SinglesEnv.get_action_mask(battle)
         assert len(mask) == SinglesEnv.get_action_space_size(gen)
         assert sum(mask) == 0
+        check_written_action_mask(p, battle)
 
         assert p.action_to_order(np.int64(-1), battle).message == "/forfeit"
         check_action_order_roundtrip(p, ForfeitBattleOrder(), battle)
@@ -445,6 +576,7 @@ def test_singles_action_order_conversions():
         assert mask[0] == 1  # charizard switch
         assert mask[6] == 1  # flamethrower
         assert sum(mask) == 2
+        check_written_action_mask(p, battle)
 
         assert (
             p.action_to_order(np.int64(0), battle).message == "/choose switch Charizard"
@@ -503,6 +635,7 @@ def test_singles_action_order_conversions():
             check_action_order_roundtrip(
                 p, Player.create_order(move, terastallize=True), battle
             )
+        check_written_action_mask(p, battle)
 
 
 def test_doubles_action_order_conversions():
@@ -552,6 +685,7 @@ def test_doubles_action_order_conversions():
         mask1 = mask[:action_space_size]
         assert mask1[1] == 1  # charizard switch
         assert mask1[10] == 1  # flamethrower
+        check_written_action_mask(p, battle)
 
         assert (
             p.action_to_order(np.array([1, -2]), battle).message
@@ -649,6 +783,14 @@ def test_doubles_action_order_conversions():
                 ),
                 battle,
             )
+        check_written_action_mask(p, battle)
+
+
+def check_written_action_mask(env: PokeEnv, battle: AbstractBattle):
+    mask = env.get_action_mask(battle)
+    out = np.full(len(mask), 7, dtype=np.int8)
+    env.write_action_mask(battle, out)
+    assert out.tolist() == mask
 
 
 def check_action_order_roundtrip(
@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from poke_env.battle import BattleSummary
+from poke_env.player import MatchResult, Matchup, PlayerFarm, PlayerSpec, RandomPlayer
+
+
+class ScriptedPlayer(RandomPlayer):
+    """Records fake battles instead of playing them, winning if its level is higher."""
+
+    def __init__(self, level=0, **kwargs):
+        super().__init__(start_listening=False, **kwargs)
+        self.level = level
+
+    async def battle_against(self, *opponents, n_battles=1):
+        (opponent,) = opponents
+        for i in range(n_battles):
+            won = self.level > opponent.level
+            self._battle_summaries[f"battle-{i}"] = BattleSummary(
+                battle_tag=f"battle-{i}",
+                format=self.format,
+                won=won,
+                lost=not won,
+                turns=i,
+                player_username=self.username,
+                opponent_username=opponent.username,
+                rating=None,
+                opponent_rating=os.getpid(),
+                team=(),
+                opponent_team=(),
+            )
+
+
+def test_match_result_win_rate():
+    result = MatchResult("a", "b", 3, 1, 0, [], 1.0)
+    assert result.n_finished == 4
+    assert result.win_rate == 0.75
+    assert MatchResult("a", None, 0, 0, 0, [], 0.0).win_rate is None
+
+
+def test_player_farm_cross_evaluate():
+    specs = [
+        PlayerSpec(ScriptedPlayer, {"level": level}, name=f"level-{level}")
+        for level in range(3)
+    ]
+    with PlayerFarm(2) as farm:
+        (result,) = farm.run([Matchup(specs[0], specs[2], 3)])
+        table = farm.cross_evaluate(specs, 4)
+
+    assert result.player == "level-0"
+    assert result.opponent == "level-2"
+    assert (result.n_won, result.n_lost, result.n_tied) == (0, 3, 0)
+    assert [s.turns for s in result.summaries] == [0, 1, 2]
+    # Battles were played in a worker process, between players named after the specs
+    assert result.summaries[0].opponent_rating != os.getpid()
+    assert result.summaries[0].player_username.startswith("level-0")
+    assert result.summaries[0].opponent_username.startswith("level-2")
+
+    assert table == {
+        "level-0": {"level-0": None, "level-1": 0.0, "level-2": 0.0},
+        "level-1": {"level-0": 1.0, "level-1": None, "level-2": 0.0},
+        "level-2": {"level-0": 1.0, "level-1": 1.0, "level-2": None},
+    }
+
+
+def test_player_farm_validation():
+    executor = ThreadPoolExecutor(1)
+    farm = PlayerFarm(executor=executor)
+    with pytest.raises(ValueError):
+        farm.cross_evaluate([PlayerSpec(ScriptedPlayer), PlayerSpec(ScriptedPlayer)], 1)
+    farm.close()
+    # The farm does not shut down executors it was given
+    assert executor.submit(int, "1").result() == 1
+    executor.shutdown()
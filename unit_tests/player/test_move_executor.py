@@ -0,0 +1,231 @@
+import asyncio
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+
+from poke_env import AccountConfiguration
+from poke_env.concurrency import LIFECYCLE
+from poke_env.player import RandomPlayer
+from poke_env.ps_client.frame import ProtocolFrame
+
+
+class SlowPlayer(RandomPlayer):
+    def choose_move(self, battle):
+        time.sleep(0.1)
+        self.threads.add(threading.current_thread().name)
+        return self.choose_random_move(battle)
+
+
+class OverlappingPlayer(RandomPlayer):
+    def choose_move(self, battle):
+        self.threads.add(threading.current_thread().name)
+        # Both decisions must run at the same time to get through the barrier
+        self.barrier.wait()
+        # Only set by the event loop once both decisions are blocked
+        assert self.loop_ran.wait(timeout=5)
+        return self.choose_random_move(battle)
+
+
+class ProcessPlayer(RandomPlayer):
+    def choose_move(self, battle):
+        self.logger.debug("Choosing a move for %s", self.username)
+        return self.create_order(battle.available_moves[self.move_index])
+
+    def teampreview(self, battle):
+        return f"/team 123456|{os.getpid()}"
+
+
+async def start_battle(player, tag, request):
+    await player._handle_battle_message(ProtocolFrame(f">{tag}\n|init|battle"))
+    return ProtocolFrame(f">{tag}\n|request|" + orjson.dumps(request).decode())
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_runs_decisions_off_the_loop(example_request):
+    player = OverlappingPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        max_concurrent_battles=2,
+        start_listening=False,
+        move_executor="thread",
+        move_executor_workers=2,
+    )
+    player.threads = set()
+    player.barrier = threading.Barrier(2, timeout=5)
+    player.loop_ran = threading.Event()
+    player.ps_client.send_message = AsyncMock()
+    requests = [
+        await start_battle(player, f"battle-gen8randombattle-{i}", example_request)
+        for i in range(2)
+    ]
+
+    async def both_decisions_passed_the_barrier():
+        while len(player.threads) < 2 or player.barrier.n_waiting:
+            await asyncio.sleep(0.001)
+
+    handling = asyncio.gather(*(player._handle_battle_message(r) for r in requests))
+    await asyncio.wait_for(both_decisions_passed_the_barrier(), timeout=5)
+    # Both decisions are running in parallel, while the loop keeps running
+    assert not handling.done()
+    player.loop_ran.set()
+    await asyncio.wait_for(handling, timeout=5)
+
+    assert all(name.startswith("username-policy") for name in player.threads)
+    assert player.ps_client.send_message.await_count == 2
+    player.close_move_executor()
+
+
+@pytest.mark.asyncio
+async def test_process_executor_runs_decisions_on_player_copies(example_request):
+    player = ProcessPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        move_executor="process",
+        move_executor_workers=1,
+    )
+    player.move_index = 2
+    player.ps_client.send_message = AsyncMock()
+    request = await start_battle(player, "battle-gen8randombattle-1", example_request)
+    battle = player.battles["battle-gen8randombattle-1"]
+
+    try:
+        await asyncio.wait_for(player._handle_battle_message(request), timeout=60)
+        message = await player._choose_message(battle, teampreview=True)
+    finally:
+        player.close_move_executor()
+
+    move = battle.available_moves[2]
+    player.ps_client.send_message.assert_awaited_once_with(
+        f"/choose move {move.id}", "battle-gen8randombattle-1"
+    )
+    assert message.startswith("/team 123456|")
+    assert message != f"/team 123456|{os.getpid()}"
+
+
+def test_move_executor_validation():
+    with pytest.raises(ValueError):
+        RandomPlayer(start_listening=False, move_executor="gpu")
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(ValueError):
+            RandomPlayer(start_listening=False, move_executor=executor)
+    with ThreadPoolExecutor(1) as executor:
+        player = RandomPlayer(start_listening=False, move_executor=executor)
+        assert player.move_executor is executor
+    assert RandomPlayer(start_listening=False).move_executor is None
+
+
+@pytest.mark.asyncio
+async def test_late_threaded_decisions_are_replaced_by_fallbacks(example_request):
+    player = SlowPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        move_executor="thread",
+        decision_budget=0.02,
+    )
+    player.threads = set()
+    player.ps_client.send_message = AsyncMock()
+    request = await start_battle(player, "battle-gen8randombattle-1", example_request)
+
+    start = time.perf_counter()
+    await player._handle_battle_message(request)
+    assert time.perf_counter() - start < 0.09
+    assert player.n_missed_deadlines == 1
+    player.ps_client.send_message.assert_awaited_once()
+    player.close_move_executor()
+
+
+def test_detached_player_copies_keep_username_and_logger():
+    player = RandomPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        start_listening=False,
+    )
+    copy = pickle.loads(pickle.dumps(player))
+
+    assert copy.ps_client is None
+    assert copy.username == "username"
+    assert copy.logger.name == player.logger.name
+
+
+def test_close_move_executor_shuts_down_owned_executors():
+    player = RandomPlayer(start_listening=False, move_executor="thread")
+    executor = player.move_executor
+    assert executor in LIFECYCLE.executors
+
+    player.close_move_executor()
+
+    assert executor not in LIFECYCLE.executors
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+    # A new executor is created on demand
+    assert player.move_executor not in (None, executor)
+    player.close_move_executor()
+
+    with ThreadPoolExecutor(1) as owned:
+        player = RandomPlayer(start_listening=False, move_executor=owned)
+        player.close_move_executor()
+        assert owned.submit(int).result() == 0
+
+
+@pytest.mark.asyncio
+async def test_executor_failures_are_logged(example_request):
+    class FailingPlayer(RandomPlayer):
+        def choose_move(self, battle):
+            raise ValueError("policy failure")
+
+    player = FailingPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        move_executor="thread",
+    )
+    await start_battle(player, "battle-gen8randombattle-1", example_request)
+    battle = player.battles["battle-gen8randombattle-1"]
+
+    try:
+        with patch.object(player.logger, "exception") as exception:
+            with pytest.raises(ValueError):
+                await player._choose_message(battle, teampreview=False)
+    finally:
+        player.close_move_executor()
+    exception.assert_called_once()
+    assert "battle-gen8randombattle-1" in exception.call_args.args
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_policies_read_battle_snapshots(example_request):
+    class SnapshotPlayer(RandomPlayer):
+        def choose_move(self, battle):
+            self.seen.append(battle)
+            return self.choose_random_move(battle)
+
+    player = SnapshotPlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        move_executor="thread",
+    )
+    player.seen = []
+    player.ps_client.send_message = AsyncMock()
+    request = await start_battle(player, "battle-gen8randombattle-1", example_request)
+    battle = player.battles["battle-gen8randombattle-1"]
+
+    try:
+        await player._handle_battle_message(request)
+    finally:
+        player.close_move_executor()
+
+    (snapshot,) = player.seen
+    assert snapshot is not battle
+    assert snapshot.battle_tag == battle.battle_tag
+    assert snapshot.active_pokemon.species == battle.active_pokemon.species
+    assert [m.id for m in snapshot.available_moves] == [
+        m.id for m in battle.available_moves
+    ]
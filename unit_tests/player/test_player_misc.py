@@ -1,5 +1,8 @@
+import asyncio
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
 from poke_env import AccountConfiguration
@@ -18,6 +21,8 @@ from poke_env.player import (
     SingleBattleOrder,
     cross_evaluate,
 )
+from poke_env.ps_client import QueueTransport
+from poke_env.ps_client.frame import ProtocolFrame
 from poke_env.stats import _raw_hp, _raw_stat
 
 
@@ -364,3 +369,278 @@ def test_player_save_replay_raises_on_unknown_battle_tag(tmp_path):
 
     with pytest.raises(KeyError, match="Unknown battle_tag"):
         player.save_replay("battle-gen9randombattle-missing", tmp_path / "missing.html")
+
+
+@pytest.mark.asyncio
+async def test_battle_is_resumed_from_rejoined_room_log():
+    player = SimplePlayer(
+        account_configuration=AccountConfiguration("username", None),
+        start_listening=False,
+    )
+    player.ps_client.send_message = AsyncMock()
+    start = (
+        ">battle-gen9randombattle-1\n|init|battle\n|player|p1|username|1|\n"
+        "|player|p2|opponent|2|\n|teamsize|p1|6\n|teamsize|p2|6\n|gen|9\n|start\n"
+        "|switch|p1a: Pikachu|Pikachu, L50|100/100\n"
+        "|switch|p2a: Eevee|Eevee, L50|100/100\n|turn|1"
+    )
+    turn = "\n|move|p1a: Pikachu|Thunderbolt|p2a: Eevee\n|-damage|p2a: Eevee|40/100"
+
+    await player._handle_battle_message(ProtocolFrame(start))
+    battle = player.battles["battle-gen9randombattle-1"]
+    await player._handle_battle_message(
+        ProtocolFrame(">battle-gen9randombattle-1" + turn + "\n|turn|2")
+    )
+    assert battle.opponent_active_pokemon.current_hp == 40
+
+    # Rejoining the room replays its whole log into the same battle object
+    await player._handle_battle_message(ProtocolFrame(start + turn + "\n|turn|2"))
+
+    assert player.battles["battle-gen9randombattle-1"] is battle
+    assert battle.turn == 2
+    assert battle.opponent_active_pokemon.current_hp == 40
+    assert len(battle.opponent_team) == 1
+    assert player._battle_count_queue.qsize() == 1
+
+    # The room expired before the battle could be resumed
+    await player._handle_battle_message(
+        ProtocolFrame(">battle-gen9randombattle-1\n|noinit|nonexistent|Gone")
+    )
+
+    assert battle.finished
+    assert player.n_finished_battles == 1
+    assert player._battle_count_queue.qsize() == 0
+    player.ps_client.send_message.assert_awaited_with(
+        "/leave battle-gen9randombattle-1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_finished_battles_are_not_replayed_from_rejoined_rooms():
+    player = SimplePlayer(
+        account_configuration=AccountConfiguration("username", None),
+        start_listening=False,
+        max_concurrent_battles=2,
+    )
+    player.ps_client.send_message = AsyncMock()
+    player._battle_finished_callback = MagicMock()
+    room = ">battle-gen9randombattle-1"
+    log = (
+        f"{room}\n|init|battle\n|player|p1|username|1|\n|player|p2|opponent|2|\n"
+        "|teamsize|p1|6\n|teamsize|p2|6\n|gen|9\n|start\n|turn|1\n|win|username"
+    )
+    await player._handle_battle_message(ProtocolFrame(log))
+    battle = player.battles[room[1:]]
+    assert battle.won
+    await player._handle_battle_message(
+        ProtocolFrame(">battle-gen9randombattle-2\n|init|battle")
+    )
+    assert player._battle_count_queue.qsize() == 1
+
+    # The connection dropped before the room's deinit frame: the rejoined room
+    # replays its log, including the battle's end
+    player.ps_client.send_message.reset_mock()
+    await asyncio.wait_for(player._handle_battle_message(ProtocolFrame(log)), 1)
+
+    assert player.battles[room[1:]] is battle
+    assert player.n_finished_battles == 1
+    assert player._battle_count_queue.qsize() == 1
+    player._battle_finished_callback.assert_called_once_with(battle)
+    player.ps_client.send_message.assert_awaited_once_with(f"/leave {room[1:]}")
+
+
+@pytest.mark.asyncio
+async def test_messages_for_untracked_battles_are_dropped():
+    player = SimplePlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen9randombattle",
+        max_concurrent_battles=2,
+        start_listening=False,
+    )
+    # Frames of an unknown room are dropped instead of waiting for its battle
+    await asyncio.wait_for(
+        player._handle_battle_message(
+            ProtocolFrame(">battle-gen9randombattle-2\n|turn|1")
+        ),
+        timeout=1,
+    )
+    assert player.battles == {}
+
+    await player._handle_battle_message(
+        ProtocolFrame(">battle-gen9randombattle-2\n|init|battle")
+    )
+    await player._handle_battle_message(
+        ProtocolFrame(">battle-gen9randombattle-2\n|turn|2")
+    )
+    assert player.battles["battle-gen9randombattle-2"].turn == 2
+
+
+@pytest.mark.asyncio
+async def test_untracked_rooms_do_not_block_the_dispatcher():
+    transport = QueueTransport()
+    player = SimplePlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen9randombattle",
+        start_listening=False,
+        transport=transport,
+    )
+    listening = asyncio.create_task(player.ps_client.listen())
+    # A frame received before the room's init frame, eg. from a previous battle
+    transport.feed(">battle-gen9randombattle-1\n|j| opponent")
+    transport.feed(">battle-gen9randombattle-1\n|init|battle")
+    transport.feed(">battle-gen9randombattle-1\n|turn|1")
+
+    async def battle_started():
+        while "battle-gen9randombattle-1" not in player.battles:
+            await asyncio.sleep(0.001)
+        await player.ps_client.dispatcher.join()
+
+    await asyncio.wait_for(battle_started(), timeout=1)
+    assert player.battles["battle-gen9randombattle-1"].turn == 1
+
+    # Once the room is released, its worker stops
+    transport.feed(">battle-gen9randombattle-1\n|deinit")
+
+    async def worker_stopped():
+        while player.ps_client.dispatcher._workers:
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(worker_stopped(), timeout=1)
+    await player.ps_client._stop_listening()
+    await asyncio.wait_for(listening, timeout=1)
+    await player.ps_client.dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_finished_battles_are_summarized_past_retention_limit():
+    player = SimplePlayer(
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen9randombattle",
+        max_concurrent_battles=3,
+        max_retained_battles=1,
+        start_listening=False,
+    )
+    player.ps_client.send_message = AsyncMock()
+    for i, winner in enumerate(["username", "opponent", "username"]):
+        await player._handle_battle_message(
+            ProtocolFrame(
+                f">battle-gen9randombattle-{i}\n|init|battle\n"
+                "|player|p1|username|1|\n|player|p2|opponent|2|\n"
+                "|switch|p1a: Pikachu|Pikachu, L50|100/100\n"
+                "|switch|p2a: Eevee|Eevee, L50|100/100\n"
+                f"|turn|{i + 1}\n|win|{winner}"
+            )
+        )
+        # Finished battles are kept in full until their room is closed
+        assert f"battle-gen9randombattle-{i}" in player.battles
+        await player._handle_battle_message(
+            ProtocolFrame(
+                f">battle-gen9randombattle-{i}\n"
+                f"|raw|username's rating: {1010 + i} &rarr; <strong>1020</strong>"
+            )
+        )
+        await player._handle_battle_message(
+            ProtocolFrame(f">battle-gen9randombattle-{i}\n|deinit")
+        )
+
+    # Frames of summarized battles are dropped
+    await asyncio.wait_for(
+        player._handle_battle_message(
+            ProtocolFrame(">battle-gen9randombattle-0\n|deinit")
+        ),
+        timeout=1,
+    )
+
+    assert list(player.battles) == ["battle-gen9randombattle-2"]
+    assert list(player.battle_summaries) == [
+        "battle-gen9randombattle-0",
+        "battle-gen9randombattle-1",
+    ]
+    summary = player.battle_summaries["battle-gen9randombattle-1"]
+    assert summary.lost
+    assert summary.turns == 2
+    assert summary.opponent_username == "opponent"
+    assert summary.team == ("pikachu",)
+    assert summary.opponent_team == ("eevee",)
+    assert summary.rating == 1011
+
+    assert player.n_finished_battles == 3
+    assert player.n_won_battles == 2
+    assert player.n_lost_battles == 1
+    assert player.win_rate == 2 / 3
+
+    player.reset_battles()
+    assert player.battle_summaries == {}
+    assert player.n_finished_battles == 0
+
+
+class SlowPlayer(Player):
+    def __init__(self, delay, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+
+    async def choose_move(self, battle):
+        await asyncio.sleep(self.delay)
+        return self.create_order(battle.available_moves[1])
+
+    def choose_fallback_move(self, battle):
+        return self.create_order(battle.available_moves[0])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("delay,missed", [(0, False), (10, True)])
+async def test_decision_budget_falls_back_to_cheap_order(
+    example_request, delay, missed
+):
+    player = SlowPlayer(
+        delay,
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        decision_budget=0.05,
+    )
+    player.ps_client.send_message = AsyncMock()
+    tag = ">battle-gen8randombattle-1"
+    await player._handle_battle_message(ProtocolFrame(f"{tag}\n|init|battle"))
+    await asyncio.wait_for(
+        player._handle_battle_message(
+            ProtocolFrame(f"{tag}\n|request|" + orjson.dumps(example_request).decode())
+        ),
+        timeout=1,
+    )
+
+    move = player.battles[tag[1:]].available_moves[0 if missed else 1]
+    player.ps_client.send_message.assert_awaited_once_with(
+        f"/choose move {move.id}", tag[1:]
+    )
+    assert player.n_missed_deadlines == int(missed)
+
+
+class BlockingPlayer(SlowPlayer):
+    def choose_move(self, battle):
+        time.sleep(self.delay)
+        return self.create_order(battle.available_moves[1])
+
+
+@pytest.mark.asyncio
+async def test_decision_budget_ignores_late_synchronous_policies(example_request):
+    player = BlockingPlayer(
+        0.1,
+        account_configuration=AccountConfiguration("username", None),
+        battle_format="gen8randombattle",
+        start_listening=False,
+        decision_budget=0.05,
+    )
+    player.ps_client.send_message = AsyncMock()
+    tag = ">battle-gen8randombattle-1"
+    await player._handle_battle_message(ProtocolFrame(f"{tag}\n|init|battle"))
+    await player._handle_battle_message(
+        ProtocolFrame(f"{tag}\n|request|" + orjson.dumps(example_request).decode())
+    )
+
+    # The policy blocked the loop past its deadline: its answer is not sent
+    move = player.battles[tag[1:]].available_moves[0]
+    player.ps_client.send_message.assert_awaited_once_with(
+        f"/choose move {move.id}", tag[1:]
+    )
+    assert player.n_missed_deadlines == 1
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from poke_env.concurrency import LIFECYCLE
+from poke_env.ps_client.authentication import AuthenticationClient
+
+
+class _AuthHandler(BaseHTTPRequestHandler):
+    """Stand-in for showdown's action.php login endpoint."""
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        data = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        self.server.requests.append(data)
+        headers = {}
+        if data["act"] == "login" and data["pass"] == "password":
+            assertion = f"assertion-{data['challstr']}"
+            headers["Set-Cookie"] = "sid=session-cookie; Path=/"
+        elif data["act"] == "upkeep" and "sid=session-cookie" in (
+            self.headers.get("Cookie") or ""
+        ):
+            assertion = f"upkeep-{data['challstr']}"
+        else:
+            assertion = ";;Wrong password"
+        body = b"]" + json.dumps({"assertion": assertion}).encode()
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def auth_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _AuthHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_login_then_upkeep(auth_server):
+    url = f"http://127.0.0.1:{auth_server.server_address[1]}/action.php"
+    client = AuthenticationClient()
+
+    first = await client.get_assertion(url, "user", "password", "chall1")
+    second = await client.get_assertion(url, "user", "password", "chall2")
+    # The request pool is shut down with poke-env's loops, unless closed before
+    (executor,) = [e for e in LIFECYCLE.executors if e is client._executor]
+    client.close()
+    assert executor not in LIFECYCLE.executors
+
+    assert first == "assertion-chall1"
+    assert second == "upkeep-chall2"
+    assert [r["act"] for r in auth_server.requests] == ["login", "upkeep"]
+    assert "pass" not in auth_server.requests[1]
+
+
+@pytest.mark.asyncio
+async def test_failed_login_is_not_cached(auth_server):
+    url = f"http://127.0.0.1:{auth_server.server_address[1]}/action.php"
+    client = AuthenticationClient(session_ttl=0)
+
+    assert await client.get_assertion(url, "user", "wrong", "c") == ";;Wrong password"
+    assert client.n_cached_sessions == 0
+
+    # Expired sessions are not reused
+    await client.get_assertion(url, "user", "password", "c")
+    await client.get_assertion(url, "user", "password", "c")
+    client.close()
+    assert [r["act"] for r in auth_server.requests] == ["login", "login", "login"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_logins_do_not_block_the_loop(auth_server):
+    url = f"http://127.0.0.1:{auth_server.server_address[1]}/action.php"
+    client = AuthenticationClient(max_workers=8)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticking = asyncio.create_task(ticker())
+    assertions = await asyncio.gather(
+        *[client.get_assertion(url, f"user{i}", "password", str(i)) for i in range(20)]
+    )
+    ticking.cancel()
+
+    assert assertions == [f"assertion-{i}" for i in range(20)]
+    assert client.n_cached_sessions == 20
+    assert ticks > 20
+    client.close()
+    assert client.n_cached_sessions == 0
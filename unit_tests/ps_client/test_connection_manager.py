@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from poke_env.concurrency import POKE_LOOP
+from poke_env.ps_client import (
+    AccountConfiguration,
+    AuthenticationClient,
+    ConnectionManager,
+    PSClient,
+    QueueTransport,
+    ServerConfiguration,
+)
+
+
+def make_client(username, loop, confirm_login=True):
+    async def on_send(message):
+        if confirm_login and message.startswith("|/trn "):
+            transport.feed(f"|updateuser| {username}|1|1|{{}}")
+
+    transport = QueueTransport(on_send=on_send)
+    transport.feed("|challstr|4|abc")
+    return PSClient(
+        account_configuration=AccountConfiguration(username, None),
+        server_configuration=ServerConfiguration("ws://server.url", "auth.url"),
+        start_listening=False,
+        transport=transport,
+        loop=loop,
+    )
+
+
+@pytest.mark.asyncio
+async def test_connection_manager_starts_monitors_and_stops_clients():
+    loop = asyncio.get_running_loop()
+    manager = ConnectionManager(
+        max_concurrent_logins=2,
+        stagger=0.001,
+        login_timeout=0.2,
+        health_check_interval=None,
+        loop=loop,
+    )
+    clients = [make_client(f"user{i}", loop) for i in range(5)]
+    clients.append(make_client("silent", loop, confirm_login=False))
+    for client in clients:
+        manager.add(client)
+
+    failed = await asyncio.wait_for(manager.start(), timeout=5)
+
+    assert failed == [clients[-1]]
+    statuses = manager.statuses()
+    assert [s.username for s in statuses] == [c.username for c in clients]
+    assert all(s.listening for s in statuses)
+    assert [s.logged_in for s in statuses] == [True] * 5 + [False]
+    assert all(s.idle_time is not None and s.idle_time >= 0 for s in statuses)
+
+    # The server closes a connection: the client is restarted
+    await clients[0].transport.close()
+    await asyncio.sleep(0.01)
+    assert not manager.statuses()[0].listening
+    statuses = manager.check_health()
+    assert statuses[0].listening
+    assert statuses[0].n_restarts == 1
+
+    await asyncio.wait_for(manager.stop(timeout=1), timeout=5)
+    assert not any(s.listening for s in manager.statuses())
+
+
+def test_connection_manager_rejects_clients_from_other_loops():
+    client = make_client("username", POKE_LOOP)
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(ValueError):
+            ConnectionManager(loop=loop).add(client)
+    finally:
+        loop.close()
+
+
+def test_connection_manager_shares_authentication_client():
+    authentication_client = AuthenticationClient(max_workers=1)
+    client = make_client("username", POKE_LOOP)
+    assert client.authentication_client is not authentication_client
+
+    manager = ConnectionManager(authentication_client=authentication_client)
+    manager.add(client)
+
+    assert client.authentication_client is authentication_client
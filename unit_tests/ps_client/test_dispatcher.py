@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from poke_env.ps_client.dispatcher import MessageDispatcher
+
+
+@pytest.mark.asyncio
+async def test_dispatch_keeps_room_order():
+    handled = []
+
+    async def handler(frame):
+        # Later frames of a room must wait for earlier ones, even if they are slow
+        await asyncio.sleep(0.01 if frame.endswith("0") else 0)
+        handled.append(frame)
+
+    dispatcher = MessageDispatcher(handler, MagicMock())
+    for i in range(3):
+        await dispatcher.dispatch("battle-a", f"a{i}")
+        await dispatcher.dispatch("battle-b", f"b{i}")
+    await dispatcher.join()
+
+    assert [f for f in handled if f.startswith("a")] == ["a0", "a1", "a2"]
+    assert [f for f in handled if f.startswith("b")] == ["b0", "b1", "b2"]
+    stats = dispatcher.stats()
+    assert stats.n_rooms == 2
+    assert stats.n_dispatched == 6
+    assert stats.n_queued == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_applies_backpressure():
+    release = asyncio.Event()
+
+    async def handler(frame):
+        await release.wait()
+
+    dispatcher = MessageDispatcher(handler, MagicMock(), maxsize=2)
+    await dispatcher.dispatch("battle-a", "0")
+    # Let the worker pick up the first frame, which then blocks in the handler
+    await asyncio.sleep(0)
+    for i in range(1, 3):
+        await dispatcher.dispatch("battle-a", str(i))
+    assert dispatcher.queue_depths() == {"battle-a": 2}
+
+    blocked = asyncio.create_task(dispatcher.dispatch("battle-a", "3"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.wait_for(blocked, timeout=1)
+    await dispatcher.join()
+    assert dispatcher.stats().n_blocked == 1
+    assert dispatcher.stats().max_depth == 2
+
+
+@pytest.mark.asyncio
+async def test_release_stops_worker_and_survives_handler_errors():
+    handled = []
+
+    async def handler(frame):
+        handled.append(frame)
+        if frame == "boom":
+            raise ValueError(frame)
+
+    dispatcher = MessageDispatcher(handler, MagicMock())
+    await dispatcher.dispatch("battle-a", "boom")
+    await dispatcher.dispatch("battle-a", "after")
+    await dispatcher.release("battle-a")
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert handled == ["boom", "after"]
+    assert dispatcher.stats().n_rooms == 0
+    assert dispatcher.queue_depths() == {}
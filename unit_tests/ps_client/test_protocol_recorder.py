@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from poke_env import AccountConfiguration, ServerConfiguration
+from poke_env.ps_client import ProtocolRecorder, PSClient, QueueTransport
+
+
+def test_recorder_keeps_last_frames_per_room():
+    recorder = ProtocolRecorder(capacity=2)
+    for i in range(3):
+        recorder.record("battle-a", ProtocolRecorder.RECEIVED, f"frame {i}")
+    recorder.record("battle-b", ProtocolRecorder.SENT, "battle-b|/choose default")
+
+    assert [r.message for r in recorder.records("battle-a")] == ["frame 1", "frame 2"]
+    assert recorder.records("battle-b")[0].direction == ">>>"
+    assert recorder.records("battle-c") == []
+    assert sorted(recorder.rooms) == ["battle-a", "battle-b"]
+
+    recorder.discard("battle-a")
+    assert recorder.rooms == ["battle-b"]
+
+    with pytest.raises(ValueError):
+        ProtocolRecorder(capacity=0)
+
+
+def test_recorder_dump():
+    recorder = ProtocolRecorder(capacity=4)
+    recorder.record("battle-a", ProtocolRecorder.RECEIVED, ">battle-a\n|turn|1")
+    logger = MagicMock()
+    logger.isEnabledFor.return_value = True
+
+    recorder.dump("battle-a", logger)
+
+    logger.log.assert_called_once()
+    assert logger.log.call_args[0][2:4] == (1, "battle-a")
+    assert "<<< >battle-a\n|turn|1" in logger.log.call_args[0][4]
+
+    logger.reset_mock()
+    recorder.dump("battle-b", logger)
+    logger.log.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ps_client_records_both_directions():
+    transport = QueueTransport()
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=ServerConfiguration("ws://server.url", "auth.url"),
+        start_listening=False,
+        transport=transport,
+        protocol_trace_size=8,
+    )
+    client._handle_message = MagicMock()
+
+    transport.feed(">battle-gen9randombattle-1\n|turn|1")
+    await transport.close()
+    await client.listen()
+    await client.send_message("/choose default", "battle-gen9randombattle-1")
+
+    records = client.protocol_recorder.records("battle-gen9randombattle-1")
+    assert [(r.direction, r.message) for r in records] == [
+        ("<<<", ">battle-gen9randombattle-1\n|turn|1"),
+        (">>>", "battle-gen9randombattle-1|/choose default"),
+    ]
+
+
+def test_ps_client_tracing_disabled_by_default():
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=ServerConfiguration("ws://server.url", "auth.url"),
+        start_listening=False,
+    )
+
+    assert client.protocol_recorder is None
+    client.dump_protocol_trace("battle-a")
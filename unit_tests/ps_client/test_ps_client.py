@@ -1,6 +1,5 @@
 import asyncio
 import logging
-from collections import namedtuple
 from unittest.mock import AsyncMock, Mock, PropertyMock, patch
 
 import pytest
@@ -8,9 +7,10 @@ import websockets
 
 from poke_env import AccountConfiguration, ServerConfiguration
 from poke_env.player import PSClient
+from poke_env.ps_client import QueueTransport
+from poke_env.ps_client.frame import ProtocolFrame
 
 account_configuration = AccountConfiguration("username", "password")
-requests_tuple = namedtuple("requests_tuple", ["text"])
 server_configuration = ServerConfiguration(
     "ws://server.url/showdown/websocket", "auth.url"
 )
@@ -45,17 +45,16 @@ def test_create_logger():
 
 
 @pytest.mark.asyncio
-@patch(
-    "poke_env.ps_client.ps_client.requests.post",
-    return_value=requests_tuple(':{"assertion":"content"}'),
-)
-async def testlog_in(post_mock):
+async def testlog_in():
+    authentication_client = Mock()
+    authentication_client.get_assertion = AsyncMock(return_value="content")
     client = PSClient(
         account_configuration=account_configuration,
         avatar=12,
         server_configuration=server_configuration,
         log_level=38,
         start_listening=False,
+        authentication_client=authentication_client,
     )
 
     client.send_message = AsyncMock()
@@ -65,7 +64,9 @@ async def testlog_in(post_mock):
 
     client.change_avatar.assert_called_once_with(12)
     client.send_message.assert_called_once_with("/trn username,0,content")
-    post_mock.assert_called_once()
+    authentication_client.get_assertion.assert_awaited_once_with(
+        "auth.url", "username", "password", "C%7CD", client.logger
+    )
 
 
 @pytest.mark.asyncio
@@ -169,7 +170,7 @@ async def test_listen(handle_message_mock):
                 await asyncio.gather(*client._active_tasks)
 
     assert handle_message_mock.await_count == 3
-    handle_message_mock.assert_awaited_with("error|test 3")
+    handle_message_mock.assert_awaited_with(ProtocolFrame("error|test 3"))
 
 
 @pytest.mark.asyncio
@@ -180,12 +181,106 @@ async def test_send_message():
         server_configuration=server_configuration,
         start_listening=False,
     )
-    client.websocket = AsyncMock()
-    client.websocket.send = AsyncMock()
+    client._transport = AsyncMock()
+    client._transport.send = AsyncMock()
 
     await client.send_message("hey", "home")
 
-    client.websocket.send.assert_called_once_with("home|hey")
+    client._transport.send.assert_called_once_with("home|hey")
 
     await client.send_message("hey", "home", "hey again")
-    client.websocket.send.assert_called_with("home|hey|hey again")
+    client._transport.send.assert_called_with("home|hey|hey again")
+
+
+def test_protocol_frame_splits_lazily():
+    frame = ProtocolFrame(">battle-gen9randombattle-1\n|request|{}\n|turn|1")
+
+    assert frame.room == "battle-gen9randombattle-1"
+    assert frame.kind == ""
+    assert frame._fields is None
+
+    assert frame[2] == ["", "turn", "1"]
+    assert frame._fields == [None, None, ["", "turn", "1"]]
+    assert len(frame) == 3
+    assert frame[1:] == [["", "request", "{}"], ["", "turn", "1"]]
+    assert frame == [m.split("|") for m in frame.message.split("\n")]
+
+    frame = ProtocolFrame(">battle-gen9randombattle-1\n|request|{}\n|turn|1")
+    assert frame[0] == [">battle-gen9randombattle-1"]
+    assert list(frame.iter_messages(1)) == [["", "request", "{}"], ["", "turn", "1"]]
+    # Iterated lines are not cached
+    assert frame._fields == [[">battle-gen9randombattle-1"], None, None]
+
+    global_frame = ProtocolFrame('|updatesearch|{"searching":[]}')
+    assert global_frame.room == ""
+    assert global_frame.kind == "updatesearch"
+    assert global_frame._lines is None
+
+
+@pytest.mark.asyncio
+async def test_listen_reconnects_and_rejoins_rooms():
+    async def on_send(message):
+        if message.startswith("|/trn "):
+            transport.feed("|updateuser| username|1|1|{}")
+
+    transport = QueueTransport(on_send=on_send)
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=server_configuration,
+        start_listening=False,
+        transport=transport,
+        max_reconnect_attempts=2,
+        reconnect_delay=0.001,
+    )
+    listening = asyncio.create_task(client.listen())
+
+    transport.feed("|challstr|4|abc")
+    await asyncio.wait_for(client.logged_in.wait(), timeout=1)
+    transport.feed(">battle-gen9randombattle-1\n|init|battle")
+    transport.feed(">battle-gen9randombattle-2\n|init|battle\n|deinit")
+
+    # The server drops the connection
+    await transport.close()
+    await asyncio.sleep(0.05)
+    assert not client.logged_in.is_set()
+    assert not listening.done()
+
+    transport.feed("|challstr|4|def")
+    await asyncio.wait_for(client.logged_in.wait(), timeout=1)
+    for _ in range(5):
+        await asyncio.sleep(0)
+    await client._stop_listening()
+    await asyncio.wait_for(listening, timeout=1)
+
+    assert transport.sent_messages == [
+        "|/trn username,0,",
+        "|/trn username,0,",
+        "|/join battle-gen9randombattle-1",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_listen_gives_up_after_max_reconnect_attempts():
+    class FailingTransport(QueueTransport):
+        n_connections = 0
+
+        async def connect(self):
+            self.n_connections += 1
+            raise OSError("Connection refused")
+
+    transport = FailingTransport()
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=server_configuration,
+        start_listening=False,
+        transport=transport,
+        max_reconnect_attempts=3,
+        reconnect_delay=0.001,
+    )
+    client._logger.exception = Mock()
+    client._logger.warning = Mock()
+
+    await asyncio.wait_for(client.listen(), timeout=1)
+
+    assert transport.n_connections == 4
+    assert client._logger.warning.call_count == 3
@@ -0,0 +1,135 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from poke_env.ps_client import AccountConfiguration, PSClient, QueueTransport
+from poke_env.ps_client.send_queue import SendQueue
+from poke_env.ps_client.server_configuration import ServerConfiguration
+
+
+@pytest.mark.asyncio
+async def test_send_queue_coalesces_consecutive_room_messages():
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    queue = SendQueue(send, MagicMock())
+    await asyncio.gather(
+        queue.send("/utm null"),
+        queue.send("/challenge opponent, gen9randombattle"),
+        queue.send("/timer on", "battle-1"),
+        queue.send("/choose default", "battle-1"),
+        queue.send("a"),
+        queue.send("b"),
+        queue.send("c\nd"),
+    )
+
+    assert sent == [
+        "|/utm null\n/challenge opponent, gen9randombattle",
+        "battle-1|/timer on\n/choose default",
+        # Frames never exceed showdown's line limit
+        "|a\nb",
+        "|c\nd",
+    ]
+    stats = queue.stats()
+    assert stats.n_messages == 7
+    assert stats.n_frames == 4
+    assert stats.max_depth == 7
+    assert stats.n_queued == 0
+    assert stats.max_latency >= stats.mean_latency > 0
+
+
+@pytest.mark.asyncio
+async def test_send_queue_paces_frames_after_burst():
+    sent_at = []
+
+    async def send(frame):
+        sent_at.append(asyncio.get_running_loop().time())
+
+    queue = SendQueue(send, MagicMock(), send_interval=0.02, burst=2)
+    for i in range(4):
+        await queue.send(str(i), f"battle-{i}")
+
+    # The first two frames use the burst, the next ones are spaced out
+    assert sent_at[1] - sent_at[0] < 0.015
+    assert sent_at[2] - sent_at[1] >= 0.015
+    assert sent_at[3] - sent_at[2] >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_send_queue_slows_down_when_throttled():
+    queue = SendQueue(MagicMock(), MagicMock(), throttle_cooldown=10)
+    assert queue.send_interval == 0
+
+    queue.notify_throttled()
+
+    assert queue.send_interval == SendQueue.SERVER_THROTTLE_DELAY
+    assert queue.stats().n_throttled == 1
+
+
+@pytest.mark.asyncio
+async def test_send_queue_propagates_send_errors():
+    async def send(frame):
+        raise ConnectionError(frame)
+
+    queue = SendQueue(send, MagicMock())
+    with pytest.raises(ConnectionError):
+        await queue.send("/choose default", "battle-1")
+    assert queue.stats().n_messages == 0
+
+
+@pytest.mark.asyncio
+async def test_ps_client_sends_team_and_challenge_in_one_frame():
+    transport = QueueTransport()
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=ServerConfiguration("ws://server.url", "auth.url"),
+        start_listening=False,
+        transport=transport,
+    )
+    client.logged_in.set()
+
+    await client.challenge("opponent", "gen9randombattle", None)
+
+    assert transport.sent_messages == [
+        "|/utm null\n/challenge opponent, gen9randombattle"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_queue_close_cancels_in_flight_batch():
+    sending = asyncio.Event()
+
+    async def send(frame):
+        sending.set()
+        await asyncio.sleep(10)
+
+    queue = SendQueue(send, MagicMock())
+    first = asyncio.create_task(queue.send("/timer on", "battle-1"))
+    second = asyncio.create_task(queue.send("/choose default", "battle-1"))
+    await asyncio.wait_for(sending.wait(), timeout=1)
+    await queue.close()
+
+    for task in (first, second):
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_send_queue_close_cancels_paced_messages():
+    sent = []
+
+    async def send(frame):
+        sent.append(frame)
+
+    queue = SendQueue(send, MagicMock(), send_interval=10, burst=1)
+    await queue.send("/timer on", "battle-1")
+    waiting = asyncio.create_task(queue.send("/choose default", "battle-2"))
+    await asyncio.sleep(0)
+    await queue.close()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(waiting, timeout=1)
+    assert sent == ["battle-1|/timer on"]
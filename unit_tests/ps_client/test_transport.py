@@ -0,0 +1,158 @@
+import asyncio
+import sys
+
+import pytest
+
+from poke_env import AccountConfiguration, ServerConfiguration
+from poke_env.player import RandomPlayer
+from poke_env.ps_client import (
+    ProcessTransport,
+    PSClient,
+    QueueTransport,
+    ReplayTransport,
+    WebsocketTransport,
+)
+
+server_configuration = ServerConfiguration(
+    "ws://server.url/showdown/websocket", "auth.url"
+)
+
+
+def test_default_transport_is_websocket():
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=server_configuration,
+        start_listening=False,
+    )
+
+    assert isinstance(client.transport, WebsocketTransport)
+    assert client.transport.websocket_url == "ws://server.url/showdown/websocket"
+    with pytest.deprecated_call():
+        assert client.websocket is None
+
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        server_configuration=server_configuration,
+        start_listening=False,
+        transport=QueueTransport(),
+    )
+    with pytest.deprecated_call():
+        assert client.websocket is None
+
+
+@pytest.mark.asyncio
+async def test_queue_transport_login_and_battle_messages():
+    battle_messages = []
+
+    async def on_battle_message(split_messages):
+        battle_messages.append(split_messages)
+
+    async def on_send(message):
+        if message.startswith("|/trn "):
+            transport.feed("|updateuser| username|1|1|{}")
+
+    transport = QueueTransport(on_send=on_send)
+    client = PSClient(
+        account_configuration=AccountConfiguration("username", None),
+        on_battle_message=on_battle_message,
+        server_configuration=server_configuration,
+        start_listening=False,
+        transport=transport,
+    )
+
+    listening = asyncio.create_task(client.listen())
+    transport.feed("|challstr|4|abc")
+    await asyncio.wait_for(client.logged_in.wait(), timeout=1)
+
+    transport.feed(">battle-gen9randombattle-1\n|init|battle")
+    await client.send_message("/timer on", "battle-gen9randombattle-1")
+    await client._stop_listening()
+    await asyncio.wait_for(listening, timeout=1)
+    if client._active_tasks:
+        await asyncio.gather(*client._active_tasks)
+
+    assert transport.sent_messages == [
+        "|/trn username,0,",
+        "battle-gen9randombattle-1|/timer on",
+    ]
+    assert battle_messages == [[[">battle-gen9randombattle-1"], ["", "init", "battle"]]]
+
+
+@pytest.mark.asyncio
+async def test_process_transport_round_trip():
+    # Echoes every received line back, which is enough to check the framing
+    echo = "import sys\nfor line in sys.stdin:\n    print(line, end='', flush=True)"
+    transport = ProcessTransport([sys.executable, "-c", echo])
+
+    async with transport:
+        await transport.send("|first\n|message")
+        await transport.send("room|second")
+        frames = transport.frames()
+        assert await frames.__anext__() == "|first\n|message"
+        assert await frames.__anext__() == "room|second"
+
+    assert transport.process is not None
+    assert transport.process.returncode == 0
+
+
+RECORDING = [
+    "|updateuser| Guest 1|0|1|{}",
+    "|challstr|4|abc",
+    "|updateuser| username|1|1|{}",
+    ">battle-gen9randombattle-1\n|init|battle\n|title|username vs. opponent",
+    ">battle-gen9randombattle-2\n|init|battle\n|title|username vs. opponent",
+    ">battle-gen9randombattle-1\n|player|p1|username|1|\n|player|p2|opponent|2|\n"
+    "|teamsize|p1|6\n|teamsize|p2|6\n|gen|9\n|start\n|turn|1",
+    ">battle-gen9randombattle-1\n|win|opponent",
+    ">battle-gen9randombattle-2\n|player|p1|opponent|2|\n|player|p2|username|1|\n"
+    "|teamsize|p1|6\n|teamsize|p2|6\n|gen|9\n|start\n|turn|1",
+    ">battle-gen9randombattle-2\n|win|username",
+]
+
+
+@pytest.mark.asyncio
+async def test_replay_transport_interleaves_room_copies():
+    transport = ReplayTransport(RECORDING, n_copies=2, interleave=2)
+
+    async with transport:
+        frames = [frame async for frame in transport]
+
+    assert transport.username == "username"
+    assert transport.n_rooms == 4
+    assert transport.n_frames == len(frames) == 14
+    assert transport.rooms == [
+        "battle-gen9randombattle-1",
+        "battle-gen9randombattle-2",
+        "battle-gen9randombattle-1-r1",
+        "battle-gen9randombattle-2-r1",
+    ]
+    # Challenges are dropped so that replaying clients do not log in
+    assert frames[:2] == [RECORDING[0], RECORDING[2]]
+    assert [f.partition("\n")[0] for f in frames[2:8]] == [
+        ">battle-gen9randombattle-1",
+        ">battle-gen9randombattle-2",
+    ] * 3
+    assert (
+        frames[8] == ">battle-gen9randombattle-1-r1\n" + RECORDING[3].split("\n", 1)[1]
+    )
+
+
+@pytest.mark.asyncio
+async def test_replay_transport_plays_battles_through_player():
+    transport = ReplayTransport(RECORDING, n_copies=3)
+    player = RandomPlayer(
+        account_configuration=AccountConfiguration(transport.username, None),
+        max_concurrent_battles=0,
+        start_listening=False,
+        transport=transport,
+    )
+
+    await asyncio.wait_for(player.ps_client.listen(), timeout=5)
+    await player.ps_client.dispatcher.join()
+    await player.ps_client.dispatcher.close()
+
+    assert player.ps_client.logged_in.is_set()
+    assert sorted(player.battles) == sorted(transport.rooms)
+    assert player.n_finished_battles == 6
+    assert player.n_won_battles == 3
+    assert transport.n_sent_messages == 6
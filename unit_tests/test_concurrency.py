@@ -0,0 +1,271 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock
+
+import pytest
+
+from poke_env.concurrency import (
+    EVENT_LOOP_ENV_VAR,
+    EVENT_LOOP_IMPLEMENTATION,
+    LIFECYCLE,
+    POKE_LOOP,
+    LifecycleManager,
+    LoopLagMonitor,
+    LoopPool,
+    _event_loop_factory,
+    _run_loop,
+    create_in_poke_loop,
+    handle_threaded_coroutines,
+    new_event_loop,
+)
+from poke_env.player import RandomPlayer
+
+
+async def _thread_name():
+    return threading.current_thread().name
+
+
+def test_loop_pool_shards_work_across_threads():
+    pool = LoopPool(3, name="test-shard")
+    try:
+        assert len(pool) == 3
+        assert pool.current_shard() == -1
+        assert [pool.next_loop() for _ in range(4)] == pool.loops + pool.loops[:1]
+        assert pool.loop_for("username") is pool.loop_for("username")
+
+        names = {
+            asyncio.run_coroutine_threadsafe(_thread_name(), loop).result()
+            for loop in pool
+        }
+        assert names == {"test-shard-0", "test-shard-1", "test-shard-2"}
+
+        async def current_shard():
+            return pool.current_shard()
+
+        assert (
+            asyncio.run_coroutine_threadsafe(current_shard(), pool.loops[1]).result()
+            == 1
+        )
+    finally:
+        pool.close()
+    assert not any(loop.is_running() for loop in pool)
+
+
+@pytest.mark.asyncio
+async def test_handle_threaded_coroutines_is_shard_aware():
+    pool = LoopPool(2)
+    try:
+        # Coroutines hop to their shard's thread...
+        name = await handle_threaded_coroutines(_thread_name(), pool.loops[1])
+        assert name.endswith("-1")
+
+        # ...unless they already run in it
+        loop = asyncio.get_running_loop()
+        name = await handle_threaded_coroutines(_thread_name(), loop)
+        assert name == threading.current_thread().name
+
+        event = create_in_poke_loop(asyncio.Event, pool.loops[0])
+        assert isinstance(event, asyncio.Event)
+    finally:
+        pool.close()
+
+
+def test_players_can_be_sharded():
+    pool = LoopPool(2)
+    try:
+        players = [
+            RandomPlayer(start_listening=False, loop=pool.next_loop()) for _ in range(2)
+        ]
+        assert [p.ps_client.loop for p in players] == pool.loops
+        assert POKE_LOOP not in pool.loops
+    finally:
+        pool.close()
+
+
+def test_event_loop_factory_selects_implementation(monkeypatch):
+    monkeypatch.setenv(EVENT_LOOP_ENV_VAR, "asyncio")
+    assert _event_loop_factory() == (asyncio.new_event_loop, "asyncio")
+
+    # uvloop is used when installed...
+    fake_uvloop = types.ModuleType("uvloop")
+    fake_uvloop.new_event_loop = asyncio.new_event_loop
+    monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+    for requested in ("uvloop", "auto", " UVLOOP "):
+        monkeypatch.setenv(EVENT_LOOP_ENV_VAR, requested)
+        assert _event_loop_factory()[1] == "uvloop"
+
+    # ...and asyncio is used otherwise
+    monkeypatch.setitem(sys.modules, "uvloop", None)
+    monkeypatch.setenv(EVENT_LOOP_ENV_VAR, "auto")
+    assert _event_loop_factory()[1] == "asyncio"
+    monkeypatch.setenv(EVENT_LOOP_ENV_VAR, "uvloop")
+    with pytest.warns(UserWarning, match="not installed"):
+        assert _event_loop_factory()[1] == "asyncio"
+    monkeypatch.setenv(EVENT_LOOP_ENV_VAR, "trio")
+    with pytest.warns(UserWarning, match="Unknown"):
+        assert _event_loop_factory()[1] == "asyncio"
+
+
+def test_poke_env_loops_use_the_selected_implementation():
+    loop = new_event_loop()
+    try:
+        assert isinstance(loop, asyncio.AbstractEventLoop)
+        assert EVENT_LOOP_IMPLEMENTATION in ("asyncio", "uvloop")
+    finally:
+        loop.close()
+
+
+def test_lifecycle_stops_clients_and_tasks():
+    loop = LIFECYCLE.start_loop("test-lifecycle")
+    assert loop in LIFECYCLE.loops
+    player = RandomPlayer(start_listening=False, loop=loop)
+    player.ps_client._stop_listening = AsyncMock()
+    for _ in range(3):
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(60), loop)
+
+    report = LIFECYCLE.stop_loop(loop, timeout=1)
+    player.ps_client._stop_listening.assert_awaited_once()
+    assert report.n_loops == 1
+    assert report.n_clients == 1
+    assert report.n_cancelled == 3
+    assert report.leaked_tasks == report.leaked_threads == ()
+    assert loop.is_closed()
+    assert loop not in LIFECYCLE.loops
+
+    # Stopping a loop twice is a no-op
+    assert LIFECYCLE.stop_loop(loop).n_loops == 0
+
+
+def test_lifecycle_can_not_stop_a_loop_from_its_own_thread():
+    loop = LIFECYCLE.start_loop("test-own-thread")
+
+    async def stop_itself():
+        return LIFECYCLE.stop_loop(loop)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run_coroutine_threadsafe(stop_itself(), loop).result()
+    # The loop is still tracked, and can be stopped from another thread
+    assert loop in LIFECYCLE.loops
+    assert LIFECYCLE.stop_loop(loop, timeout=1).n_loops == 1
+
+
+async def _ignore_cancellation():
+    while True:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            pass
+
+
+def test_lifecycle_shutdown_is_bounded():
+    stubborn_loop = LIFECYCLE.start_loop("test-stubborn")
+    # The leaked task is destroyed with its loop: silence the report
+    stubborn_loop.set_exception_handler(lambda loop, context: None)
+    asyncio.run_coroutine_threadsafe(_ignore_cancellation(), stubborn_loop)
+    blocked_loop = LIFECYCLE.start_loop("test-blocked")
+    blocked_loop.call_soon_threadsafe(time.sleep, 1)
+    time.sleep(0.05)
+
+    report = LIFECYCLE.stop_loops([stubborn_loop, blocked_loop], timeout=0.2)
+    assert report.duration < 0.5
+    assert report.n_loops == 2
+    assert len(report.leaked_tasks) == 2
+    assert "_ignore_cancellation" in report.leaked_tasks[0]
+    assert report.leaked_tasks[1] == "test-blocked did not respond"
+    assert report.leaked_threads == ("test-blocked",)
+    assert stubborn_loop.is_closed()
+
+    # Once unblocked, the leaked loop shuts down on its own
+    (thread,) = [t for t in threading.enumerate() if t.name == "test-blocked"]
+    thread.join()
+    assert blocked_loop.is_closed()
+
+
+def test_lifecycle_shuts_executors_down_within_the_deadline():
+    manager = LifecycleManager()
+    idle = ThreadPoolExecutor(1)
+    busy = ThreadPoolExecutor(1)
+    manager.track_executor(idle, "idle-executor")
+    manager.track_executor(busy, "busy-executor")
+    release = threading.Event()
+    busy.submit(release.wait, 5)
+    queued = busy.submit(int)
+
+    report = manager.shutdown(timeout=0.2)
+    assert report.duration < 0.5
+    assert report.n_executors == 2
+    assert report.leaked_threads == ("busy-executor",)
+    assert queued.cancelled()
+    assert manager.executors == []
+
+    release.set()
+    busy.shutdown()
+
+
+class _Battle:
+    battle_tag = "battle-gen9randombattle-1"
+
+
+def _blocking_policy(battle):
+    time.sleep(0.3)
+
+
+async def _handle(battle):
+    _blocking_policy(battle)
+
+
+def _check_stall_attribution(loop):
+    monitor = LoopLagMonitor(loop, interval=0.01, threshold=0.05)
+    try:
+        monitor.start()
+        time.sleep(0.1)
+
+        async def run():
+            await asyncio.create_task(_handle(_Battle()), name="handler")
+
+        asyncio.run_coroutine_threadsafe(run(), loop).result()
+        time.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    stats = monitor.stats()
+    assert stats.n_samples > 10
+    assert stats.n_stalls == 1
+    assert stats.max_lag >= 0.25
+    assert stats.stall_time == stats.max_lag
+
+    (stall,) = monitor.stalls
+    assert stall.duration == stats.max_lag
+    assert stall.battle_tag == "battle-gen9randombattle-1"
+    assert stall.task == "handler"
+    assert stall.stack[0].endswith("in _handle")
+    assert stall.stack[-1].endswith("in _blocking_policy")
+    return monitor
+
+
+def test_lag_monitor_attributes_stalls():
+    pool = LoopPool(1)
+    try:
+        monitor = _check_stall_attribution(pool.loops[0])
+    finally:
+        pool.close()
+
+    monitor.reset()
+    assert monitor.stats().n_samples == 0
+    assert monitor.stalls == []
+
+
+def test_lag_monitor_attributes_stalls_in_uvloop():
+    uvloop = pytest.importorskip("uvloop")
+    loop = uvloop.new_event_loop()
+    thread = threading.Thread(target=_run_loop, args=(loop,), daemon=True)
+    thread.start()
+    try:
+        _check_stall_attribution(loop)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()